@@ -0,0 +1,16 @@
+"""Tempo de importação dos scripts do Alura1 (ver comum/bench_importacao.py):
+
+    python bench_importacao.py
+    python bench_importacao.py main_rag --repeticoes 5 --top 15
+
+Importar não deve ler .env, PDFs nem montar clientes.
+"""
+import os
+
+import _raiz  # noqa: F401
+from comum.bench_importacao import main
+
+MODULOS = ["main", "main_chat", "main_rag", "main_langgraph", "lote"]
+
+if __name__ == "__main__":
+    main(MODULOS, os.path.dirname(os.path.abspath(__file__)))
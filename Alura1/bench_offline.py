@@ -0,0 +1,229 @@
+"""Vazão e latência p50/p99 dos scripts contra o servidor_fake, sem credenciais.
+
+Sobe o ServidorFake, aponta AZURE_OPENAI_ENDPOINT para ele e mede as
+cadeias de main.py, main_chat.py, main_rag.py e main_langgraph.py, além do
+agente do Alura2, síncrono e assíncrono (num subprocesso, porque os dois
+projetos têm módulos com o mesmo nome):
+
+    python bench_offline.py --repeticoes 20 --concorrencia 4
+    python bench_offline.py --cenarios viagem grafo --latencia 0.3 --taxa-429 0.1
+
+Tudo roda num diretório temporário, então os caches, sessões e índices
+criados aqui não se misturam com os reais. Cada consulta é única (para
+medir o caminho sem cache); --repetir usa sempre a mesma.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from servidor_fake import ServidorFake
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+RAIZ_ALURA2 = os.path.join(os.path.dirname(RAIZ), "Alura2")
+
+AGENTE = r"""
+import json, sys, time
+from agente import AgenteOpenAIFunctions
+
+agente = AgenteOpenAIFunctions()
+latencias = []
+for i in range(int(sys.argv[1])):
+    sufixo = "" if sys.argv[2] == "1" else f" ({i})"
+    inicio = time.perf_counter()
+    agente.executar("Dentre todas as faculdades, quais a Ana tem mais chance de entrar?" + sufixo, max_passos=3)
+    latencias.append(time.perf_counter() - inicio)
+print(json.dumps(latencias))
+"""
+
+# mesmas consultas, mas `--concorrencia` sessões ao mesmo tempo num único event loop
+AGENTE_ASYNC = r"""
+import asyncio, json, sys, time
+from agente import AgenteOpenAIFunctions
+
+async def main():
+    agente = AgenteOpenAIFunctions()
+    semaforo = asyncio.Semaphore(int(sys.argv[3]))
+    latencias = []
+
+    async def uma(i):
+        sufixo = "" if sys.argv[2] == "1" else f" ({i})"
+        async with semaforo:
+            inicio = time.perf_counter()
+            await agente.aexecutar("Dentre todas as faculdades, quais a Ana tem mais chance de entrar?" + sufixo, max_passos=3)
+            latencias.append(time.perf_counter() - inicio)
+
+    await asyncio.gather(*(uma(i) for i in range(int(sys.argv[1]))))
+    print(json.dumps(latencias))
+
+asyncio.run(main())
+"""
+
+
+def _viagem():
+    from main import obter_cadeia
+
+    cadeia = obter_cadeia()
+
+    async def executar(consulta, primeiro_token):
+        await cadeia.ainvoke({"interesse": consulta})
+
+    return "praias e cultura", executar
+
+
+def _chat():
+    from main_chat import responder_em_fluxo
+
+    async def executar(consulta, primeiro_token):
+        async for _ in responder_em_fluxo(consulta, f"bench-{id(consulta)}"):
+            primeiro_token()
+
+    return "Quero visitar um lugar do Brasil famoso por praias. Pode sugerir?", executar
+
+
+def _rag():
+    from main_rag import dados_recuperados, responder_em_fluxo
+
+    dados_recuperados()  # indexa os PDFs antes de medir
+
+    async def executar(consulta, primeiro_token):
+        async for _ in responder_em_fluxo(consulta):
+            primeiro_token()
+
+    return "Como acionar a Compra Protegida do cartão gold?", executar
+
+
+def _grafo():
+    from main_langgraph import responder_em_fluxo
+
+    async def executar(consulta, primeiro_token):
+        async for _ in responder_em_fluxo(consulta):
+            primeiro_token()
+
+    return "Quero escalar uma montanha com neve.", executar
+
+
+CENARIOS = {"viagem": _viagem, "chat": _chat, "rag": _rag, "grafo": _grafo}
+AGENTES = ["agente", "agente_async"]  # rodam num subprocesso com o Alura2 no PYTHONPATH
+
+
+def _percentil(valores: list, fracao: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fracao))]
+
+
+def _linha(nome: str, latencias: list, erros: int, segundos: float, primeiros: list = None):
+    if not latencias:
+        print(f"{nome:<12} sem execuções bem-sucedidas ({erros} erro(s))")
+        return
+    texto = (
+        f"{nome:<12} {len(latencias):>4} ok | {erros:>3} erro(s) | {len(latencias) / segundos:6.2f} req/s | "
+        f"p50 {_percentil(latencias, 0.5) * 1000:7.1f} ms | p99 {_percentil(latencias, 0.99) * 1000:7.1f} ms"
+    )
+    if primeiros:
+        texto += f" | 1º token p50 {_percentil(primeiros, 0.5) * 1000:7.1f} ms"
+    print(texto)
+
+
+async def medir(nome: str, repeticoes: int, concorrencia: int, repetir: bool):
+    try:
+        consulta_base, executar = CENARIOS[nome]()
+    except Exception as erro:
+        print(f"{nome:<12} indisponível: {type(erro).__name__}: {erro}")
+        return
+
+    semaforo = asyncio.Semaphore(concorrencia)
+    latencias, primeiros, erros = [], [], []
+
+    async def uma(i: int):
+        consulta = consulta_base if repetir else f"{consulta_base} (#{i})"
+        async with semaforo:
+            inicio = time.perf_counter()
+            marcado = []
+
+            def primeiro_token():
+                if not marcado:
+                    marcado.append(time.perf_counter() - inicio)
+
+            try:
+                await executar(consulta, primeiro_token)
+            except Exception as erro:
+                erros.append(f"{type(erro).__name__}: {erro}")
+                return
+            latencias.append(time.perf_counter() - inicio)
+            primeiros.extend(marcado)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(uma(i) for i in range(repeticoes)))
+    _linha(nome, latencias, len(erros), time.perf_counter() - inicio, primeiros)
+    if erros:
+        print(f"         primeiro erro: {erros[0][:200]}")
+
+
+def medir_agente(nome: str, repeticoes: int, repetir: bool, ambiente: dict, concorrencia: int = 1):
+    codigo = AGENTE_ASYNC if nome == "agente_async" else AGENTE
+    with tempfile.TemporaryDirectory() as temporario:
+        os.symlink(os.path.join(RAIZ_ALURA2, "documentos"), os.path.join(temporario, "documentos"))
+        inicio = time.perf_counter()
+        processo = subprocess.run(
+            [sys.executable, "-c", codigo, str(repeticoes), "1" if repetir else "0", str(concorrencia)],
+            cwd=temporario,
+            env={**ambiente, "PYTHONPATH": RAIZ_ALURA2},
+            capture_output=True,
+            text=True,
+        )
+    if processo.returncode != 0:
+        print(f"{nome:<12} falhou: {processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else processo.returncode}")
+        return
+    latencias = json.loads(processo.stdout.strip().splitlines()[-1])
+    # inclui a importação do Alura2 no subprocesso: a vazão é só indicativa
+    _linha(nome, latencias, 0, time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cenarios", nargs="+", default=[*CENARIOS, *AGENTES], choices=[*CENARIOS, *AGENTES])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--repetir", action="store_true", help="mesma consulta em todas as execuções (mede o cache)")
+    parser.add_argument("--latencia", type=float, default=0.05)
+    parser.add_argument("--tokens-por-segundo", type=float, default=200.0)
+    parser.add_argument("--tokens-resposta", type=int, default=40)
+    parser.add_argument("--taxa-429", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with ServidorFake(
+        latencia=args.latencia,
+        tokens_por_segundo=args.tokens_por_segundo,
+        tokens_resposta=args.tokens_resposta,
+        taxa_429=args.taxa_429,
+    ) as servidor, tempfile.TemporaryDirectory() as temporario:
+        os.environ.update({"AZURE_OPENAI_KEY": "fake", "AZURE_OPENAI_ENDPOINT": servidor.endpoint})
+        os.symlink(os.path.join(RAIZ, "documentos"), os.path.join(temporario, "documentos"))
+        os.chdir(temporario)
+        sys.path.insert(0, RAIZ)
+
+        print(
+            f"Servidor fake em {servidor.endpoint}: latência {args.latencia}s, "
+            f"{args.tokens_por_segundo:.0f} tokens/s, 429 em {args.taxa_429:.0%}\n"
+        )
+        # um único event loop: os clientes assíncronos são compartilhados entre os scripts
+        async def medir_todos():
+            for nome in args.cenarios:
+                if nome in CENARIOS:
+                    await medir(nome, args.repeticoes, args.concorrencia, args.repetir)
+
+        asyncio.run(medir_todos())
+        for nome in AGENTES:
+            if nome in args.cenarios:
+                medir_agente(nome, args.repeticoes, args.repetir, dict(os.environ), args.concorrencia)
+
+        print(f"\nRequisições atendidas: {servidor.contadores}")
+
+
+if __name__ == "__main__":
+    main()
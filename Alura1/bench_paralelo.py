@@ -0,0 +1,91 @@
+"""Compara o pipe serial da cadeia de viagem com a execução por dependências.
+
+As etapas são simuladas com a mesma latência de uma chamada ao modelo,
+então roda sem credenciais:
+
+    python bench_paralelo.py --latencia 0.8 --repeticoes 5
+
+A variante "em fluxo" gera o JSON do destino token a token (`--tokens`
+por segundo); as etapas seguintes dependem só de "destino.cidade" e
+começam assim que a cidade fecha, antes do motivo terminar.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from langchain_core.runnables import RunnableGenerator, RunnableLambda
+
+from json_parcial import JsonEmFluxo
+from paralelo import cadeia_em_fluxo, cadeia_por_dependencias
+
+DESTINO = {
+    "cidade": "Salvador",
+    "motivo": "Praias de água morna, centro histórico tombado, culinária baiana e festas populares o ano inteiro.",
+}
+
+
+def _etapa(latencia: float, saida):
+    def executar(entrada):
+        time.sleep(latencia)
+        return saida(entrada)
+
+    return RunnableLambda(executar)
+
+
+def _gerador_de_tokens(latencia: float, tokens_por_segundo: float, texto: str):
+    # primeiro token após `latencia`, depois ~4 caracteres por token
+    def gerar(entradas):
+        for _ in entradas:
+            pass
+        time.sleep(latencia)
+        for inicio in range(0, len(texto), 4):
+            time.sleep(1 / tokens_por_segundo)
+            yield texto[inicio:inicio + 4]
+
+    return RunnableGenerator(gerar)
+
+
+def _medir(cadeia, repeticoes: int) -> list:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        cadeia.invoke({"interesse": "praias"})
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latencia", type=float, default=0.8, help="segundos até o primeiro token")
+    parser.add_argument("--tokens", type=float, default=40.0, help="tokens por segundo na geração do destino")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    texto_destino = json.dumps(DESTINO, ensure_ascii=False)
+    geracao = len(texto_destino) / 4 / args.tokens  # tempo para gerar o JSON inteiro
+
+    cidade = _etapa(args.latencia + geracao, lambda _: dict(DESTINO))
+    cidade_em_fluxo = JsonEmFluxo(_gerador_de_tokens(args.latencia, args.tokens, texto_destino))
+    restaurantes = _etapa(args.latencia, lambda destino: {"cidade": destino["cidade"], "restaurante": "Paraíso Tropical"})
+    cultural = _etapa(args.latencia, lambda destino: f"Pelourinho em {destino['cidade']}")
+
+    serial = cidade | restaurantes | cultural
+    por_dependencias = cadeia_por_dependencias({
+        "destino": (cidade, []),
+        "restaurantes": (restaurantes, ["destino"]),
+        "cultural": (cultural, ["destino"]),
+    })
+    em_fluxo = cadeia_em_fluxo({
+        "destino": (cidade_em_fluxo, []),
+        "restaurantes": (restaurantes, ["destino.cidade"]),
+        "cultural": (cultural, ["destino.cidade"]),
+    })
+
+    for nome, cadeia in [("pipe serial", serial), ("por dependências", por_dependencias), ("em fluxo", em_fluxo)]:
+        tempos = _medir(cadeia, args.repeticoes)
+        print(f"{nome:<18} média {statistics.mean(tempos):.3f}s | melhor {min(tempos):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
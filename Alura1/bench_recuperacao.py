@@ -0,0 +1,88 @@
+"""Recall@k da recuperação sobre os guias GTB, com perguntas rotuladas.
+
+Cada pergunta tem o PDF esperado e um trecho de texto que o pedaço certo
+precisa conter. Sem credenciais mede só o BM25; com --vetorial usa também
+o índice Chroma do main_rag.py (busca vetorial pura e híbrida):
+
+    python bench_recuperacao.py --k 2
+    python bench_recuperacao.py --k 2 --vetorial
+"""
+import argparse
+import glob
+import time
+
+from carregamento import pedacos_do_arquivo
+from recuperacao import IndiceBM25, RecuperadorHibrido
+
+PERGUNTAS = [
+    ("Como acionar a Compra Protegida do cartão gold em caso de roubo?", "gold", "roubo"),
+    ("Qual o prazo da Garantia Estendida Original no cartão gold?", "gold", "garantia estendida"),
+    ("Como funciona a Proteção de Preço do Mastercard Gold?", "gold", "proteção de preço"),
+    ("O que o Concierge do cartão platinum pode fazer por mim?", "platinum", "concierge"),
+    ("O MasterSeguro de Automóveis cobre carro alugado no platinum?", "platinum", "veículo"),
+    ("Quais serviços de assistência de viagem o platinum oferece?", "platinum", "assistência"),
+    ("Qual o telefone do Mastercard Global Service no Brasil para o cartão standard?", "standard", "0800"),
+    ("Como contatar o Mastercard Global Service estando fora do país com o standard?", "standard", "global service"),
+]
+
+
+def _acertou(documentos: list, fonte: str, trecho: str) -> bool:
+    return any(fonte in d.metadata.get("source", "") and trecho in d.page_content.lower() for d in documentos)
+
+
+def _precisao_de_fonte(documentos: list, fonte: str) -> float:
+    if not documentos:
+        return 0.0
+    return sum(fonte in d.metadata.get("source", "") for d in documentos) / len(documentos)
+
+
+def _filtro(arquivos: list, fonte: str) -> dict:
+    return {"source": next(a for a in arquivos if fonte in a)}
+
+
+def avaliar(nome: str, buscar, arquivos: list, k: int):
+    acertos, precisao, inicio = 0, 0.0, time.perf_counter()
+    for pergunta, fonte, trecho in PERGUNTAS:
+        documentos = buscar(pergunta, k, _filtro(arquivos, fonte))
+        acertos += _acertou(documentos, fonte, trecho)
+        precisao += _precisao_de_fonte(documentos, fonte)
+    media_ms = (time.perf_counter() - inicio) * 1000 / len(PERGUNTAS)
+    print(
+        f"{nome:<22} recall@{k} {acertos / len(PERGUNTAS):.2f} | "
+        f"pedaços do PDF certo {precisao / len(PERGUNTAS):.2f} | {media_ms:.1f} ms/consulta"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=2)
+    parser.add_argument("--vetorial", action="store_true", help="inclui Chroma (exige credenciais)")
+    args = parser.parse_args()
+
+    arquivos = sorted(glob.glob("documentos/*.pdf"))
+    bm25 = IndiceBM25([p for arquivo in arquivos for p in pedacos_do_arquivo(arquivo)])
+
+    def lexical(pergunta, k, filtro):
+        return [d for d, _ in bm25.buscar(pergunta, k)]
+
+    def lexical_filtrado(pergunta, k, filtro):
+        return [d for d, _ in bm25.buscar(pergunta, k, filtro)]
+
+    avaliar("bm25", lexical, arquivos, args.k)
+    avaliar("bm25 + filtro", lexical_filtrado, arquivos, args.k)
+
+    if args.vetorial:
+        from main_rag import dados_recuperados
+
+        hibrido = dados_recuperados()
+        vetores = hibrido.vetores
+        hibrido = RecuperadorHibrido(vetores, bm25, k=args.k)
+
+        avaliar("vetorial", lambda p, k, f: vetores.similarity_search(p, k=k), arquivos, args.k)
+        avaliar("vetorial + filtro", lambda p, k, f: vetores.similarity_search(p, k=k, filter=f), arquivos, args.k)
+        avaliar("híbrido", lambda p, k, f: hibrido.invoke(p), arquivos, args.k)
+        avaliar("híbrido + filtro", lambda p, k, f: hibrido.invoke(p, f), arquivos, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Recall x memória x latência do VetoresCompactos contra precisão total.
+
+Gera vetores sintéticos de 3072 dimensões (mesmo formato do
+text-embedding-3-large) com variância decrescente por dimensão, imitando a
+concentração de informação nas primeiras coordenadas dos modelos
+Matryoshka. A referência é a busca exata em float32 com todas as
+dimensões, que é o que o Chroma guarda hoje; com --chroma a própria
+coleção Chroma entra na tabela:
+
+    python bench_vetores.py --n 20000 --consultas 200
+    python bench_vetores.py --n 20000 --chroma
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from vetores_compactos import VetoresCompactos, truncar
+
+CONFIGURACOES = [
+    # (nome, dimensao, quantizacao, listas)
+    ("float32 3072 exato", None, "float32", 0),
+    ("float16 3072 exato", None, "float16", 0),
+    ("int8 3072 exato", None, "int8", 0),
+    ("int8 1024 exato", 1024, "int8", 0),
+    ("int8 1024 ivf", 1024, "int8", 64),
+    ("int8 512 ivf", 512, "int8", 64),
+    ("int8 256 ivf", 256, "int8", 64),
+]
+
+
+def gerar(n: int, consultas: int, dimensao: int = 3072, grupos: int = 200, semente: int = 0) -> tuple:
+    gerador = np.random.default_rng(semente)
+    escala = (1.0 / np.sqrt(1 + np.arange(dimensao) / 64)).astype(np.float32)
+    centros = gerador.standard_normal((grupos, dimensao), dtype=np.float32) * escala
+    rotulos = gerador.integers(grupos, size=n + consultas)
+    ruido = gerador.standard_normal((n + consultas, dimensao), dtype=np.float32) * escala * 0.6
+    vetores = truncar(centros[rotulos] + ruido)
+    return vetores[:n], vetores[n:]
+
+
+def _tamanho_em_disco(diretorio: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(raiz, nome))
+        for raiz, _, nomes in os.walk(diretorio)
+        for nome in nomes
+    )
+
+
+def _recall(encontrados: list, esperados: np.ndarray) -> float:
+    return len(set(encontrados) & set(esperados.tolist())) / len(esperados)
+
+
+def _linha(nome: str, recall: float, tamanho: int, latencias: list):
+    print(
+        f"{nome:<22} recall@10 {recall:.3f} | {tamanho / 2**20:8.1f} MiB | "
+        f"p50 {np.percentile(latencias, 50):6.2f} ms | p99 {np.percentile(latencias, 99):6.2f} ms"
+    )
+
+
+def avaliar(nome, buscar, consultas, referencia, tamanho, k):
+    recalls, latencias = [], []
+    for consulta, esperados in zip(consultas, referencia):
+        inicio = time.perf_counter()
+        encontrados = buscar(consulta, k)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        recalls.append(_recall(encontrados, esperados))
+    _linha(nome, float(np.mean(recalls)), tamanho, latencias)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--sondas", type=int, default=8)
+    parser.add_argument("--chroma", action="store_true", help="inclui uma coleção Chroma em memória")
+    args = parser.parse_args()
+
+    vetores, consultas = gerar(args.n, args.consultas)
+    referencia = np.argsort(-(consultas @ vetores.T), axis=1)[:, :args.k]
+    textos = [str(i) for i in range(args.n)]
+    metadados = [{"i": i} for i in range(args.n)]
+    print(f"{args.n} vetores de {vetores.shape[1]} dimensões, {args.consultas} consultas\n")
+
+    with tempfile.TemporaryDirectory() as temporario:
+        for nome, dimensao, quantizacao, listas in CONFIGURACOES:
+            diretorio = os.path.join(temporario, nome.replace(" ", "_"))
+            loja = VetoresCompactos(None, diretorio, dimensao, quantizacao, listas, args.sondas)
+            loja.construir(vetores, textos, metadados)
+
+            def buscar(consulta, k, loja=loja):
+                return [loja._metadados[i]["i"] for i, _ in loja.buscar_vetor(consulta, k)]
+
+            avaliar(nome, buscar, consultas, referencia, _tamanho_em_disco(diretorio), args.k)
+
+        if args.chroma:
+            import chromadb
+
+            diretorio = os.path.join(temporario, "chroma")
+            colecao = chromadb.PersistentClient(path=diretorio).create_collection(
+                "bench", metadata={"hnsw:space": "cosine"}
+            )
+            for inicio in range(0, args.n, 5000):
+                fim = min(inicio + 5000, args.n)
+                colecao.add(ids=textos[inicio:fim], embeddings=vetores[inicio:fim].tolist())
+
+            def buscar_chroma(consulta, k):
+                return [int(i) for i in colecao.query(query_embeddings=[consulta.tolist()], n_results=k)["ids"][0]]
+
+            avaliar("chroma (hnsw float32)", buscar_chroma, consultas, referencia, _tamanho_em_disco(diretorio), args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator
+
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+
+def paginas(arquivo: str) -> Iterator:
+    """Gera as páginas do PDF uma a uma, sem carregar o arquivo inteiro."""
+
+    yield from PyPDFLoader(arquivo).lazy_load()
+
+
+def pedacos_do_arquivo(arquivo: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> Iterator:
+    """Gera os pedaços do PDF à medida que cada página é lida."""
+
+    divisor = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+    for pagina in paginas(arquivo):
+        yield from divisor.split_documents([pagina])
+
+
+def _dividir_arquivo(arquivo: str, chunk_size: int, chunk_overlap: int) -> tuple:
+    # Executado no processo filho: só os pedaços de um arquivo voltam pelo pickle
+    return arquivo, list(pedacos_do_arquivo(arquivo, chunk_size, chunk_overlap))
+
+
+def pedacos_em_paralelo(
+    arquivos: list,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    processos: int = None,
+    em_voo: int = None,
+) -> Iterator[tuple]:
+    """Divide os PDFs em um pool de processos, gerando `(arquivo, pedaços)`.
+
+    No máximo `em_voo` arquivos ficam em processamento ou aguardando consumo,
+    então a memória cresce com o tamanho do maior arquivo e não do corpus.
+    Os resultados saem na ordem em que terminam.
+    """
+
+    processos = processos or os.cpu_count() or 1
+    em_voo = em_voo or 2 * processos
+
+    if processos == 1 or len(arquivos) <= 1:
+        for arquivo in arquivos:
+            yield _dividir_arquivo(arquivo, chunk_size, chunk_overlap)
+        return
+
+    pendentes = iter(arquivos)
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = set()
+        for arquivo in pendentes:
+            futuros.add(executor.submit(_dividir_arquivo, arquivo, chunk_size, chunk_overlap))
+            if len(futuros) >= em_voo:
+                break
+
+        while futuros:
+            prontos, futuros = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                yield futuro.result()
+                proximo = next(pendentes, None)
+                if proximo is not None:
+                    futuros.add(executor.submit(_dividir_arquivo, proximo, chunk_size, chunk_overlap))
@@ -0,0 +1,87 @@
+from functools import lru_cache
+
+import _raiz  # noqa: F401
+from comum.configuracao import configuracao
+
+
+@lru_cache(maxsize=None)
+def obter_llm(deployment: str = "gpt-4o-mini", api_version: str = "2024-08-01-preview", temperature: float = 0.5):
+    """Cliente de chat montado no primeiro uso e compartilhado por configuração."""
+
+    from langchain_openai import AzureChatOpenAI
+    from comum.http_async import ClienteAsyncPorLoop
+
+    api_key, endpoint = configuracao.credenciais()
+    return AzureChatOpenAI(
+        api_key=api_key,
+        azure_endpoint=endpoint,
+        azure_deployment=deployment,
+        api_version=api_version,
+        temperature=temperature,
+        http_async_client=ClienteAsyncPorLoop(follow_redirects=True),
+    )
+
+
+@lru_cache(maxsize=None)
+def obter_embeddings(
+    deployment: str = "text-embedding-3-large",  # NOME DO DEPLOYMENT (não o modelo)
+    api_version: str = "2024-08-01-preview",
+    tamanho_lote: int = 64,
+    concorrencia: int = 4,
+    tokens_por_minuto: float = None,
+    requisicoes_por_minuto: float = None,
+):
+    """Embeddings em lote; o backoff de 429 fica com o EmbeddingsEmLote (max_retries=0)."""
+
+    from langchain_openai import AzureOpenAIEmbeddings
+    from embeddings_em_lote import EmbeddingsEmLote
+
+    api_key, endpoint = configuracao.credenciais()
+    return EmbeddingsEmLote(
+        AzureOpenAIEmbeddings(
+            api_key=api_key,
+            azure_endpoint=endpoint,
+            azure_deployment=deployment,
+            api_version=api_version,
+            max_retries=0,
+        ),
+        tamanho_lote=tamanho_lote,
+        concorrencia=concorrencia,
+        tokens_por_minuto=tokens_por_minuto,
+        requisicoes_por_minuto=requisicoes_por_minuto,
+    )
+
+
+def ativar_servicos():
+    """Liga o cache exato de respostas (global) e as métricas.
+
+    As duas coisas são idempotentes, então cada cadeia chama isto ao ser
+    montada em vez de o script fazer na importação.
+    """
+
+    from comum.cache_llm import ativar_cache
+    from comum.instrumentacao import ativar_instrumentacao
+
+    # Respostas repetidas saem do cache local em vez de ir de novo ao modelo
+    cache = ativar_cache()
+
+    # Métricas de latência e tokens, ligadas por METRICAS_PORTA ou METRICAS_ARQUIVO
+    ativar_instrumentacao(fontes={"cache_llm": cache.estatisticas})
+    return cache
+
+
+def cache_semantico(embeddings, caminho: str = "cache_perguntas.sqlite"):
+    """Cache exato + semântico de pergunta -> resposta, consultado pelo próprio script.
+
+    Fica num arquivo próprio e não vira o cache global: as cadeias continuam
+    só com a camada exata sobre o prompt inteiro. Quem usa decide o texto
+    comparado (a pergunta, não o prompt com o contexto) e o escopo, passado
+    como `llm_string` em `lookup`/`update`.
+    """
+
+    from comum.cache_llm import obter_cache
+    from comum.instrumentacao import ativar_instrumentacao
+
+    cache = obter_cache(caminho, embeddings=embeddings)
+    ativar_instrumentacao(fontes={"cache_semantico": cache.estatisticas, "embeddings": embeddings.estatisticas})
+    return cache
@@ -0,0 +1,191 @@
+import asyncio
+import random
+import threading
+import time
+from functools import lru_cache
+
+from langchain_core.embeddings import Embeddings
+
+from tokens import contar_tokens
+
+
+class BaldeDeFichas:
+    """Token bucket reabastecido continuamente até `capacidade` por minuto.
+
+    As fichas são reservadas na hora (o saldo pode ficar negativo) e quem
+    reservou espera o tempo necessário para o saldo voltar a zero. O mesmo
+    balde pode ser usado por várias threads e event loops, então a reserva
+    é feita sob uma trava; a espera acontece fora dela.
+    """
+
+    def __init__(self, capacidade_por_minuto: float):
+        self.capacidade = float(capacidade_por_minuto)
+        self.taxa = self.capacidade / 60.0
+        self.fichas = self.capacidade
+        self.atualizado = time.monotonic()
+        self._trava = threading.Lock()
+
+    def _reservar(self, quantidade: float) -> float:
+        """Desconta as fichas e retorna quantos segundos esperar."""
+
+        with self._trava:
+            agora = time.monotonic()
+            self.fichas = min(self.capacidade, self.fichas + (agora - self.atualizado) * self.taxa)
+            self.atualizado = agora
+            self.fichas -= min(quantidade, self.capacidade)
+            return max(0.0, -self.fichas / self.taxa)
+
+    async def consumir(self, quantidade: float = 1):
+        espera = self._reservar(quantidade)
+        if espera:
+            await asyncio.sleep(espera)
+
+
+@lru_cache(maxsize=None)
+def _loop_dedicado() -> asyncio.AbstractEventLoop:
+    """Event loop de vida longa numa thread daemon, criado no primeiro uso.
+
+    O cliente httpx assíncrono do modelo guarda conexões presas ao loop em
+    que foram abertas; com um `asyncio.run` por chamada, a segunda chamada
+    encontraria o loop anterior já fechado. Todas as requisições ao modelo
+    interno passam por este loop, venham da API síncrona ou de outro loop.
+    """
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True, name="embeddings").start()
+    return loop
+
+
+def _limite_de_taxa(erro: Exception) -> bool:
+    return getattr(erro, "status_code", None) == 429
+
+
+def _retry_after(erro: Exception):
+    resposta = getattr(erro, "response", None)
+    cabecalhos = getattr(resposta, "headers", None) or {}
+    # o Azure manda também retry-after-ms, mais preciso que os segundos inteiros
+    try:
+        return float(cabecalhos.get("retry-after-ms")) / 1000
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(cabecalhos.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class EmbeddingsEmLote(Embeddings):
+    """Envolve um `Embeddings` enviando lotes em paralelo com controle de cota.
+
+    - `tamanho_lote`: textos por requisição;
+    - `concorrencia`: requisições simultâneas no máximo;
+    - `tokens_por_minuto` / `requisicoes_por_minuto`: cotas do deployment;
+    - respostas 429 são repetidas com backoff exponencial (ou `Retry-After`).
+
+    Configure o modelo interno com `max_retries=0` para que as repetições
+    fiquem a cargo deste agendador.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        tamanho_lote: int = 64,
+        concorrencia: int = 4,
+        tokens_por_minuto: float = None,
+        requisicoes_por_minuto: float = None,
+        max_tentativas: int = 6,
+        espera_base: float = 1.0,
+    ):
+        self.embeddings = embeddings
+        self.tamanho_lote = tamanho_lote
+        self.concorrencia = concorrencia
+        self.balde_tokens = BaldeDeFichas(tokens_por_minuto) if tokens_por_minuto else None
+        self.balde_requisicoes = BaldeDeFichas(requisicoes_por_minuto) if requisicoes_por_minuto else None
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.estatisticas = {"pedacos": 0, "lotes": 0, "respostas_429": 0, "segundos": 0.0}
+
+    def pedacos_por_segundo(self) -> float:
+        segundos = self.estatisticas["segundos"]
+        return self.estatisticas["pedacos"] / segundos if segundos else 0.0
+
+    def relatorio(self) -> str:
+        e = self.estatisticas
+        return (
+            f"{e['pedacos']} pedaços em {e['lotes']} lotes, {e['segundos']:.2f}s "
+            f"({self.pedacos_por_segundo():.1f} pedaços/s, {e['respostas_429']} respostas 429)"
+        )
+
+    async def _com_cota(self, chamada, textos: list):
+        if self.balde_requisicoes:
+            await self.balde_requisicoes.consumir(1)
+        if self.balde_tokens:
+            await self.balde_tokens.consumir(sum(contar_tokens(t) for t in textos))
+
+        for tentativa in range(self.max_tentativas):
+            try:
+                return await chamada(textos)
+            except Exception as erro:
+                if not _limite_de_taxa(erro) or tentativa == self.max_tentativas - 1:
+                    raise
+                self.estatisticas["respostas_429"] += 1
+                espera = _retry_after(erro)
+                if espera is None:
+                    espera = self.espera_base * 2 ** tentativa * (1 + random.random())
+                await asyncio.sleep(espera)
+
+    @staticmethod
+    async def _no_loop_dedicado(corrotina):
+        loop = _loop_dedicado()
+        if asyncio.get_running_loop() is loop:
+            return await corrotina
+        # cancelar quem espera cancela também a tarefa no loop dedicado
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(corrotina, loop))
+
+    @staticmethod
+    def _executar(corrotina):
+        # Chroma e os retrievers chamam a API síncrona, às vezes de uma thread
+        # que já tem um loop rodando: só esta thread fica bloqueada esperando.
+        loop = _loop_dedicado()
+        try:
+            rodando = asyncio.get_running_loop()
+        except RuntimeError:
+            rodando = None
+        if rodando is loop:
+            corrotina.close()
+            raise RuntimeError("API síncrona de embeddings chamada de dentro do próprio loop dedicado")
+        return asyncio.run_coroutine_threadsafe(corrotina, loop).result()
+
+    async def aembed_documents(self, texts: list) -> list:
+        return await self._no_loop_dedicado(self._aembed_documents(texts))
+
+    async def aembed_query(self, text: str) -> list:
+        return await self._no_loop_dedicado(self._aembed_query(text))
+
+    async def _aembed_documents(self, texts: list) -> list:
+        inicio = time.perf_counter()
+        semaforo = asyncio.Semaphore(self.concorrencia)
+
+        async def embedar(lote):
+            async with semaforo:
+                return await self._com_cota(self.embeddings.aembed_documents, lote)
+
+        lotes = [texts[i:i + self.tamanho_lote] for i in range(0, len(texts), self.tamanho_lote)]
+        resultados = await asyncio.gather(*(embedar(lote) for lote in lotes))
+
+        self.estatisticas["pedacos"] += len(texts)
+        self.estatisticas["lotes"] += len(lotes)
+        self.estatisticas["segundos"] += time.perf_counter() - inicio
+        return [vetor for lote in resultados for vetor in lote]
+
+    async def _aembed_query(self, text: str) -> list:
+        async def embedar(textos):
+            return [await self.embeddings.aembed_query(textos[0])]
+
+        return (await self._com_cota(embedar, [text]))[0]
+
+    def embed_documents(self, texts: list) -> list:
+        return self._executar(self.aembed_documents(texts))
+
+    def embed_query(self, text: str) -> list:
+        return self._executar(self.aembed_query(text))
@@ -0,0 +1,88 @@
+import asyncio
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+ARQUIVO_CACHE_NOS = "cache_nos.sqlite"
+
+
+class CacheDeNos:
+    """Memoiza a saída de nós assíncronos de um StateGraph, em SQLite.
+
+    A chave é o nome do nó mais os campos do estado que ele lê, então uma
+    consulta repetida pula o nó inteiro. Acertos e falhas ficam em
+    `contadores[nome_do_no]`. Cada nó pode ter o próprio `ttl` (senão vale
+    o do cache); leituras e gravações no SQLite rodam numa thread, fora do
+    event loop.
+    """
+
+    def __init__(self, caminho: str = ARQUIVO_CACHE_NOS, ttl: float = None):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.contadores = defaultdict(lambda: {"acertos": 0, "falhas": 0})
+        self._trava = threading.Lock()
+        self._conexao_aberta = None
+
+    @property
+    def _conexao(self) -> sqlite3.Connection:
+        # aberta no primeiro acesso (sob a trava): decorar os nós não toca no disco
+        if self._conexao_aberta is None:
+            conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            conexao.execute(
+                """CREATE TABLE IF NOT EXISTS nos (
+                    chave TEXT PRIMARY KEY,
+                    saida TEXT NOT NULL,
+                    criado REAL NOT NULL
+                )"""
+            )
+            conexao.commit()
+            self._conexao_aberta = conexao
+        return self._conexao_aberta
+
+    @staticmethod
+    def _chave(nome: str, estado: dict, campos: list) -> str:
+        entrada = json.dumps({c: estado.get(c) for c in campos}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{nome}\0{entrada}".encode()).hexdigest()
+
+    def _ler(self, chave: str, ttl: float = None):
+        with self._trava:
+            linha = self._conexao.execute("SELECT saida, criado FROM nos WHERE chave = ?", (chave,)).fetchone()
+            if linha is not None and ttl is not None and time.time() - linha[1] > ttl:
+                self._conexao.execute("DELETE FROM nos WHERE chave = ?", (chave,))
+                self._conexao.commit()
+                return None
+        return None if linha is None else json.loads(linha[0])
+
+    def _gravar(self, chave: str, saida: dict):
+        with self._trava:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO nos VALUES (?, ?, ?)",
+                (chave, json.dumps(saida, ensure_ascii=False), time.time()),
+            )
+            self._conexao.commit()
+
+    def memoizar(self, nome: str, campos: list, ttl: float = None):
+        """Decorador para um nó `async def no(estado, config)` que só depende de `campos`."""
+
+        ttl = self.ttl if ttl is None else ttl
+
+        def decorador(no):
+            @functools.wraps(no)
+            async def envolvido(estado, config=None):
+                chave = self._chave(nome, estado, campos)
+                saida = await asyncio.to_thread(self._ler, chave, ttl)
+                if saida is not None:
+                    self.contadores[nome]["acertos"] += 1
+                    return saida
+                self.contadores[nome]["falhas"] += 1
+                saida = await no(estado, config)
+                await asyncio.to_thread(self._gravar, chave, saida)
+                return saida
+
+            return envolvido
+
+        return decorador
@@ -0,0 +1,153 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import SystemMessage, messages_from_dict, messages_to_dict
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from tokens import contar_tokens
+
+
+def resumidor_com_llm(llm):
+    """Cria uma função que incorpora mensagens antigas ao resumo da conversa."""
+
+    cadeia = ChatPromptTemplate.from_messages([
+        ("system", "Você mantém um resumo curto de uma conversa. Preserve nomes, destinos, datas e preferências do usuário."),
+        ("human", "Resumo atual:\n{resumo}\n\nNovas mensagens:\n{mensagens}\n\nEscreva o resumo atualizado."),
+    ]) | llm | StrOutputParser()
+
+    def resumir(resumo: str, mensagens: list) -> str:
+        texto = "\n".join(f"{m.type}: {m.content}" for m in mensagens)
+        return cadeia.invoke({"resumo": resumo or "(vazio)", "mensagens": texto})
+
+    return resumir
+
+
+class HistoricoJanelado(BaseChatMessageHistory):
+    """Histórico que guarda só as mensagens recentes que cabem em `max_tokens`.
+
+    As que saem da janela são incorporadas a um resumo (se houver `resumidor`)
+    enviado como mensagem de sistema, então o custo de cada turno não cresce
+    com o tamanho da conversa.
+    """
+
+    def __init__(self, max_tokens: int = 1000, resumidor=None, ao_alterar=None):
+        self.max_tokens = max_tokens
+        self.resumidor = resumidor
+        self.ao_alterar = ao_alterar
+        self.resumo = ""
+        self.recentes = []
+
+    @property
+    def messages(self) -> list:
+        if not self.resumo:
+            return list(self.recentes)
+        return [SystemMessage(content=f"Resumo da conversa até aqui: {self.resumo}")] + self.recentes
+
+    def _tokens(self) -> int:
+        return sum(contar_tokens(str(m.content)) for m in self.recentes)
+
+    def add_messages(self, messages) -> None:
+        self.recentes.extend(messages)
+
+        # retira pares pergunta/resposta do início até caber na janela
+        antigas = []
+        while len(self.recentes) > 2 and self._tokens() > self.max_tokens:
+            antigas.extend(self.recentes[:2])
+            del self.recentes[:2]
+        if antigas and self.resumidor is not None:
+            self.resumo = self.resumidor(self.resumo, antigas)
+
+        if self.ao_alterar:
+            self.ao_alterar(self)
+
+    def clear(self) -> None:
+        self.resumo = ""
+        self.recentes = []
+        if self.ao_alterar:
+            self.ao_alterar(self)
+
+
+class ArmazemDeSessoes:
+    """Históricos por sessão com limite de sessões (LRU) e expiração (TTL).
+
+    Com `caminho`, cada alteração é gravada em SQLite e sessões despejadas da
+    memória são recarregadas do disco no próximo acesso. Pode ser passado
+    diretamente como `get_session_history`.
+    """
+
+    def __init__(self, max_sessoes: int = 1000, ttl: float = None, caminho: str = None, **opcoes_historico):
+        self.max_sessoes = max_sessoes
+        self.ttl = ttl
+        self.opcoes_historico = opcoes_historico
+        self._sessoes = OrderedDict()
+        self._trava = threading.RLock()
+        self._conexao = None
+        if caminho:
+            self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+            self._conexao.execute(
+                """CREATE TABLE IF NOT EXISTS sessoes (
+                    sessao TEXT PRIMARY KEY,
+                    resumo TEXT NOT NULL,
+                    mensagens TEXT NOT NULL,
+                    atualizado REAL NOT NULL
+                )"""
+            )
+            self._conexao.commit()
+
+    def _expirado(self, momento: float) -> bool:
+        return self.ttl is not None and time.time() - momento > self.ttl
+
+    def _gravar(self, sessao: str, historico: HistoricoJanelado):
+        with self._trava:
+            if sessao in self._sessoes:
+                self._sessoes[sessao] = (historico, time.time())
+            if self._conexao is None:
+                return
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO sessoes VALUES (?, ?, ?, ?)",
+                (sessao, historico.resumo, json.dumps(messages_to_dict(historico.recentes)), time.time()),
+            )
+            self._conexao.commit()
+
+    def _carregar(self, sessao: str) -> HistoricoJanelado:
+        historico = HistoricoJanelado(
+            ao_alterar=lambda h: self._gravar(sessao, h),
+            **self.opcoes_historico,
+        )
+        if self._conexao is not None:
+            linha = self._conexao.execute(
+                "SELECT resumo, mensagens, atualizado FROM sessoes WHERE sessao = ?", (sessao,)
+            ).fetchone()
+            if linha and not self._expirado(linha[2]):
+                historico.resumo = linha[0]
+                historico.recentes = messages_from_dict(json.loads(linha[1]))
+        return historico
+
+    def _despejar(self):
+        while self._sessoes:
+            sessao, (_, acesso) = next(iter(self._sessoes.items()))
+            if len(self._sessoes) <= self.max_sessoes and not self._expirado(acesso):
+                break
+            del self._sessoes[sessao]
+        if self._conexao is not None and self.ttl is not None:
+            self._conexao.execute("DELETE FROM sessoes WHERE atualizado < ?", (time.time() - self.ttl,))
+            self._conexao.commit()
+
+    def __call__(self, sessao: str) -> HistoricoJanelado:
+        with self._trava:
+            item = self._sessoes.pop(sessao, None)
+            if item is None or self._expirado(item[1]):
+                historico = self._carregar(sessao)
+            else:
+                historico = item[0]
+            self._sessoes[sessao] = (historico, time.time())
+            self._despejar()
+            return historico
+
+    def __len__(self) -> int:
+        return len(self._sessoes)
@@ -0,0 +1,63 @@
+import os
+
+from ingestao import IngestorDeDocumentos
+
+# Backend -> diretório padrão; cada um guarda também o seu manifesto da ingestão
+DIRETORIOS_INDICE = {"chroma": "chroma_db", "compacto": "vetores_db"}
+
+
+def backend_do_indice() -> str:
+    """Backend escolhido por INDICE_BACKEND ("chroma", o padrão, ou "compacto")."""
+
+    backend = os.getenv("INDICE_BACKEND") or "chroma"
+    if backend not in DIRETORIOS_INDICE:
+        raise ValueError(f"INDICE_BACKEND desconhecido: {backend} (use {' ou '.join(DIRETORIOS_INDICE)})")
+    return backend
+
+
+def diretorio_do_indice(backend: str = None) -> str:
+    return DIRETORIOS_INDICE[backend or backend_do_indice()]
+
+
+def abrir_indice(embeddings, diretorio: str = None, backend: str = None):
+    """Abre (ou cria) o índice persistido em disco.
+
+    "chroma" é a coleção Chroma; "compacto" é o VetoresCompactos, com os
+    embeddings truncados em 1024 dimensões e quantizados em int8.
+    """
+
+    backend = backend or backend_do_indice()
+    diretorio = diretorio or diretorio_do_indice(backend)
+    if backend == "compacto":
+        from vetores_compactos import VetoresCompactos
+
+        return VetoresCompactos(embeddings, diretorio)
+
+    from langchain_community.vectorstores import Chroma
+
+    return Chroma(
+        collection_name="documentos",
+        embedding_function=embeddings,
+        persist_directory=diretorio,
+    )
+
+
+def carregar_indice(
+    arquivos: list,
+    embeddings,
+    diretorio: str = None,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    backend: str = None,
+):
+    """Abre o índice persistido e indexa os arquivos novos ou alterados da lista.
+
+    Nada é removido aqui: arquivos avulsos incluídos com `ingestao.py
+    adicionar` continuam no índice, e os tirados com `ingestao.py remover`
+    não voltam.
+    """
+
+    diretorio = diretorio or diretorio_do_indice(backend)
+    vetores = abrir_indice(embeddings, diretorio, backend)
+    IngestorDeDocumentos(vetores, diretorio, chunk_size, chunk_overlap).acompanhar(arquivos)
+    return vetores
@@ -0,0 +1,227 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+
+
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+
+def ler_manifesto(diretorio: str) -> dict:
+    """Arquivo -> assinatura indexada; None marca um arquivo tirado do corpus com `remover`."""
+
+    caminho = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def arquivos_indexados(diretorio: str) -> list:
+    return sorted(arquivo for arquivo, assinatura in ler_manifesto(diretorio).items() if assinatura is not None)
+
+
+def expandir(caminhos: list) -> list:
+    """Troca cada diretório pelos PDFs dentro dele."""
+
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos += sorted(glob.glob(os.path.join(caminho, "*.pdf")))
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+
+def assinatura_do_arquivo(caminho: str, chunk_size: int, chunk_overlap: int) -> str:
+    """Hash do conteúdo do arquivo combinado com a configuração do divisor."""
+
+    h = hashlib.sha256(f"{chunk_size}:{chunk_overlap}:".encode())
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def impressao_digital(pedaco) -> str:
+    """Identificador estável de um pedaço: origem, página e texto."""
+
+    h = hashlib.sha256()
+    h.update(str(pedaco.metadata.get("source", "")).encode())
+    h.update(b"\0")
+    h.update(str(pedaco.metadata.get("page", "")).encode())
+    h.update(b"\0")
+    h.update(pedaco.page_content.encode())
+    return h.hexdigest()
+
+
+class IngestorDeDocumentos:
+    """Mantém o índice vetorial sincronizado com os arquivos do corpus.
+
+    Cada pedaço recebe como id a sua impressão digital, então apenas os
+    pedaços inéditos são enviados para o modelo de embeddings e os que
+    sumiram do arquivo são apagados do índice.
+
+    O manifesto guarda a assinatura de cada arquivo indexado. `remover`
+    deixa o arquivo marcado (assinatura None) para que `acompanhar`, usado
+    na inicialização do main_rag, não o indexe de novo; só um `adicionar`
+    explícito o traz de volta.
+    """
+
+    def __init__(
+        self,
+        vetores,
+        diretorio: str,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        processos: int = None,
+        lote_insercao: int = 256,
+    ):
+        self.vetores = vetores
+        self.diretorio = diretorio
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.processos = processos
+        self.lote_insercao = lote_insercao
+        self.manifesto = ler_manifesto(diretorio)
+
+    def _caminho_manifesto(self) -> str:
+        return os.path.join(self.diretorio, ARQUIVO_MANIFESTO)
+
+    def _gravar_manifesto(self):
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = self._caminho_manifesto()
+        with open(caminho + ".tmp", "w", encoding="utf-8") as arquivo:
+            json.dump(self.manifesto, arquivo, indent=2)
+        os.replace(caminho + ".tmp", caminho)
+
+    def _ids_indexados(self, arquivo: str) -> set:
+        return set(self.vetores.get(where={"source": arquivo})["ids"])
+
+    def _assinatura(self, arquivo: str) -> str:
+        return assinatura_do_arquivo(arquivo, self.chunk_size, self.chunk_overlap)
+
+    def _aplicar(self, arquivo: str, assinatura: str, pedacos) -> dict:
+        novos = {}
+        for pedaco in pedacos:
+            novos.setdefault(impressao_digital(pedaco), pedaco)
+
+        existentes = self._ids_indexados(arquivo)
+        inserir = [i for i in novos if i not in existentes]
+        remover = [i for i in existentes if i not in novos]
+
+        if remover:
+            self.vetores.delete(ids=remover)
+        for inicio in range(0, len(inserir), self.lote_insercao):
+            ids = inserir[inicio:inicio + self.lote_insercao]
+            self.vetores.add_documents([novos[i] for i in ids], ids=ids)
+
+        self.manifesto[arquivo] = assinatura
+        self._gravar_manifesto()
+        return {"inseridos": len(inserir), "removidos": len(remover)}
+
+    def adicionar(self, arquivo: str) -> dict:
+        """Indexa um arquivo novo ou alterado. Retorna quantos pedaços mudaram."""
+
+        assinatura = self._assinatura(arquivo)
+        if self.manifesto.get(arquivo) == assinatura:
+            return {"inseridos": 0, "removidos": 0}
+
+        from carregamento import pedacos_do_arquivo  # carrega os loaders de PDF só quando precisa
+
+        pedacos = pedacos_do_arquivo(arquivo, self.chunk_size, self.chunk_overlap)
+        return self._aplicar(arquivo, assinatura, pedacos)
+
+    atualizar = adicionar
+
+    def remover(self, arquivo: str) -> dict:
+        """Apaga do índice todos os pedaços de um arquivo e o tira do corpus."""
+
+        existentes = list(self._ids_indexados(arquivo))
+        if existentes:
+            self.vetores.delete(ids=existentes)
+        if arquivo in self.manifesto or existentes:
+            self.manifesto[arquivo] = None
+            self._gravar_manifesto()
+        return {"inseridos": 0, "removidos": len(existentes)}
+
+    def _indexar(self, arquivos: list) -> dict:
+        # Só os arquivos alterados são lidos, em paralelo entre processos
+        from carregamento import pedacos_em_paralelo
+
+        total = {"inseridos": 0, "removidos": 0}
+        assinaturas = {arquivo: self._assinatura(arquivo) for arquivo in arquivos}
+        pendentes = [a for a, assinatura in assinaturas.items() if self.manifesto.get(a) != assinatura]
+        for arquivo, pedacos in pedacos_em_paralelo(
+            pendentes, self.chunk_size, self.chunk_overlap, processos=self.processos
+        ):
+            for chave, valor in self._aplicar(arquivo, assinaturas[arquivo], pedacos).items():
+                total[chave] += valor
+        return total
+
+    def acompanhar(self, arquivos: list) -> dict:
+        """Indexa os `arquivos` novos ou alterados e atualiza os já indexados; nunca remove.
+
+        Arquivos tirados do corpus com `remover` são ignorados, e os
+        incluídos com `adicionar` de fora da lista continuam no índice.
+        """
+
+        alvos = [a for a in arquivos if self.manifesto.get(a, "") is not None]
+        alvos += [a for a in arquivos_indexados(self.diretorio) if a not in alvos and os.path.exists(a)]
+        return self._indexar(alvos)
+
+    def sincronizar(self, arquivos: list) -> dict:
+        """Deixa o índice igual à lista de arquivos: adiciona, atualiza e remove."""
+
+        total = {"inseridos": 0, "removidos": 0}
+        for arquivo in [a for a, assinatura in self.manifesto.items() if assinatura is not None and a not in arquivos]:
+            for chave, valor in self.remover(arquivo).items():
+                total[chave] += valor
+        for chave, valor in self._indexar(arquivos).items():
+            total[chave] += valor
+        return total
+
+
+def _embeddings_do_ambiente(args):
+    from clientes import obter_embeddings
+
+    return obter_embeddings(
+        tamanho_lote=args.lote,
+        concorrencia=args.concorrencia,
+        tokens_por_minuto=args.tpm,
+        requisicoes_por_minuto=args.rpm,
+    )
+
+
+if __name__ == "__main__":
+    from indice import DIRETORIOS_INDICE, abrir_indice, diretorio_do_indice
+
+    parser = argparse.ArgumentParser(description="Ingestão incremental dos documentos do RAG.")
+    parser.add_argument("acao", choices=["adicionar", "atualizar", "remover", "sincronizar"])
+    parser.add_argument("caminhos", nargs="*", default=["documentos"])
+    parser.add_argument("--backend", choices=list(DIRETORIOS_INDICE), default=None, help="padrão: INDICE_BACKEND ou chroma")
+    parser.add_argument("--diretorio", default=None, help="padrão: o diretório do backend")
+    parser.add_argument("--lote", type=int, default=64, help="textos por requisição de embeddings")
+    parser.add_argument("--concorrencia", type=int, default=4, help="requisições simultâneas")
+    parser.add_argument("--tpm", type=float, default=None, help="cota de tokens por minuto")
+    parser.add_argument("--rpm", type=float, default=None, help="cota de requisições por minuto")
+    parser.add_argument("--processos", type=int, default=None, help="processos para ler os PDFs")
+    args = parser.parse_args()
+
+    embeddings = _embeddings_do_ambiente(args)
+    diretorio = args.diretorio or diretorio_do_indice(args.backend)
+    ingestor = IngestorDeDocumentos(
+        abrir_indice(embeddings, diretorio, args.backend),
+        diretorio,
+        processos=args.processos,
+    )
+
+    arquivos = expandir(args.caminhos)
+    if args.acao == "sincronizar":
+        print(ingestor.sincronizar(arquivos))
+    else:
+        for arquivo in arquivos:
+            print(arquivo, getattr(ingestor, args.acao)(arquivo))
+
+    print(embeddings.relatorio())
@@ -0,0 +1,142 @@
+import json
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import Runnable
+
+
+class LeitorJsonIncremental:
+    """Lê um objeto JSON aos pedaços e devolve cada campo de topo assim que ele fecha.
+
+    Texto antes do primeiro "{" (ex.: ```json) e depois do "}" final é
+    ignorado. Strings e objetos/listas fecham no próprio delimitador;
+    números, true/false e null só na vírgula ou no "}" seguinte.
+    """
+
+    def __init__(self):
+        self.texto = ""
+        self.posicao = 0
+        self.profundidade = 0
+        self.em_string = False
+        self.escape = False
+        self.esperando = "chave"  # chave -> valor -> depois (do valor)
+        self.chave = None
+        self.inicio = None  # início do valor atual no texto
+        self.fechado = False
+        self.objeto = {}
+
+    def _emitir(self, fim: int) -> tuple:
+        trecho = self.texto[self.inicio:fim].strip()
+        try:
+            valor = json.loads(trecho)
+        except json.JSONDecodeError as erro:
+            raise OutputParserException(f"Valor inválido para '{self.chave}': {trecho[:100]}") from erro
+        self.objeto[self.chave] = valor
+        self.esperando, self.inicio = "depois", None
+        return self.chave, valor
+
+    def alimentar(self, pedaco: str) -> list:
+        """Acrescenta texto e retorna os (campo, valor) que ficaram completos."""
+
+        self.texto += pedaco
+        completos = []
+        texto = self.texto
+        for i in range(self.posicao, len(texto)):
+            if self.fechado:
+                break
+            c = texto[i]
+
+            if self.em_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.em_string = False
+                    if self.profundidade == 1 and self.esperando == "chave":
+                        self.chave = json.loads(texto[self.inicio:i + 1])
+                        self.inicio = None
+                    elif self.profundidade == 1 and self.esperando == "valor":
+                        completos.append(self._emitir(i + 1))
+                continue
+
+            if self.profundidade == 0:
+                if c == "{":
+                    self.profundidade = 1
+                continue
+
+            if c == '"':
+                self.em_string = True
+                if self.profundidade == 1 and self.inicio is None:
+                    self.inicio = i
+            elif c in "{[":
+                if self.profundidade == 1 and self.inicio is None:
+                    self.inicio = i
+                self.profundidade += 1
+            elif c in "}]":
+                self.profundidade -= 1
+                if self.profundidade == 1 and self.esperando == "valor":
+                    completos.append(self._emitir(i + 1))
+                elif self.profundidade == 0:
+                    if self.esperando == "valor" and self.inicio is not None:
+                        completos.append(self._emitir(i))
+                    self.fechado = True
+            elif self.profundidade == 1:
+                if c == ":" and self.esperando == "chave":
+                    self.esperando = "valor"
+                elif c == ",":
+                    if self.esperando == "valor" and self.inicio is not None:
+                        completos.append(self._emitir(i))
+                    self.esperando = "chave"
+                elif not c.isspace() and self.esperando == "valor" and self.inicio is None:
+                    self.inicio = i  # número, true, false ou null
+        self.posicao = len(texto)
+        return completos
+
+    def finalizar(self) -> dict:
+        """Objeto completo; erro se o texto terminou antes do "}" final."""
+
+        if not self.fechado:
+            raise OutputParserException(f"JSON incompleto na saída do modelo: {self.texto[:200]}")
+        return self.objeto
+
+
+def _texto(pedaco) -> str:
+    return pedaco if isinstance(pedaco, str) else getattr(pedaco, "content", "") or ""
+
+
+class JsonEmFluxo(Runnable):
+    """Envolve uma cadeia que gera um objeto JSON como texto (ex.: prompt | llm).
+
+    `stream`/`astream` emitem {campo: valor} a cada campo de topo que fecha
+    no fluxo de tokens, sem esperar o objeto inteiro; `invoke`/`ainvoke`
+    retornam o objeto completo, como o JsonOutputParser.
+    """
+
+    def __init__(self, gerador: Runnable):
+        self.gerador = gerador
+
+    def stream(self, entrada, config=None, **kwargs):
+        leitor = LeitorJsonIncremental()
+        for pedaco in self.gerador.stream(entrada, config, **kwargs):
+            for campo, valor in leitor.alimentar(_texto(pedaco)):
+                yield {campo: valor}
+        leitor.finalizar()
+
+    async def astream(self, entrada, config=None, **kwargs):
+        leitor = LeitorJsonIncremental()
+        async for pedaco in self.gerador.astream(entrada, config, **kwargs):
+            for campo, valor in leitor.alimentar(_texto(pedaco)):
+                yield {campo: valor}
+        leitor.finalizar()
+
+    def invoke(self, entrada, config=None, **kwargs) -> dict:
+        objeto = {}
+        for parte in self.stream(entrada, config, **kwargs):
+            objeto.update(parte)
+        return objeto
+
+    async def ainvoke(self, entrada, config=None, **kwargs) -> dict:
+        objeto = {}
+        async for parte in self.astream(entrada, config, **kwargs):
+            objeto.update(parte)
+        return objeto
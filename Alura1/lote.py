@@ -0,0 +1,139 @@
+"""Executa muitas consultas de uma vez pelas cadeias de viagem, RAG ou roteador.
+
+Lê um JSONL (ou a entrada padrão) e escreve um JSONL com a resposta, a
+latência e os tokens de cada consulta, na ordem em que terminam:
+
+    python lote.py viagem consultas.jsonl --saida resultados.jsonl --concorrencia 8
+    echo '"Quero escalar."' | python lote.py roteador
+
+Cada linha pode ser um objeto JSON com a entrada da cadeia (mais um "id"
+opcional), uma string JSON ou texto puro.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+
+from langchain_community.callbacks import get_openai_callback
+
+
+def _viagem():
+    from main import obter_cadeia
+
+    return "interesse", obter_cadeia().ainvoke
+
+
+def _rag():
+    from main_rag import aresponder, dados_recuperados
+
+    dados_recuperados()  # monta o índice antes de abrir as consultas em paralelo
+    return "pergunta", lambda entrada: aresponder(entrada["pergunta"])
+
+
+def _roteador():
+    from main_langgraph import obter_app
+
+    app = obter_app()
+
+    async def executar(entrada):
+        return (await app.ainvoke(entrada))["resposta"]
+
+    return "query", executar
+
+
+PIPELINES = {"viagem": _viagem, "rag": _rag, "roteador": _roteador}
+
+
+def _ler_consultas(arquivo, chave: str):
+    for numero, linha in enumerate(arquivo, start=1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            entrada = json.loads(linha)
+        except json.JSONDecodeError:
+            entrada = linha
+        if not isinstance(entrada, dict):
+            entrada = {chave: entrada}
+        identificador = entrada.pop("id", numero)
+        yield identificador, entrada
+
+
+async def executar_lote(consultas, executar, saida, concorrencia: int = 8) -> list:
+    """Consome as consultas com `concorrencia` tarefas e grava cada resultado ao terminar."""
+
+    fila = asyncio.Queue(maxsize=2 * concorrencia)
+    latencias = []
+
+    async def trabalhador():
+        while True:
+            item = await fila.get()
+            if item is None:
+                return
+            identificador, entrada = item
+            registro = {"id": identificador, "entrada": entrada, "saida": None, "erro": None}
+            inicio = time.perf_counter()
+            with get_openai_callback() as uso:
+                try:
+                    registro["saida"] = await executar(entrada)
+                except Exception as erro:
+                    registro["erro"] = f"{type(erro).__name__}: {erro}"
+            registro["latencia_s"] = round(time.perf_counter() - inicio, 4)
+            registro["tokens"] = {
+                "prompt": uso.prompt_tokens,
+                "resposta": uso.completion_tokens,
+                "total": uso.total_tokens,
+            }
+            registro["custo_usd"] = uso.total_cost
+            latencias.append(registro["latencia_s"])
+            saida.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+            saida.flush()
+
+    tarefas = [asyncio.create_task(trabalhador()) for _ in range(concorrencia)]
+    for consulta in consultas:
+        await fila.put(consulta)
+    for _ in tarefas:
+        await fila.put(None)
+    await asyncio.gather(*tarefas)
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas em lote pelas cadeias do curso.")
+    parser.add_argument("pipeline", choices=sorted(PIPELINES))
+    parser.add_argument("entrada", nargs="?", help="arquivo JSONL (padrão: entrada padrão)")
+    parser.add_argument("--saida", help="arquivo JSONL de resultados (padrão: saída padrão)")
+    parser.add_argument("--concorrencia", type=int, default=8)
+    args = parser.parse_args()
+
+    # as mensagens impressas na importação dos scripts não podem misturar-se ao JSONL
+    with redirect_stdout(sys.stderr):
+        chave, executar = PIPELINES[args.pipeline]()
+    entrada = open(args.entrada, encoding="utf-8") if args.entrada else sys.stdin
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+
+    inicio = time.perf_counter()
+    try:
+        latencias = asyncio.run(executar_lote(_ler_consultas(entrada, chave), executar, saida, args.concorrencia))
+    finally:
+        if args.entrada:
+            entrada.close()
+        if args.saida:
+            saida.close()
+
+    total = time.perf_counter() - inicio
+    if latencias:
+        latencias.sort()
+        p95 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))]
+        print(
+            f"{len(latencias)} consultas em {total:.1f}s ({len(latencias) / total:.1f}/s) | "
+            f"p50 {statistics.median(latencias):.2f}s | p95 {p95:.2f}s",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
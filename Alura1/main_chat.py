@@ -1,58 +1,70 @@
-import os 
-from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.chat_history import InMemoryChatMessageHistory
-from langchain_core.runnables.history import RunnableWithMessageHistory
+import asyncio
+from functools import lru_cache
+from clientes import ativar_servicos, obter_llm
 
-load_dotenv()
+sessao = "aula_langchain_alura"
 
-api_key = os.getenv("AZURE_OPENAI_KEY")
-endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+lista_perguntas = [
+    "Quero visitar um lugar do Brasil, famoso por praias e cultura. Pode sugerir?",
+    "Qual a melhor época do ano para ir?"
+]
 
-if not api_key or not endpoint:
-    raise ValueError("A chave da API ou o endpoint não foram definidos no .env")
+# Cliente, cadeia e armazém de sessões são montados no primeiro uso, não na importação
+@lru_cache(maxsize=None)
+def obter_cadeia_com_memoria():
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.runnables.history import RunnableWithMessageHistory
+    from historico import ArmazemDeSessoes, resumidor_com_llm
+    from comum.instrumentacao import instrumentar
 
-llm = AzureChatOpenAI(
-    api_key=api_key,
-    azure_endpoint=endpoint,
-    azure_deployment="gpt-4o-mini",
-    api_version="2024-05-01-preview",
-    temperature=0.5
-)
+    llm = obter_llm(api_version="2024-05-01-preview")
+    ativar_servicos()
 
-print("Chave e endpoint carregados com sucesso!")
+    prompt_sugestao = ChatPromptTemplate.from_messages([
+        ("system", "Você é um guia de viagem especializado em destinos brasileiros. Apresente-se como Sr. Passeios."),
+        ("placeholder", "{historico}"),
+        ("human", "{query}"),
+    ])
 
-prompt_sugestao = ChatPromptTemplate.from_messages([
-    ("system", "Você é um guia de viagem especializado em destinos brasileiros. Apresente-se como Sr. Passeios."),
-    ("placeholder", "{historico}"),
-    ("human", "{query}"),
-])
+    cadeia = prompt_sugestao | llm | StrOutputParser()
 
-cadeia = prompt_sugestao | llm | StrOutputParser()
+    # Até 1000 sessões em memória, expiradas após 1h sem uso e gravadas em SQLite.
+    # Cada sessão envia ao modelo só ~1000 tokens recentes + um resumo do restante.
+    memoria = ArmazemDeSessoes(
+        max_sessoes=1000,
+        ttl=60 * 60,
+        caminho="sessoes.sqlite",
+        max_tokens=1000,
+        resumidor=resumidor_com_llm(llm),
+    )
 
-memoria = {}
-sessao = "aula_langchain_alura"
+    def historico_por_sessao(sessao : str):
+        return memoria(sessao)
 
-def historico_por_sessao(sessao : str):
-    if sessao not in memoria:
-        memoria[sessao] = InMemoryChatMessageHistory()
-    return memoria[sessao]
+    return instrumentar(RunnableWithMessageHistory(
+        runnable=cadeia,
+        get_session_history=historico_por_sessao,
+        input_messages_key="query",
+        history_messages_key="historico"
+    ))
 
-lista_perguntas = [
-    "Quero visitar um lugar do Brasil, famoso por praias e cultura. Pode sugerir?",
-    "Qual a melhor época do ano para ir?"
-]
+async def responder_em_fluxo(pergunta: str, sessao: str):
+    """Gera os tokens da resposta à medida que chegam.
+
+    O histórico da sessão só recebe a mensagem completa quando o fluxo termina.
+    """
+    async for pedaco in obter_cadeia_com_memoria().astream({"query": pergunta}, config={"session_id": sessao}):
+        yield pedaco
+
+async def main():
+    for uma_pergunta in lista_perguntas:
+        print(f"Usuário: {uma_pergunta}")
+        print("IA: ", end="", flush=True)
+        async for pedaco in responder_em_fluxo(uma_pergunta, sessao):
+            print(pedaco, end="", flush=True)
+        print("\n")
+
+if __name__ == "__main__":
+    asyncio.run(main())
 
-cadeia_com_memoria = RunnableWithMessageHistory(
-    runnable=cadeia,
-    get_session_history=historico_por_sessao,
-    input_messages_key="query",
-    history_messages_key="historico"
-)
-
-for uma_pergunta in lista_perguntas:
-    resposta = cadeia_com_memoria.invoke({"query": uma_pergunta}, config={"session_id": sessao})
-    print(f"Usuário: {uma_pergunta}")
-    print(f"IA: {resposta}\n")
@@ -1,88 +1,150 @@
-from langchain_openai import AzureChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from dotenv import load_dotenv
 from typing import TypedDict, Literal
-from langgraph.graph import StateGraph, START, END
-from langchain_core.runnables import RunnableConfig
+from functools import lru_cache
+from clientes import ativar_servicos, obter_llm
+from grafo_cache import CacheDeNos
+from contextlib import asynccontextmanager
 import asyncio
-import os 
 
-load_dotenv()
 
-api_key = os.getenv("AZURE_OPENAI_KEY")
-endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+SISTEMA_CONSULTOR = {
+    "praia": "Apresente-se como Sra. Praia. Você é uma especialista em destinos para praia.",
+    "montanha": "Apresente-se como Sr. Montanha. Você é um especialista em destinos para montanha e atividades radicais.",
+}
 
-if not api_key or not endpoint:
-    raise ValueError("A chave da API ou o endpoint não foram definidos no .env")
+# Cliente, prompts e cadeias são montados no primeiro uso, não na importação
+def _llm():
+    llm = obter_llm(api_version="2024-08-01-preview")
+    ativar_servicos()
+    return llm
 
-llm = AzureChatOpenAI(
-    api_key=api_key,
-    azure_endpoint=endpoint,
-    azure_deployment="gpt-4o-mini",
-    api_version="2024-08-01-preview",
-    temperature=0.5
-)
+@lru_cache(maxsize=None)
+def consultor(destino: str):
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
 
-print("Chave e endpoint carregados com sucesso!")
-
-
-prompt_consultor_praia = ChatPromptTemplate.from_messages([
-    ("system", "Apresente-se como Sra. Praia. Você é uma especialista em destinos para praia."),
-    ("human", "{query}"),
-])
-
-prompt_consultor_montanha = ChatPromptTemplate.from_messages([
-    ("system", "Apresente-se como Sr. Montanha. Você é um especialista em destinos para montanha e atividades radicais."),
-    ("human", "{query}"),
-])
-
-cadeia_praia = prompt_consultor_praia | llm | StrOutputParser()
-cadeia_montanha = prompt_consultor_montanha | llm | StrOutputParser()
+    prompt_consultor = ChatPromptTemplate.from_messages([
+        ("system", SISTEMA_CONSULTOR[destino]),
+        ("human", "{query}"),
+    ])
+    return prompt_consultor | _llm() | StrOutputParser()
 
 class Rota(TypedDict):
     destino: Literal["praia", "montanha"]
 
 
-prompt_roteador = ChatPromptTemplate.from_messages([
-    ("system", "Responda apenas com 'praia' ou 'montanha'"),
-    ("human", "{query}"),
-])
+@lru_cache(maxsize=None)
+def obter_roteador():
+    from langchain_core.prompts import ChatPromptTemplate
+    from roteamento import RoteadorHibrido
+
+    prompt_roteador = ChatPromptTemplate.from_messages([
+        ("system", "Responda apenas com 'praia' ou 'montanha'"),
+        ("human", "{query}"),
+    ])
 
-roteador = prompt_roteador | llm.with_structured_output(Rota)
+    # Classificador TF-IDF local decide os casos claros; os ambíguos vão para o LLM
+    return RoteadorHibrido(prompt_roteador | _llm().with_structured_output(Rota), limiar=0.5)
 
 class Estado(TypedDict):
     query: str
     destino: Rota
     resposta: str
 
-async def no_roteador(estado: Estado, config=RunnableConfig):
-    return {"destino": await roteador.ainvoke({"query": estado["query"]}, config=config)}
+# Saída de cada nó memoizada pela query: consultas repetidas pulam o nó. A rota
+# não muda, mas as respostas dos consultores expiram para não ficarem velhas.
+TTL_CONSULTORES = 24 * 3600
+cache_de_nos = CacheDeNos()
 
-async def no_praia(estado: Estado, config=RunnableConfig):
-    return {"resposta": await cadeia_praia.ainvoke({"query": estado["query"]}, config)}
+@cache_de_nos.memoizar("rotear", ["query"])
+async def no_roteador(estado: Estado, config=None):
+    return {"destino": await obter_roteador().ainvoke({"query": estado["query"]}, config=config)}
 
-async def no_montanha(estado: Estado, config=RunnableConfig):
-    return {"resposta": await cadeia_montanha.ainvoke({"query": estado["query"]}, config)}
+@cache_de_nos.memoizar("praia", ["query"], ttl=TTL_CONSULTORES)
+async def no_praia(estado: Estado, config=None):
+    return {"resposta": await consultor("praia").ainvoke({"query": estado["query"]}, config)}
+
+@cache_de_nos.memoizar("montanha", ["query"], ttl=TTL_CONSULTORES)
+async def no_montanha(estado: Estado, config=None):
+    return {"resposta": await consultor("montanha").ainvoke({"query": estado["query"]}, config)}
 
 def escolher_no(estado: Estado) -> Literal["praia", "montanha"]:
     return "praia" if estado["destino"]["destino"] == "praia" else "montanha"
 
-grafo = StateGraph(Estado)
-grafo.add_node("rotear", no_roteador)
-grafo.add_node("praia", no_praia)
-grafo.add_node("montanha", no_montanha)
+@lru_cache(maxsize=None)
+def obter_grafo():
+    from langgraph.graph import StateGraph, START, END
+
+    grafo = StateGraph(Estado)
+    grafo.add_node("rotear", no_roteador)
+    grafo.add_node("praia", no_praia)
+    grafo.add_node("montanha", no_montanha)
+
+    grafo.add_edge(START, "rotear")
+    grafo.add_conditional_edges("rotear", escolher_no)
+    grafo.add_edge("praia", END)
+    grafo.add_edge("montanha", END)
+    return grafo
+
+@lru_cache(maxsize=None)
+def obter_app():
+    """Grafo compilado sem checkpoints."""
+    from comum.instrumentacao import instrumentar
+
+    # instrumentar só registra se as métricas já estiverem ligadas, e os nós
+    # só montam o cliente (e chamam ativar_servicos) na primeira execução
+    ativar_servicos()
+    return instrumentar(obter_grafo().compile())
+
+ARQUIVO_CHECKPOINTS = "checkpoints.sqlite"
+
+@asynccontextmanager
+async def app_com_checkpoints(caminho: str = ARQUIVO_CHECKPOINTS):
+    """Grafo compilado com checkpoint em SQLite após cada nó.
+
+    Com o mesmo `thread_id`, uma execução interrompida pode ser retomada
+    chamando o grafo com entrada None.
+    """
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    from comum.instrumentacao import instrumentar
+
+    ativar_servicos()
+    async with AsyncSqliteSaver.from_conn_string(caminho) as checkpointer:
+        yield instrumentar(obter_grafo().compile(checkpointer=checkpointer))
+
+async def responder_em_fluxo(query, grafo_compilado=None, config=None):
+    """Gera os tokens da resposta do consultor escolhido à medida que chegam.
+
+    O roteador também chama o modelo, mas a saída estruturada dele não é repassada.
+    Se a resposta vier do cache de nós (sem tokens), ela sai inteira no final.
+    Com `query` None, retoma a execução salva no checkpoint de `config`.
+    """
+    grafo_compilado = grafo_compilado or obter_app()
+    entrada = None if query is None else {"query": query}
+    transmitiu = False
+    async for evento in grafo_compilado.astream_events(entrada, config=config, version="v2"):
+        if (
+            evento["event"] == "on_chat_model_stream"
+            and evento["metadata"].get("langgraph_node") in ("praia", "montanha")
+        ):
+            transmitiu = True
+            yield evento["data"]["chunk"].content
+        elif evento["event"] == "on_chain_end" and not evento["parent_ids"] and not transmitiu:
+            yield (evento["data"].get("output") or {}).get("resposta", "")
+
+async def main():
+    async with app_com_checkpoints() as app_persistente:
+        config = {"configurable": {"thread_id": "aula_langgraph"}}
 
-grafo.add_edge(START, "rotear")
-grafo.add_conditional_edges("rotear", escolher_no)
-grafo.add_edge("praia", END)
-grafo.add_edge("montanha", END)
+        # se a última execução desta thread parou no meio, continua de onde parou
+        estado = await app_persistente.aget_state(config)
+        query = None if estado.next else "Quero escalar."
 
-app = grafo.compile()
+        async for pedaco in responder_em_fluxo(query, app_persistente, config):
+            print(pedaco, end="", flush=True)
+        print()
 
-async def main():
-    resposta = await app.ainvoke({"query": "Quero escalar."})
-    print(resposta["resposta"])
+    print("Cache de nós:", dict(cache_de_nos.contadores))
 
 
-asyncio.run(main())
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,67 +1,117 @@
-
-from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
-from langchain_community.document_loaders import TextLoader, PyPDFLoader
-from langchain_community.vectorstores import Chroma
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from clientes import ativar_servicos, cache_semantico, obter_embeddings, obter_llm
+from recuperacao import termos
+from functools import lru_cache
+import asyncio
+import glob
+import json
 import os
 
-load_dotenv()
-api_key = os.getenv("AZURE_OPENAI_KEY")
-endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
 api_version = "2024-08-01-preview"
 
 DEPLOYMENT_EMBEDDINGS = "text-embedding-3-large"  # coloque o NOME DO DEPLOYMENT aqui (não o modelo)
 
-llm = AzureChatOpenAI(
-    api_key=api_key,
-    azure_endpoint=endpoint,
-    azure_deployment="gpt-4o-mini",
-    api_version=api_version,
-    temperature=0.5
-)
-
-embeddings = AzureOpenAIEmbeddings(
-    api_key=api_key,
-    azure_endpoint=endpoint,
-    azure_deployment=DEPLOYMENT_EMBEDDINGS,
-    api_version=api_version
-)
-
-arquivos = [
-    "documentos/GTB_standard_Nov23.pdf",
-    "documentos/GTB_gold_Nov23.pdf",
-    "documentos/GTB_platinum_Nov23.pdf"
-]
-
-documentos = sum(
-    [PyPDFLoader(arquivo).load() for arquivo in arquivos],
-    []
-)
-
-pedacos = RecursiveCharacterTextSplitter(
-    chunk_size=1000,
-    chunk_overlap=200,
-).split_documents(documentos)
-
-# ✅ Usando Chroma no lugar de FAISS
-dados_recuperados = Chroma.from_documents(
-    pedacos,
-    embeddings
-).as_retriever(search_kwargs={"k": 2})
-
-prompt = ChatPromptTemplate.from_messages([
-    ("system", "Responda usando exclusivamente o conteúdo fornecido."),
-    ("human", "{query}\n\nContexto: \n{context}\n\nResposta:"),
-])
-
-cadeia = prompt | llm | StrOutputParser()
+# Lotes de 64 pedaços, até 4 requisições simultâneas e backoff em respostas 429
+def obter_embeddings_rag():
+    return obter_embeddings(DEPLOYMENT_EMBEDDINGS, api_version, tamanho_lote=64, concorrencia=4)
+
+# PDFs novos ou alterados da pasta entram no índice na inicialização; arquivos avulsos
+# entram com `python ingestao.py adicionar` e saem com `python ingestao.py remover`
+arquivos = sorted(glob.glob("documentos/*.pdf"))
+
+# ✅ Índice persistido em disco (Chroma, ou VetoresCompactos com INDICE_BACKEND=compacto): só embeda pedaços novos e apaga os que sumiram.
+# É montado no primeiro uso: a leitura dos PDFs roda num pool de processos, que no
+# Windows reimporta este módulo e não pode disparar a ingestão de novo.
+# A busca é híbrida: vetorial + BM25 fundidas por RRF, o que acerta termos exatos
+# como "gold" e "platinum" sem precisar aumentar k.
+@lru_cache(maxsize=None)
+def dados_recuperados():
+    from indice import carregar_indice
+    from recuperacao import IndiceBM25, RecuperadorHibrido
+
+    vetores = carregar_indice(
+        arquivos,
+        obter_embeddings_rag(),
+        chunk_size=1000,
+        chunk_overlap=200,
+    )
+    return RecuperadorHibrido(vetores, IndiceBM25.do_chroma(vetores), k=2)
+
+def filtro_da_pergunta(pergunta: str):
+    """Restringe a busca ao PDF do cartão citado (standard, gold, platinum), se houver só um."""
+    from indice import diretorio_do_indice
+    from ingestao import arquivos_indexados
+
+    palavras = set(termos(pergunta))
+    citados = [a for a in arquivos_indexados(diretorio_do_indice()) if palavras & set(termos(os.path.basename(a)))]
+    return {"source": citados[0]} if len(citados) == 1 else None
+
+# Cliente e cadeia montados no primeiro uso, não na importação
+@lru_cache(maxsize=None)
+def obter_cadeia():
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+    from comum.instrumentacao import instrumentar
+
+    llm = obter_llm(api_version=api_version)
+    ativar_servicos()
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "Responda usando exclusivamente o conteúdo fornecido."),
+        ("human", "{query}\n\nContexto: \n{context}\n\nResposta:"),
+    ])
+
+    return instrumentar(prompt | llm | StrOutputParser())
+
+# Cache semântico sobre a pergunta (não sobre o prompt, que é quase todo contexto
+# recuperado): perguntas quase iguais sobre o mesmo PDF reaproveitam a resposta e
+# nem passam pela busca. O cache exato do prompt inteiro continua valendo no modelo.
+@lru_cache(maxsize=None)
+def cache_de_perguntas():
+    return cache_semantico(obter_embeddings_rag())
+
+def _escopo(filtro) -> str:
+    # o índice semântico é separado por escopo: uma pergunta sobre o gold nunca
+    # recebe a resposta dada a partir do platinum
+    return json.dumps({"api_version": api_version, "filtro": filtro}, sort_keys=True)
 
 def responder(pergunta: str):
-    trechos = dados_recuperados.invoke(pergunta)
+    filtro = filtro_da_pergunta(pergunta)
+    lembrada = cache_de_perguntas().lookup(pergunta, _escopo(filtro))
+    if lembrada:
+        return lembrada[0].text
+    trechos = dados_recuperados().invoke(pergunta, filtro)
     contexto = "\n\n".join(t.page_content for t in trechos)
-    return cadeia.invoke({"query": pergunta, "context": contexto})
+    resposta = obter_cadeia().invoke({"query": pergunta, "context": contexto})
+    from langchain_core.outputs import Generation
+
+    cache_de_perguntas().update(pergunta, _escopo(filtro), [Generation(text=resposta)])
+    return resposta
+
+async def aresponder(pergunta: str):
+    partes = [pedaco async for pedaco in responder_em_fluxo(pergunta)]
+    return "".join(partes)
+
+async def responder_em_fluxo(pergunta: str):
+    """Gera os tokens da resposta à medida que chegam do modelo."""
+    filtro = filtro_da_pergunta(pergunta)
+    lembrada = await cache_de_perguntas().alookup(pergunta, _escopo(filtro))
+    if lembrada:
+        yield lembrada[0].text
+        return
+    trechos = await dados_recuperados().ainvoke(pergunta, filtro)
+    contexto = "\n\n".join(t.page_content for t in trechos)
+    partes = []
+    async for pedaco in obter_cadeia().astream({"query": pergunta, "context": contexto}):
+        partes.append(pedaco)
+        yield pedaco
+    from langchain_core.outputs import Generation
+
+    await cache_de_perguntas().aupdate(pergunta, _escopo(filtro), [Generation(text="".join(partes))])
+
+async def main():
+    async for pedaco in responder_em_fluxo("Como devo proceder caso tenha um item comprado roubado e caso eu tenha o cartão gold"):
+        print(pedaco, end="", flush=True)
+    print()
 
-print(responder("Como devo proceder caso tenha um item comprado roubado e caso eu tenha o cartão gold"))
+if __name__ == "__main__":
+    asyncio.run(main())
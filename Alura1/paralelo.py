@@ -0,0 +1,159 @@
+from langchain_core.runnables import Runnable, RunnableLambda, RunnablePassthrough
+
+ENTRADA = "entrada"
+
+
+def _niveis(etapas: dict) -> list:
+    """Agrupa as etapas em níveis: cada nível só depende dos anteriores."""
+
+    restantes = dict(etapas)
+    prontas = set()
+    niveis = []
+    while restantes:
+        nivel = [nome for nome, (_, deps) in restantes.items() if set(deps) <= prontas]
+        if not nivel:
+            raise ValueError(f"Dependências circulares ou inexistentes entre: {', '.join(restantes)}")
+        niveis.append(nivel)
+        prontas.update(nivel)
+        for nome in nivel:
+            del restantes[nome]
+    return niveis
+
+
+def _seletor(dependencias: list):
+    # sem dependências: entrada original; uma: a saída dela; várias: {nome: saída}
+    if not dependencias:
+        return lambda estado: estado[ENTRADA]
+    if len(dependencias) == 1:
+        return lambda estado: estado[dependencias[0]]
+    return lambda estado: {nome: estado[nome] for nome in dependencias}
+
+
+def cadeia_por_dependencias(etapas: dict) -> Runnable:
+    """Monta uma cadeia que roda em paralelo as etapas que não dependem entre si.
+
+    `etapas` mapeia nome -> (runnable, [nomes das etapas de que depende]).
+    A saída é um dicionário com o resultado de cada etapa.
+    """
+
+    if ENTRADA in etapas:
+        raise ValueError(f"'{ENTRADA}' é reservado para a entrada da cadeia")
+
+    cadeia = RunnableLambda(lambda entrada: {ENTRADA: entrada})
+    for nivel in _niveis(etapas):
+        cadeia = cadeia | RunnablePassthrough.assign(**{
+            # run_name: cada etapa aparece com o próprio nome nos callbacks e métricas
+            nome: (RunnableLambda(_seletor(etapas[nome][1])) | etapas[nome][0]).with_config(run_name=nome)
+            for nome in nivel
+        })
+    return cadeia | RunnableLambda(lambda estado: {k: v for k, v in estado.items() if k != ENTRADA})
+
+
+def _argumento(entrada, dependencias: list, valores: dict):
+    # como _seletor, mas "etapa.campo" entra com o nome do campo
+    if not dependencias:
+        return entrada
+    if len(dependencias) == 1 and "." not in dependencias[0]:
+        return valores[dependencias[0]]
+    return {dep.partition(".")[2] or dep: valores[dep] for dep in dependencias}
+
+
+def _encerrar(nome: str, futuros: dict, campos: dict, saida=None, erro=None):
+    """Resolve o futuro da etapa e os dos campos dela que ainda faltam."""
+
+    for chave, futuro in campos.items():
+        etapa, _, campo = chave.partition(".")
+        if etapa != nome or futuro.done():
+            continue
+        if erro is not None:
+            futuro.set_exception(erro)
+        elif isinstance(saida, dict) and campo in saida:
+            futuro.set_result(saida[campo])
+        else:
+            futuro.set_exception(KeyError(f"A etapa '{nome}' não produziu o campo '{campo}'"))
+    if erro is not None:
+        futuros[nome].set_exception(erro)
+    else:
+        futuros[nome].set_result(saida)
+
+
+def cadeia_em_fluxo(etapas: dict) -> Runnable:
+    """Como cadeia_por_dependencias, mas cada etapa começa assim que o que ela usa chega.
+
+    Uma dependência pode ser a etapa inteira ("destino") ou um campo dela
+    ("destino.cidade"). Etapas JsonEmFluxo publicam cada campo assim que ele
+    fecha no fluxo de tokens, então quem depende só de um campo começa
+    enquanto a etapa anterior ainda gera o resto. Com um único campo, a
+    etapa recebe {campo: valor}.
+    """
+
+    import asyncio
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    from json_parcial import JsonEmFluxo
+
+    if ENTRADA in etapas:
+        raise ValueError(f"'{ENTRADA}' é reservado para a entrada da cadeia")
+    _niveis({nome: (r, [dep.partition(".")[0] for dep in deps]) for nome, (r, deps) in etapas.items()})
+    chaves_de_campos = {dep for _, deps in etapas.values() for dep in deps if "." in dep}
+
+    def publicar(nome: str, parte: dict, campos: dict):
+        for campo, valor in parte.items():
+            futuro = campos.get(f"{nome}.{campo}")
+            if futuro is not None and not futuro.done():
+                futuro.set_result(valor)
+
+    def executar(entrada, config):
+        futuros = {nome: Future() for nome in etapas}
+        campos = {chave: Future() for chave in chaves_de_campos}
+
+        def rodar(nome):
+            runnable, deps = etapas[nome]
+            try:
+                valores = {dep: (campos[dep] if dep in campos else futuros[dep]).result() for dep in deps}
+                argumento = _argumento(entrada, deps, valores)
+                etapa = runnable.with_config(run_name=nome)
+                if isinstance(runnable, JsonEmFluxo):
+                    saida = {}
+                    for parte in etapa.stream(argumento, config):
+                        saida.update(parte)
+                        publicar(nome, parte, campos)
+                else:
+                    saida = etapa.invoke(argumento, config)
+                _encerrar(nome, futuros, campos, saida)
+            except Exception as erro:
+                _encerrar(nome, futuros, campos, erro=erro)
+
+        # uma thread por etapa: quem espera um campo não ocupa a vaga de quem vai produzi-lo
+        with ThreadPoolExecutor(max_workers=len(etapas), thread_name_prefix="etapa") as pool:
+            list(pool.map(rodar, etapas))
+        return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+    async def aexecutar(entrada, config):
+        laco = asyncio.get_running_loop()
+        futuros = {nome: laco.create_future() for nome in etapas}
+        campos = {chave: laco.create_future() for chave in chaves_de_campos}
+
+        async def rodar(nome):
+            runnable, deps = etapas[nome]
+            try:
+                valores = {dep: await (campos[dep] if dep in campos else futuros[dep]) for dep in deps}
+                argumento = _argumento(entrada, deps, valores)
+                etapa = runnable.with_config(run_name=nome)
+                if isinstance(runnable, JsonEmFluxo):
+                    saida = {}
+                    async for parte in etapa.astream(argumento, config):
+                        saida.update(parte)
+                        publicar(nome, parte, campos)
+                else:
+                    saida = await etapa.ainvoke(argumento, config)
+                _encerrar(nome, futuros, campos, saida)
+            except Exception as erro:
+                _encerrar(nome, futuros, campos, erro=erro)
+
+        await asyncio.gather(*(rodar(nome) for nome in etapas))
+        for futuro in [*futuros.values(), *campos.values()]:
+            futuro.exception()  # marca como lido: só o primeiro erro sobe, sem avisos dos outros
+        return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+    return RunnableLambda(executar, afunc=aexecutar)
@@ -0,0 +1,133 @@
+import asyncio
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from ingestao import impressao_digital
+
+
+def termos(texto: str) -> list:
+    """Palavras sem acento e em minúsculas."""
+
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return re.findall(r"[a-z0-9]{2,}", texto)
+
+
+def _atende(metadata: dict, filtro: dict) -> bool:
+    return not filtro or all(metadata.get(campo) == valor for campo, valor in filtro.items())
+
+
+class IndiceBM25:
+    """Índice invertido em memória com pontuação BM25."""
+
+    def __init__(self, documentos: list, k1: float = 1.5, b: float = 0.75):
+        self.documentos = documentos
+        self.k1 = k1
+        self.b = b
+        self.postagens = defaultdict(list)  # termo -> [(posição do documento, frequência)]
+        self.tamanhos = []
+        for posicao, documento in enumerate(documentos):
+            contagem = Counter(termos(documento.page_content))
+            self.tamanhos.append(sum(contagem.values()))
+            for termo, frequencia in contagem.items():
+                self.postagens[termo].append((posicao, frequencia))
+        self.tamanho_medio = sum(self.tamanhos) / len(self.tamanhos) if self.tamanhos else 0.0
+
+    @classmethod
+    def do_chroma(cls, vetores, **kwargs) -> "IndiceBM25":
+        """Monta o índice com os pedaços já guardados no índice vetorial (Chroma ou VetoresCompactos)."""
+
+        from langchain_core.documents import Document
+
+        dados = vetores.get(include=["documents", "metadatas"])
+        documentos = [
+            Document(page_content=texto, metadata=metadata or {})
+            for texto, metadata in zip(dados["documents"], dados["metadatas"])
+        ]
+        return cls(documentos, **kwargs)
+
+    def buscar(self, consulta: str, k: int = 10, filtro: dict = None) -> list:
+        """Os `k` documentos mais bem pontuados, como pares (documento, pontuação)."""
+
+        total = len(self.documentos)
+        pontuacoes = defaultdict(float)
+        for termo in set(termos(consulta)):
+            postagens = self.postagens.get(termo)
+            if not postagens:
+                continue
+            idf = math.log(1 + (total - len(postagens) + 0.5) / (len(postagens) + 0.5))
+            for posicao, frequencia in postagens:
+                normalizacao = 1 - self.b + self.b * self.tamanhos[posicao] / self.tamanho_medio
+                pontuacoes[posicao] += idf * frequencia * (self.k1 + 1) / (frequencia + self.k1 * normalizacao)
+
+        ordenados = sorted(pontuacoes.items(), key=lambda item: item[1], reverse=True)
+        resultado = []
+        for posicao, pontuacao in ordenados:
+            if _atende(self.documentos[posicao].metadata, filtro):
+                resultado.append((self.documentos[posicao], pontuacao))
+                if len(resultado) == k:
+                    break
+        return resultado
+
+
+def fusao_rrf(listas: list, k: int = 60) -> list:
+    """Reciprocal rank fusion de várias listas ordenadas de documentos."""
+
+    pontuacoes = defaultdict(float)
+    documentos = {}
+    for lista in listas:
+        for posicao, documento in enumerate(lista):
+            chave = impressao_digital(documento)
+            documentos.setdefault(chave, documento)
+            pontuacoes[chave] += 1.0 / (k + posicao + 1)
+    return [documentos[chave] for chave, _ in sorted(pontuacoes.items(), key=lambda item: item[1], reverse=True)]
+
+
+class ReranqueadorCrossEncoder:
+    """Reordena candidatos com um cross-encoder local (sentence-transformers)."""
+
+    def __init__(self, modelo: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as erro:
+            raise ImportError("Instale sentence-transformers para usar o reranqueador local.") from erro
+        self.modelo = CrossEncoder(modelo)
+
+    def reordenar(self, consulta: str, documentos: list) -> list:
+        if not documentos:
+            return documentos
+        notas = self.modelo.predict([(consulta, d.page_content) for d in documentos])
+        return [d for _, d in sorted(zip(notas, documentos), key=lambda item: item[0], reverse=True)]
+
+
+class RecuperadorHibrido:
+    """Combina a busca vetorial do Chroma com BM25 por reciprocal rank fusion.
+
+    Cada busca traz `k_candidatos` de cada lado, funde as listas, aplica o
+    reranqueador (se houver) e devolve os `k` primeiros. `filtro` restringe
+    pelos metadados, por exemplo {"source": "documentos/GTB_gold_Nov23.pdf"}.
+    """
+
+    def __init__(self, vetores, bm25: IndiceBM25, k: int = 2, k_candidatos: int = 10, reranqueador=None):
+        self.vetores = vetores
+        self.bm25 = bm25
+        self.k = k
+        self.k_candidatos = k_candidatos
+        self.reranqueador = reranqueador
+
+    def _combinar(self, consulta: str, vetoriais: list, filtro: dict) -> list:
+        lexicais = [d for d, _ in self.bm25.buscar(consulta, self.k_candidatos, filtro)]
+        candidatos = fusao_rrf([vetoriais, lexicais])
+        if self.reranqueador is not None:
+            candidatos = self.reranqueador.reordenar(consulta, candidatos[:self.k_candidatos])
+        return candidatos[:self.k]
+
+    def invoke(self, consulta: str, filtro: dict = None) -> list:
+        vetoriais = self.vetores.similarity_search(consulta, k=self.k_candidatos, filter=filtro)
+        return self._combinar(consulta, vetoriais, filtro)
+
+    async def ainvoke(self, consulta: str, filtro: dict = None) -> list:
+        vetoriais = await self.vetores.asimilarity_search(consulta, k=self.k_candidatos, filter=filtro)
+        return await asyncio.to_thread(self._combinar, consulta, vetoriais, filtro)
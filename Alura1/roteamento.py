@@ -0,0 +1,112 @@
+import math
+from collections import Counter, defaultdict
+
+from recuperacao import termos as _palavras
+
+EXEMPLOS_DE_ROTA = {
+    "praia": [
+        "quero ir para a praia",
+        "mar azul, areia branca e sol",
+        "surfar e pegar onda no litoral",
+        "mergulho com snorkel em águas cristalinas",
+        "ilha paradisíaca com coqueiros",
+        "nadar, tomar banho de mar e se bronzear",
+        "passeio de barco, lancha ou escuna pelas praias",
+        "resort pé na areia no nordeste",
+        "kitesurf e stand up paddle",
+    ],
+    "montanha": [
+        "quero escalar",
+        "trilha na serra e acampamento",
+        "escalada em rocha e rapel",
+        "montanhismo e alpinismo",
+        "frio, neve e esqui",
+        "cachoeiras e trekking no mato",
+        "rafting, arvorismo e tirolesa",
+        "chalé com lareira na montanha",
+        "mountain bike em estrada de terra na serra",
+    ],
+}
+
+
+def termos(texto: str) -> list:
+    """Palavras de `recuperacao.termos` com 3+ letras, reduzidas aos 5 primeiros caracteres."""
+
+    return [p[:5] for p in _palavras(texto) if len(p) >= 3 and p.isalpha()]
+
+
+class ClassificadorTfidf:
+    """Centróide TF-IDF por rótulo, montado a partir de frases de exemplo.
+
+    `classificar` devolve (rótulo, confiança), em que a confiança é a margem
+    relativa entre o centróide mais próximo e o segundo (0 quando nenhum
+    termo da consulta é conhecido).
+    """
+
+    def __init__(self, exemplos: dict = EXEMPLOS_DE_ROTA):
+        documentos = [(rotulo, termos(frase)) for rotulo, frases in exemplos.items() for frase in frases]
+        frequencia = Counter(t for _, doc in documentos for t in set(doc))
+        self.idf = {t: math.log((1 + len(documentos)) / (1 + df)) + 1 for t, df in frequencia.items()}
+
+        somas = defaultdict(Counter)
+        for rotulo, doc in documentos:
+            for termo, peso in self._vetor(doc).items():
+                somas[rotulo][termo] += peso
+        self.centroides = {rotulo: self._normalizar(soma) for rotulo, soma in somas.items()}
+
+    @staticmethod
+    def _normalizar(vetor: dict) -> dict:
+        norma = math.sqrt(sum(v * v for v in vetor.values())) or 1.0
+        return {t: v / norma for t, v in vetor.items()}
+
+    def _vetor(self, doc: list) -> dict:
+        contagem = Counter(t for t in doc if t in self.idf)
+        return self._normalizar({t: n * self.idf[t] for t, n in contagem.items()})
+
+    def classificar(self, texto: str) -> tuple:
+        vetor = self._vetor(termos(texto))
+        pontuacoes = sorted(
+            ((sum(peso * centroide.get(t, 0.0) for t, peso in vetor.items()), rotulo)
+             for rotulo, centroide in self.centroides.items()),
+            reverse=True,
+        )
+        melhor, rotulo = pontuacoes[0]
+        segundo = pontuacoes[1][0] if len(pontuacoes) > 1 else 0.0
+        if melhor <= 0:
+            return rotulo, 0.0
+        return rotulo, (melhor - segundo) / melhor
+
+
+class RoteadorHibrido:
+    """Tenta os classificadores locais em ordem e só chama o LLM se nenhum tiver confiança.
+
+    `roteador_llm` é um runnable que recebe {"query": ...} e devolve {"destino": ...}.
+    """
+
+    def __init__(self, roteador_llm, classificadores: list = None, limiar: float = 0.5):
+        self.roteador_llm = roteador_llm
+        self.classificadores = classificadores if classificadores is not None else [ClassificadorTfidf()]
+        self.limiar = limiar
+        self.estatisticas = {"local": 0, "llm": 0}
+
+    def _local(self, query: str):
+        for classificador in self.classificadores:
+            rotulo, confianca = classificador.classificar(query)
+            if confianca >= self.limiar:
+                self.estatisticas["local"] += 1
+                return {"destino": rotulo}
+        return None
+
+    def invoke(self, entrada: dict, config=None) -> dict:
+        rota = self._local(entrada["query"])
+        if rota is None:
+            self.estatisticas["llm"] += 1
+            rota = self.roteador_llm.invoke(entrada, config=config)
+        return rota
+
+    async def ainvoke(self, entrada: dict, config=None) -> dict:
+        rota = self._local(entrada["query"])
+        if rota is None:
+            self.estatisticas["llm"] += 1
+            rota = await self.roteador_llm.ainvoke(entrada, config=config)
+        return rota
@@ -0,0 +1,335 @@
+"""Servidor local que imita os endpoints de chat e embeddings do Azure OpenAI.
+
+Serve para medir e testar os scripts sem credenciais nem rede:
+
+    python servidor_fake.py --porta 8765 --latencia 0.2 --tokens-por-segundo 80 --taxa-429 0.05
+
+e, em outro terminal, AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8765 e
+AZURE_OPENAI_KEY=qualquer-coisa. Atende:
+
+- /openai/deployments/{deployment}/chat/completions: texto, JSON (a partir
+  do response_format ou das instruções de formato do JsonOutputParser),
+  tool_calls gerados pelo schema das ferramentas e streaming SSE;
+- /openai/deployments/{deployment}/embeddings: vetores determinísticos por
+  texto, normalizados.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+ROTA_CHAT = re.compile(r"^/openai/deployments/([^/]+)/chat/completions")
+ROTA_EMBEDDINGS = re.compile(r"^/openai/deployments/([^/]+)/embeddings")
+SCHEMA_NO_PROMPT = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.S)
+
+DIMENSOES_PADRAO = 3072
+PALAVRAS = "praia serra cidade roteiro passeio cultura museu trilha mar sol viagem restaurante".split()
+
+
+def _tokens(texto: str) -> int:
+    return max(1, len(texto) // 4)
+
+
+def _texto_das_mensagens(mensagens: list) -> str:
+    partes = []
+    for mensagem in mensagens:
+        conteudo = mensagem.get("content") or ""
+        if isinstance(conteudo, list):
+            conteudo = " ".join(p.get("text", "") for p in conteudo if isinstance(p, dict))
+        partes.append(conteudo)
+    return "\n".join(partes)
+
+
+def exemplo_do_schema(schema: dict, definicoes: dict = None):
+    """Gera um valor válido (e simples) para um JSON schema."""
+
+    definicoes = definicoes if definicoes is not None else schema.get("$defs", schema.get("definitions", {}))
+    if "$ref" in schema:
+        return exemplo_do_schema(definicoes.get(schema["$ref"].split("/")[-1], {}), definicoes)
+    for combinacao in ("anyOf", "oneOf", "allOf"):
+        if schema.get(combinacao):
+            opcoes = [s for s in schema[combinacao] if s.get("type") != "null"] or schema[combinacao]
+            return exemplo_do_schema(opcoes[0], definicoes)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+
+    tipo = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(tipo, list):
+        tipo = next((t for t in tipo if t != "null"), "string")
+    if tipo == "object":
+        return {
+            campo: exemplo_do_schema(propriedade, definicoes)
+            for campo, propriedade in schema.get("properties", {}).items()
+        }
+    if tipo == "array":
+        return [exemplo_do_schema(schema.get("items", {}), definicoes)]
+    if tipo == "integer":
+        return 1
+    if tipo == "number":
+        return 1.0
+    if tipo == "boolean":
+        return True
+    return f"{schema.get('title', 'valor')} simulado".lower()
+
+
+def _schema_do_prompt(texto: str):
+    """Schema JSON embutido pelas instruções de formato do JsonOutputParser."""
+
+    for bloco in SCHEMA_NO_PROMPT.findall(texto):
+        try:
+            schema = json.loads(bloco)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(schema, dict) and "properties" in schema:
+            return schema
+    return None
+
+
+def vetor_deterministico(entrada, dimensoes: int) -> list:
+    semente = int.from_bytes(hashlib.sha256(json.dumps(entrada).encode()).digest()[:8], "little")
+    vetor = np.random.default_rng(semente).standard_normal(dimensoes)
+    return (vetor / np.linalg.norm(vetor)).round(6).tolist()
+
+
+class ServidorFake:
+    """Servidor HTTP em thread própria com latência, vazão de tokens e 429 configuráveis.
+
+    Cada resposta de chat espera `latencia` segundos (tempo até o primeiro
+    token) mais `tokens_resposta / tokens_por_segundo`. Uma fração
+    `taxa_429` das requisições volta com 429 e Retry-After de
+    `espera_429` segundos.
+    """
+
+    def __init__(
+        self,
+        porta: int = 0,
+        latencia: float = 0.05,
+        tokens_por_segundo: float = 200.0,
+        tokens_resposta: int = 40,
+        taxa_429: float = 0.0,
+        espera_429: float = 0.1,
+        semente: int = 0,
+    ):
+        self.latencia = latencia
+        self.tokens_por_segundo = tokens_por_segundo
+        self.tokens_resposta = tokens_resposta
+        self.taxa_429 = taxa_429
+        self.espera_429 = espera_429
+        self.contadores = {"chat": 0, "embeddings": 0, "respostas_429": 0}
+        self._aleatorio = random.Random(semente)
+        self._trava = threading.Lock()
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", porta), self._manipulador())
+        self._servidor.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}"
+
+    def iniciar(self) -> "ServidorFake":
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True, name="servidor-fake")
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *erro):
+        self.parar()
+
+    def _sortear_429(self) -> bool:
+        with self._trava:
+            return self.taxa_429 > 0 and self._aleatorio.random() < self.taxa_429
+
+    def _contar(self, chave: str):
+        with self._trava:
+            self.contadores[chave] += 1
+
+    def _mensagem(self, corpo: dict) -> dict:
+        """Conteúdo e tool_calls da resposta, conforme o que o pedido exige."""
+
+        mensagens = corpo.get("messages", [])
+        texto = _texto_das_mensagens(mensagens)
+        ferramentas = corpo.get("tools") or []
+        escolha = corpo.get("tool_choice")
+        ja_usou_ferramenta = any(m.get("role") == "tool" for m in mensagens)
+
+        forcada = isinstance(escolha, dict) and escolha.get("function", {}).get("name")
+        if ferramentas and escolha != "none" and (forcada or escolha == "required" or not ja_usou_ferramenta):
+            nomes = [f["function"]["name"] for f in ferramentas]
+            nome = forcada or next((n for n in nomes if n in texto), nomes[0])
+            funcao = next(f["function"] for f in ferramentas if f["function"]["name"] == nome)
+            argumentos = exemplo_do_schema(funcao.get("parameters", {}))
+            return {"content": None, "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": nome, "arguments": json.dumps(argumentos, ensure_ascii=False)},
+            }]}
+
+        formato = corpo.get("response_format") or {}
+        schema = None
+        if formato.get("type") == "json_schema":
+            schema = formato.get("json_schema", {}).get("schema", {})
+        elif formato.get("type") == "json_object" or "json" in texto.lower():
+            schema = _schema_do_prompt(texto) or ({} if formato.get("type") == "json_object" else None)
+        if schema is not None:
+            return {"content": json.dumps(exemplo_do_schema(schema), ensure_ascii=False)}
+
+        gerador = random.Random(texto)
+        palavras = [gerador.choice(PALAVRAS) for _ in range(self.tokens_resposta)]
+        return {"content": "Resposta simulada: " + " ".join(palavras) + "."}
+
+    def _manipulador(self):
+        servidor = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, como o httpx espera
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status: int, dados: dict, cabecalhos: dict = None):
+                corpo = json.dumps(dados, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corpo)))
+                for chave, valor in (cabecalhos or {}).items():
+                    self.send_header(chave, valor)
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def do_POST(self):
+                corpo = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if servidor._sortear_429():
+                    servidor._contar("respostas_429")
+                    espera = servidor.espera_429
+                    self._json(
+                        429,
+                        {"error": {"code": "429", "message": "Limite de taxa simulado."}},
+                        {"Retry-After": str(max(1, round(espera))), "retry-after-ms": str(int(espera * 1000))},
+                    )
+                    return
+
+                try:
+                    if rota := ROTA_CHAT.match(self.path):
+                        servidor._contar("chat")
+                        self._chat(rota.group(1), corpo)
+                    elif rota := ROTA_EMBEDDINGS.match(self.path):
+                        servidor._contar("embeddings")
+                        self._embeddings(rota.group(1), corpo)
+                    else:
+                        self._json(404, {"error": {"code": "404", "message": f"Rota desconhecida: {self.path}"}})
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # o cliente desistiu no meio da resposta
+
+            def _chat(self, deployment: str, corpo: dict):
+                mensagem = servidor._mensagem(corpo)
+                saida = mensagem.get("content") or json.dumps(mensagem.get("tool_calls"))
+                uso = {
+                    "prompt_tokens": _tokens(_texto_das_mensagens(corpo.get("messages", []))),
+                    "completion_tokens": _tokens(saida),
+                }
+                uso["total_tokens"] = uso["prompt_tokens"] + uso["completion_tokens"]
+                base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": deployment}
+                motivo = "tool_calls" if mensagem.get("tool_calls") else "stop"
+
+                time.sleep(servidor.latencia)
+                if not corpo.get("stream"):
+                    time.sleep(uso["completion_tokens"] / servidor.tokens_por_segundo)
+                    self._json(200, {
+                        **base,
+                        "object": "chat.completion",
+                        "choices": [{"index": 0, "message": {"role": "assistant", **mensagem}, "finish_reason": motivo}],
+                        "usage": uso,
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def enviar(dados):
+                    linha = f"data: {dados if isinstance(dados, str) else json.dumps(dados, ensure_ascii=False)}\n\n".encode()
+                    self.wfile.write(f"{len(linha):X}\r\n".encode() + linha + b"\r\n")
+                    self.wfile.flush()
+
+                def pedaco(delta: dict, motivo_final=None):
+                    return {**base, "object": "chat.completion.chunk",
+                            "choices": [{"index": 0, "delta": delta, "finish_reason": motivo_final}]}
+
+                enviar(pedaco({"role": "assistant", "content": ""}))
+                if mensagem.get("tool_calls"):
+                    time.sleep(uso["completion_tokens"] / servidor.tokens_por_segundo)
+                    chamadas = [{"index": i, **chamada} for i, chamada in enumerate(mensagem["tool_calls"])]
+                    enviar(pedaco({"tool_calls": chamadas}))
+                else:
+                    partes = re.findall(r"\S+\s*", mensagem["content"])
+                    intervalo = uso["completion_tokens"] / servidor.tokens_por_segundo / max(1, len(partes))
+                    for parte in partes:
+                        time.sleep(intervalo)
+                        enviar(pedaco({"content": parte}))
+                enviar(pedaco({}, motivo))
+                if (corpo.get("stream_options") or {}).get("include_usage"):
+                    enviar({**base, "object": "chat.completion.chunk", "choices": [], "usage": uso})
+                enviar("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def _embeddings(self, deployment: str, corpo: dict):
+                entradas = corpo.get("input", [])
+                if isinstance(entradas, str) or (entradas and isinstance(entradas[0], int)):
+                    entradas = [entradas]
+                dimensoes = corpo.get("dimensions") or DIMENSOES_PADRAO
+                tokens = sum(len(e) if isinstance(e, list) else _tokens(e) for e in entradas)
+                time.sleep(servidor.latencia)
+                self._json(200, {
+                    "object": "list",
+                    "model": deployment,
+                    "data": [
+                        {"object": "embedding", "index": i, "embedding": vetor_deterministico(e, dimensoes)}
+                        for i, e in enumerate(entradas)
+                    ],
+                    "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                })
+
+        return Manipulador
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.05, help="segundos até o primeiro token")
+    parser.add_argument("--tokens-por-segundo", type=float, default=200.0)
+    parser.add_argument("--tokens-resposta", type=int, default=40)
+    parser.add_argument("--taxa-429", type=float, default=0.0)
+    parser.add_argument("--espera-429", type=float, default=0.1)
+    args = parser.parse_args()
+
+    servidor = ServidorFake(
+        args.porta, args.latencia, args.tokens_por_segundo, args.tokens_resposta, args.taxa_429, args.espera_429
+    ).iniciar()
+    print(f"AZURE_OPENAI_ENDPOINT={servidor.endpoint}")
+    print("AZURE_OPENAI_KEY=fake")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""EmbeddingsEmLote contra o servidor_fake: loops, 429 com backoff e cotas.
+
+    python -m pytest -q test_embeddings_em_lote.py
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from embeddings_em_lote import BaldeDeFichas, EmbeddingsEmLote
+from servidor_fake import ServidorFake
+
+
+@pytest.fixture(scope="module")
+def embeddings():
+    from langchain_openai import AzureOpenAIEmbeddings
+
+    with ServidorFake(latencia=0.0) as servidor:
+        yield EmbeddingsEmLote(
+            AzureOpenAIEmbeddings(
+                api_key="fake",
+                azure_endpoint=servidor.endpoint,
+                azure_deployment="text-embedding-3-large",
+                api_version="2024-08-01-preview",
+                max_retries=0,
+                check_embedding_ctx_length=False,  # sem baixar a tabela do tiktoken
+            ),
+            tamanho_lote=2,
+            requisicoes_por_minuto=6000,
+        )
+
+
+def test_embed_query_duas_vezes_seguidas(embeddings):
+    primeiro = embeddings.embed_query("cartão gold")
+    segundo = embeddings.embed_query("cartão platinum")
+    assert len(primeiro) == len(segundo) > 0
+
+
+def test_embed_documents_repetido(embeddings):
+    for _ in range(2):
+        assert len(embeddings.embed_documents(["a", "b", "c", "d", "e"])) == 5
+
+
+def test_api_assincrona_em_loops_diferentes(embeddings):
+    for _ in range(2):
+        assert asyncio.run(embeddings.aembed_query("seguro viagem"))
+
+
+def test_api_sincrona_com_loop_rodando(embeddings):
+    async def dentro_do_loop():
+        return embeddings.embed_query("compra protegida")
+
+    assert asyncio.run(dentro_do_loop())
+
+
+def _lote(servidor, **opcoes):
+    from langchain_openai import AzureOpenAIEmbeddings
+
+    return EmbeddingsEmLote(
+        AzureOpenAIEmbeddings(
+            api_key="fake",
+            azure_endpoint=servidor.endpoint,
+            azure_deployment="text-embedding-3-large",
+            api_version="2024-08-01-preview",
+            max_retries=0,
+            check_embedding_ctx_length=False,
+        ),
+        **opcoes,
+    )
+
+
+def test_repete_respostas_429_e_conta():
+    with ServidorFake(latencia=0.0, taxa_429=0.4, espera_429=0.01, semente=3) as servidor:
+        lote = _lote(servidor, tamanho_lote=2, concorrencia=2)
+        vetores = lote.embed_documents([f"texto {i}" for i in range(20)])
+        assert len(vetores) == 20
+        assert lote.estatisticas["lotes"] == 10
+        assert lote.estatisticas["respostas_429"] == servidor.contadores["respostas_429"] > 0
+
+
+def test_desiste_depois_de_max_tentativas():
+    with ServidorFake(latencia=0.0, taxa_429=1.0, espera_429=0.01) as servidor:
+        lote = _lote(servidor, max_tentativas=3)
+        with pytest.raises(Exception) as erro:
+            lote.embed_query("sempre 429")
+        assert getattr(erro.value, "status_code", None) == 429
+        assert servidor.contadores["respostas_429"] == 3
+        assert lote.estatisticas["respostas_429"] == 2  # a última tentativa não é repetida
+
+
+def test_backoff_exponencial_sem_retry_after():
+    class LimiteDeTaxa(Exception):
+        status_code = 429
+
+    tentativas = []
+
+    async def chamada(textos):
+        tentativas.append(time.perf_counter())
+        if len(tentativas) <= 3:
+            raise LimiteDeTaxa()
+        return textos
+
+    lote = EmbeddingsEmLote(None, espera_base=0.02)
+    assert asyncio.run(lote._com_cota(chamada, ["a"])) == ["a"]
+    intervalos = [depois - antes for antes, depois in zip(tentativas, tentativas[1:])]
+    # espera_base * 2**tentativa * (1 + aleatório entre 0 e 1)
+    for tentativa, intervalo in enumerate(intervalos):
+        assert 0.02 * 2 ** tentativa <= intervalo < 0.02 * 2 ** (tentativa + 1) + 0.05
+    assert lote.estatisticas["respostas_429"] == 3
+
+
+def test_balde_limita_requisicoes_por_minuto():
+    balde = BaldeDeFichas(600)  # 10 por segundo, começando cheio
+
+    async def consumir(quantidade):
+        inicio = time.perf_counter()
+        for _ in range(quantidade):
+            await balde.consumir(1)
+        return time.perf_counter() - inicio
+
+    assert asyncio.run(consumir(600)) < 0.2  # a rajada inicial cabe na capacidade
+    assert 0.45 <= asyncio.run(consumir(5)) < 0.8  # depois, 5 requisições a 10/s
+
+
+def test_balde_compartilhado_entre_threads():
+    balde = BaldeDeFichas(60)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: balde._reservar(10), range(6)))
+    # 60 fichas reservadas por 4 threads sem perder nenhuma reserva
+    assert balde.fichas == pytest.approx(0.0, abs=0.01)
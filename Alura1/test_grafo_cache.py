@@ -0,0 +1,37 @@
+"""CacheDeNos com nós falsos (sem LangGraph nem modelo):
+
+    python -m pytest -q test_grafo_cache.py
+"""
+import asyncio
+import time
+
+from grafo_cache import CacheDeNos
+
+
+def test_memoiza_por_campos_e_expira_por_no(tmp_path):
+    cache = CacheDeNos(str(tmp_path / "nos.sqlite"))
+    chamadas = []
+
+    @cache.memoizar("rotear", ["query"])
+    async def rotear(estado, config=None):
+        chamadas.append("rotear")
+        return {"destino": "praia"}
+
+    @cache.memoizar("praia", ["query"], ttl=0.05)
+    async def praia(estado, config=None):
+        chamadas.append("praia")
+        return {"resposta": f"sol ({len(chamadas)})"}
+
+    async def rodar(query):
+        estado = {"query": query, "outro": time.time()}  # campos fora da chave não contam
+        return await rotear(estado), await praia(estado)
+
+    primeira = asyncio.run(rodar("praias"))
+    assert asyncio.run(rodar("praias")) == primeira
+    assert chamadas == ["rotear", "praia"]
+
+    time.sleep(0.1)
+    asyncio.run(rodar("praias"))
+    assert chamadas == ["rotear", "praia", "praia"]  # só o nó com ttl expirou
+    assert cache.contadores["rotear"] == {"acertos": 2, "falhas": 1}
+    assert cache.contadores["praia"] == {"acertos": 1, "falhas": 2}
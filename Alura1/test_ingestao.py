@@ -0,0 +1,106 @@
+"""IngestorDeDocumentos sobre um índice em memória, com arquivos de texto no lugar dos PDFs:
+
+    python -m pytest -q test_ingestao.py
+"""
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import carregamento
+from indice import abrir_indice
+from ingestao import IngestorDeDocumentos, arquivos_indexados, expandir
+
+
+class IndiceEmMemoria:
+    """O pedaço da API do Chroma usado pelo ingestor."""
+
+    def __init__(self):
+        self.documentos = {}
+        self.inseridos = 0
+
+    def get(self, where: dict):
+        return {"ids": [i for i, d in self.documentos.items() if d.metadata["source"] == where["source"]]}
+
+    def delete(self, ids: list):
+        for i in ids:
+            self.documentos.pop(i, None)
+
+    def add_documents(self, documentos: list, ids: list):
+        self.inseridos += len(ids)
+        self.documentos.update(zip(ids, documentos))
+
+
+def _pedacos(arquivo, chunk_size=1000, chunk_overlap=200):
+    with open(arquivo, encoding="utf-8") as entrada:
+        for pagina, linha in enumerate(entrada.read().splitlines()):
+            yield Document(page_content=linha, metadata={"source": arquivo, "page": pagina})
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr(carregamento, "pedacos_do_arquivo", _pedacos)
+    monkeypatch.setattr(
+        carregamento, "pedacos_em_paralelo", lambda arquivos, *a, **k: ((x, list(_pedacos(x))) for x in arquivos)
+    )
+    pasta = tmp_path / "documentos"
+    pasta.mkdir()
+    for nome, texto in {"gold.pdf": "a\nb\nc", "platinum.pdf": "d\ne"}.items():
+        (pasta / nome).write_text(texto, encoding="utf-8")
+    avulso = tmp_path / "avulso.pdf"
+    avulso.write_text("x\ny", encoding="utf-8")
+
+    indice = IndiceEmMemoria()
+    diretorio = str(tmp_path / "indice")
+    return indice, diretorio, expandir([str(pasta)]), str(avulso)
+
+
+def test_so_embeda_pedacos_novos(corpus):
+    indice, diretorio, arquivos, _ = corpus
+    ingestor = IngestorDeDocumentos(indice, diretorio)
+    assert ingestor.acompanhar(arquivos) == {"inseridos": 5, "removidos": 0}
+    assert ingestor.acompanhar(arquivos) == {"inseridos": 0, "removidos": 0}
+
+    with open(arquivos[0], "w", encoding="utf-8") as saida:
+        saida.write("a\nb\nnovo")
+    assert IngestorDeDocumentos(indice, diretorio).acompanhar(arquivos) == {"inseridos": 1, "removidos": 1}
+    assert indice.inseridos == 6
+
+
+def test_inicializacao_respeita_adicionar_e_remover(corpus):
+    indice, diretorio, arquivos, avulso = corpus
+    ingestor = IngestorDeDocumentos(indice, diretorio)
+    ingestor.acompanhar(arquivos)
+    ingestor.adicionar(avulso)
+    ingestor.remover(arquivos[0])
+
+    # nova inicialização do main_rag com a mesma pasta
+    IngestorDeDocumentos(indice, diretorio).acompanhar(arquivos)
+    assert arquivos_indexados(diretorio) == sorted([avulso, arquivos[1]])
+    assert {d.metadata["source"] for d in indice.documentos.values()} == {avulso, arquivos[1]}
+
+    # só um adicionar explícito traz o arquivo removido de volta
+    IngestorDeDocumentos(indice, diretorio).adicionar(arquivos[0])
+    assert arquivos[0] in arquivos_indexados(diretorio)
+
+
+def test_sincronizar_remove_o_que_saiu_da_lista(corpus):
+    indice, diretorio, arquivos, avulso = corpus
+    ingestor = IngestorDeDocumentos(indice, diretorio)
+    ingestor.sincronizar(arquivos + [avulso])
+    assert ingestor.sincronizar(arquivos) == {"inseridos": 0, "removidos": 2}
+    assert arquivos_indexados(diretorio) == arquivos
+
+
+def test_expandir_troca_diretorio_pelos_pdfs(corpus, tmp_path):
+    _, _, arquivos, avulso = corpus
+    assert expandir([str(tmp_path / "documentos"), avulso]) == arquivos + [avulso]
+
+
+def test_ingestor_sobre_vetores_compactos(corpus, tmp_path):
+    _, _, arquivos, avulso = corpus
+    diretorio = str(tmp_path / "vetores_db")
+    vetores = abrir_indice(DeterministicFakeEmbedding(size=64), diretorio, backend="compacto")
+    ingestor = IngestorDeDocumentos(vetores, diretorio)
+    assert ingestor.sincronizar(arquivos + [avulso]) == {"inseridos": 7, "removidos": 0}
+    assert ingestor.remover(avulso) == {"inseridos": 0, "removidos": 2}
+    assert sorted(d["source"] for d in vetores.get()["metadatas"]) == sorted([arquivos[0]] * 3 + [arquivos[1]] * 2)
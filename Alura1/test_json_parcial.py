@@ -0,0 +1,92 @@
+"""LeitorJsonIncremental e JsonEmFluxo alimentados com pedaços arbitrários:
+
+    python -m pytest -q test_json_parcial.py
+"""
+import asyncio
+import json
+import random
+
+import pytest
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessageChunk
+
+from json_parcial import JsonEmFluxo, LeitorJsonIncremental
+
+OBJETO = {
+    "cidade": 'Rio "de" Janeiro {centro}, \\ sul',
+    "notas": [1, 2.5, {"a": [True, None]}],
+    "detalhes": {"chave": "}", "lista": ["]", ","]},
+    "dias": -3.2e1,
+    "praia": True,
+    "vazio": None,
+    "acento": "São Paulo ☀",
+}
+TEXTO = "```json\n" + json.dumps(OBJETO, ensure_ascii=False, indent=2) + "\n```\nFim."
+
+
+def _pedacos(texto: str, semente: int) -> list:
+    gerador = random.Random(semente)
+    cortes = sorted(gerador.sample(range(1, len(texto)), k=min(len(texto) - 1, gerador.randint(1, 40))))
+    return [texto[a:b] for a, b in zip([0] + cortes, cortes + [len(texto)])]
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_qualquer_divisao_em_pedacos(semente):
+    leitor = LeitorJsonIncremental()
+    campos = [campo for pedaco in _pedacos(TEXTO, semente) for campo in leitor.alimentar(pedaco)]
+    assert campos == list(OBJETO.items())
+    assert leitor.finalizar() == OBJETO
+
+
+def test_um_caractere_por_vez():
+    leitor = LeitorJsonIncremental()
+    campos = [campo for c in TEXTO for campo in leitor.alimentar(c)]
+    assert campos == list(OBJETO.items())
+
+
+def test_campo_sai_assim_que_fecha():
+    leitor = LeitorJsonIncremental()
+    assert leitor.alimentar('{"a": "x') == []
+    assert leitor.alimentar('y", "b": [1, ') == [("a", "xy")]
+    assert leitor.alimentar("2], ") == [("b", [1, 2])]
+    # número só fecha na vírgula ou no "}" seguinte
+    assert leitor.alimentar('"c": 12') == []
+    assert leitor.alimentar("3}") == [("c", 123)]
+    assert leitor.alimentar(', "depois": 1}') == []
+    assert leitor.finalizar() == {"a": "xy", "b": [1, 2], "c": 123}
+
+
+def test_json_incompleto_ou_invalido():
+    leitor = LeitorJsonIncremental()
+    leitor.alimentar('{"a": 1, "b": "sem fim')
+    with pytest.raises(OutputParserException, match="incompleto"):
+        leitor.finalizar()
+
+    with pytest.raises(OutputParserException, match="'a'"):
+        LeitorJsonIncremental().alimentar('{"a": verdadeiro}')
+
+
+class GeradorFalso:
+    """Só o stream/astream de uma cadeia prompt | llm, em mensagens."""
+
+    def __init__(self, pedacos: list):
+        self.pedacos = pedacos
+
+    def stream(self, entrada, config=None, **kwargs):
+        for pedaco in self.pedacos:
+            yield AIMessageChunk(content=pedaco)
+
+    async def astream(self, entrada, config=None, **kwargs):
+        for pedaco in self.pedacos:
+            await asyncio.sleep(0)
+            yield AIMessageChunk(content=pedaco)
+
+
+def test_json_em_fluxo():
+    cadeia = JsonEmFluxo(GeradorFalso(_pedacos(TEXTO, 0)))
+    assert list(cadeia.stream({})) == [{campo: valor} for campo, valor in OBJETO.items()]
+    assert cadeia.invoke({}) == OBJETO
+    assert asyncio.run(cadeia.ainvoke({})) == OBJETO
+
+    with pytest.raises(OutputParserException):
+        JsonEmFluxo(GeradorFalso(['{"a": 1,'])).invoke({})
@@ -0,0 +1,38 @@
+"""VetoresCompactos com vetores sintéticos e um modelo de embeddings falso:
+
+    python -m pytest -q test_vetores_compactos.py
+"""
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from vetores_compactos import VetoresCompactos
+
+
+@pytest.mark.parametrize("quantizacao", ["float32", "int8"])
+def test_ivf_com_menos_vetores_que_listas(tmp_path, quantizacao):
+    vetores = np.random.default_rng(0).random((5, 128))
+    loja = VetoresCompactos(None, str(tmp_path), dimensao=None, quantizacao=quantizacao, listas=8, sondas=8)
+    loja.construir(vetores, [f"texto {i}" for i in range(5)], ids=[str(i) for i in range(5)])
+
+    for i, vetor in enumerate(vetores):
+        assert loja.buscar_vetor(vetor, k=1)[0][0] == loja._ids.index(str(i))
+    # reaberto do disco, com as listas vazias preservadas
+    assert len(VetoresCompactos(None, str(tmp_path)).get()["ids"]) == 5
+
+
+def test_get_no_formato_do_chroma(tmp_path):
+    loja = VetoresCompactos(DeterministicFakeEmbedding(size=32), str(tmp_path), dimensao=16)
+    loja.add_texts(["a", "b", "c"], [{"source": "x.pdf"}, {"source": "y.pdf"}, {"source": "x.pdf"}], ids=["1", "2", "3"])
+
+    assert loja.get(where={"source": "x.pdf"}) == {
+        "ids": ["1", "3"],
+        "documents": ["a", "c"],
+        "metadatas": [{"source": "x.pdf"}, {"source": "x.pdf"}],
+    }
+    dados = loja.get(ids=["2"], include=["embeddings"])
+    assert list(dados) == ["ids", "embeddings"] and dados["embeddings"].shape == (1, 16)
+    assert np.linalg.norm(dados["embeddings"][0]) == pytest.approx(1, abs=0.02)  # int8 dequantizado
+
+    loja.delete(ids=["1", "3"])
+    assert loja.get(where={"source": "x.pdf"})["ids"] == []
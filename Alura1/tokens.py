@@ -0,0 +1,21 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _codificador():
+    # carregado no primeiro uso: o tiktoken baixa a tabela na primeira vez
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def contar_tokens(texto: str) -> int:
+    """Tokens do texto; sem tiktoken disponível, estima ~4 caracteres por token."""
+
+    codificador = _codificador()
+    if codificador is None:
+        return max(1, len(texto) // 4)
+    return len(codificador.encode(texto))
@@ -0,0 +1,333 @@
+import json
+import os
+import uuid
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+
+def truncar(vetores: np.ndarray, dimensao: int = None) -> np.ndarray:
+    """Corta para as primeiras `dimensao` coordenadas e renormaliza (Matryoshka).
+
+    Os modelos text-embedding-3 concentram a informação nas primeiras
+    dimensões, então o corte preserva boa parte da qualidade.
+    """
+
+    vetores = np.asarray(vetores, dtype=np.float32)
+    if dimensao:
+        vetores = vetores[..., :dimensao]
+    normas = np.linalg.norm(vetores, axis=-1, keepdims=True)
+    return vetores / np.where(normas == 0, 1, normas)
+
+
+def quantizar(vetores: np.ndarray, tipo: str) -> tuple:
+    """Retorna (códigos, escalas). int8 usa uma escala simétrica por vetor."""
+
+    if tipo == "float32":
+        return vetores.astype(np.float32), None
+    if tipo == "float16":
+        return vetores.astype(np.float16), None
+    if tipo == "int8":
+        escalas = np.abs(vetores).max(axis=1) / 127.0
+        escalas[escalas == 0] = 1.0
+        codigos = np.round(vetores / escalas[:, None]).astype(np.int8)
+        return codigos, escalas.astype(np.float32)
+    raise ValueError(f"Quantização desconhecida: {tipo}")
+
+
+def _kmeans(vetores: np.ndarray, grupos: int, iteracoes: int = 15, semente: int = 0) -> np.ndarray:
+    # com menos vetores que listas, cada vetor vira um centróide (as listas restantes ficam vazias)
+    grupos = min(grupos, len(vetores))
+    gerador = np.random.default_rng(semente)
+    amostra = vetores[gerador.choice(len(vetores), size=min(len(vetores), 256 * grupos), replace=False)]
+    centroides = amostra[gerador.choice(len(amostra), size=grupos, replace=False)].copy()
+    for _ in range(iteracoes):
+        rotulos = np.argmax(amostra @ centroides.T, axis=1)
+        for g in range(grupos):
+            membros = amostra[rotulos == g]
+            if len(membros):
+                centroides[g] = membros.mean(axis=0)
+        centroides = truncar(centroides)
+    return centroides
+
+
+class VetoresCompactos(VectorStore):
+    """Vector store local com embeddings truncados, quantizados e memory-mapped.
+
+    - `dimensao`: corte Matryoshka (None mantém todas as dimensões);
+    - `quantizacao`: "float32", "float16" ou "int8";
+    - `listas`: com valor > 0, monta um índice IVF (k-means) e cada busca
+      examina só as `sondas` listas mais próximas; com 0, busca exaustiva.
+
+    Os arrays ficam em arquivos .npy no `diretorio` e são abertos com
+    mmap, então só as páginas tocadas pela busca vão para a memória.
+
+    Com INDICE_BACKEND=compacto, indice.py usa esta classe no lugar do
+    Chroma: cada documento tem um id estável (`delete`, `get_by_ids`) e
+    `get(where=..., include=...)` devolve o mesmo formato do Chroma, o que
+    basta ao IngestorDeDocumentos e ao IndiceBM25. `filter` e `where`
+    aceitam só igualdade de metadados ({"source": ...}); outros argumentos
+    de busca levantam TypeError em vez de serem ignorados.
+    """
+
+    def __init__(
+        self,
+        embedding,
+        diretorio: str,
+        dimensao: int = 1024,
+        quantizacao: str = "int8",
+        listas: int = 0,
+        sondas: int = 8,
+    ):
+        self.embedding = embedding
+        self.diretorio = diretorio
+        self.dimensao = dimensao
+        self.quantizacao = quantizacao
+        self.listas = listas
+        self.sondas = sondas
+        self._codigos = self._escalas = self._centroides = self._inicios = None
+        self._textos, self._metadados, self._ids = [], [], []
+        if os.path.exists(os.path.join(diretorio, "config.json")):
+            self._abrir()
+
+    @property
+    def embeddings(self):
+        return self.embedding
+
+    def _caminho(self, nome: str) -> str:
+        return os.path.join(self.diretorio, nome)
+
+    def _abrir(self):
+        with open(self._caminho("config.json"), encoding="utf-8") as arquivo:
+            config = json.load(arquivo)
+        self.dimensao, self.quantizacao, self.listas = config["dimensao"], config["quantizacao"], config["listas"]
+        self._codigos = np.load(self._caminho("codigos.npy"), mmap_mode="r")
+        if os.path.exists(self._caminho("escalas.npy")):
+            self._escalas = np.load(self._caminho("escalas.npy"), mmap_mode="r")
+        if self.listas:
+            self._centroides = np.load(self._caminho("centroides.npy"))
+            self._inicios = np.load(self._caminho("inicios.npy"))
+        with open(self._caminho("documentos.jsonl"), encoding="utf-8") as arquivo:
+            for posicao, linha in enumerate(arquivo):
+                registro = json.loads(linha)
+                self._textos.append(registro["texto"])
+                self._metadados.append(registro["metadata"])
+                self._ids.append(registro.get("id", str(posicao)))
+
+    def _salvar(self, nome: str, array: np.ndarray):
+        # grava ao lado e troca o arquivo: quem ainda tem o antigo em mmap não é afetado
+        temporario = self._caminho(nome + ".tmp.npy")
+        np.save(temporario, array)
+        os.replace(temporario, self._caminho(nome))
+
+    def _rotulos(self) -> np.ndarray:
+        """Lista IVF de cada posição gravada."""
+
+        return np.repeat(np.arange(self.listas), np.diff(self._inicios))
+
+    def _gravar(self, codigos, escalas, textos: list, metadados: list, ids: list, rotulos=None):
+        """Grava códigos já quantizados; com IVF, reordena pelas listas de `rotulos`."""
+
+        ordem = np.arange(len(codigos))
+        if self.listas:
+            ordem = np.argsort(rotulos, kind="stable")
+            self._salvar("inicios.npy", np.searchsorted(rotulos[ordem], np.arange(self.listas + 1)))
+
+        self._salvar("codigos.npy", np.asarray(codigos)[ordem])
+        if escalas is not None:
+            self._salvar("escalas.npy", np.asarray(escalas)[ordem])
+        elif os.path.exists(self._caminho("escalas.npy")):
+            os.remove(self._caminho("escalas.npy"))
+
+        with open(self._caminho("documentos.jsonl"), "w", encoding="utf-8") as arquivo:
+            for i in ordem:
+                arquivo.write(json.dumps({"id": ids[i], "texto": textos[i], "metadata": metadados[i]}, ensure_ascii=False) + "\n")
+        with open(self._caminho("config.json"), "w", encoding="utf-8") as arquivo:
+            json.dump({"dimensao": self.dimensao, "quantizacao": self.quantizacao, "listas": self.listas}, arquivo)
+
+        self._codigos = self._escalas = self._centroides = self._inicios = None
+        self._textos, self._metadados, self._ids = [], [], []
+        self._abrir()
+
+    def construir(self, vetores, textos: list, metadados: list = None, ids: list = None):
+        """Grava o índice a partir de embeddings já calculados (substitui o conteúdo)."""
+
+        vetores = truncar(vetores, self.dimensao)
+        metadados = metadados or [{} for _ in textos]
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in textos]
+        os.makedirs(self.diretorio, exist_ok=True)
+
+        rotulos = None
+        if self.listas:
+            # IVF: agrupa por centróide e grava as listas contíguas (formato CSR)
+            centroides = _kmeans(vetores, self.listas)
+            rotulos = np.argmax(vetores @ centroides.T, axis=1)
+            self._salvar("centroides.npy", centroides)
+
+        codigos, escalas = quantizar(vetores, self.quantizacao)
+        self._gravar(codigos, escalas, list(textos), list(metadados), ids, rotulos)
+
+    @classmethod
+    def do_chroma(cls, vetores_chroma, diretorio: str, **kwargs) -> "VetoresCompactos":
+        """Converte uma coleção Chroma existente sem chamar o modelo de embeddings."""
+
+        dados = vetores_chroma.get(include=["embeddings", "documents", "metadatas"])
+        loja = cls(vetores_chroma.embeddings, diretorio, **kwargs)
+        loja.construir(np.asarray(dados["embeddings"]), dados["documents"], dados["metadatas"], dados["ids"])
+        return loja
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs) -> list:
+        """Quantiza só os vetores novos; os já gravados mantêm os códigos (e a lista IVF).
+
+        Os centróides não são recalculados: depois de muitas inclusões, vale
+        reconstruir o índice com `construir`.
+        """
+
+        textos = list(texts)
+        if not textos:
+            return []
+        metadados = list(metadatas) if metadatas else [{} for _ in textos]
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in textos]
+        repetidos = set(ids) & set(self._ids)
+        if repetidos:
+            raise ValueError(f"Ids já existentes: {sorted(repetidos)[:5]}")
+        novos = truncar(self.embedding.embed_documents(textos), self.dimensao)
+        if self._codigos is None or not len(self._textos):
+            self.construir(novos, textos, metadados, ids)
+            return ids
+
+        codigos, escalas = quantizar(novos, self.quantizacao)
+        rotulos = None
+        if self.listas:
+            rotulos = np.concatenate([self._rotulos(), np.argmax(novos @ self._centroides.T, axis=1)])
+        self._gravar(
+            np.concatenate([self._codigos, codigos]),
+            None if escalas is None else np.concatenate([self._escalas, escalas]),
+            self._textos + textos,
+            self._metadados + metadados,
+            self._ids + ids,
+            rotulos,
+        )
+        return ids
+
+    def delete(self, ids: list = None, **kwargs) -> bool:
+        if kwargs:
+            raise TypeError(f"Argumentos não suportados: {', '.join(kwargs)}")
+        remover = set(ids or [])
+        manter = np.array([i not in remover for i in self._ids], dtype=bool)
+        if manter.all():
+            return False
+        self._gravar(
+            np.asarray(self._codigos)[manter],
+            None if self._escalas is None else np.asarray(self._escalas)[manter],
+            [t for t, m in zip(self._textos, manter) if m],
+            [d for d, m in zip(self._metadados, manter) if m],
+            [i for i, m in zip(self._ids, manter) if m],
+            self._rotulos()[manter] if self.listas else None,
+        )
+        return True
+
+    def _documento(self, posicao: int) -> Document:
+        return Document(page_content=self._textos[posicao], metadata=self._metadados[posicao], id=self._ids[posicao])
+
+    def _vetores(self, posicoes) -> np.ndarray:
+        """Embeddings gravados (truncados e dequantizados) das posições."""
+
+        if self._codigos is None:
+            return np.empty((0, self.dimensao or 0), dtype=np.float32)
+        vetores = np.asarray(self._codigos[posicoes], dtype=np.float32)
+        if self._escalas is not None:
+            vetores *= np.asarray(self._escalas[posicoes])[:, None]
+        return vetores
+
+    def get(self, ids: list = None, where: dict = None, include=("documents", "metadatas")) -> dict:
+        """Mesmo formato do `get` do Chroma: "ids" e as chaves pedidas em `include`.
+
+        Os "embeddings" devolvidos são os gravados, já truncados e
+        quantizados, não os originais do modelo.
+        """
+
+        permitidos = self._permitidos(where)
+        posicoes = np.arange(len(self._ids)) if permitidos is None else np.flatnonzero(permitidos)
+        if ids is not None:
+            pedidos = set(ids)
+            posicoes = np.array([p for p in posicoes if self._ids[p] in pedidos], dtype=int)
+        dados = {"ids": [self._ids[p] for p in posicoes]}
+        if "documents" in include:
+            dados["documents"] = [self._textos[p] for p in posicoes]
+        if "metadatas" in include:
+            dados["metadatas"] = [self._metadados[p] for p in posicoes]
+        if "embeddings" in include:
+            dados["embeddings"] = self._vetores(posicoes)
+        return dados
+
+    def get_by_ids(self, ids) -> list:
+        posicoes = {id_: posicao for posicao, id_ in enumerate(self._ids)}
+        return [self._documento(posicoes[i]) for i in ids if i in posicoes]
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, diretorio: str = "vetores_compactos", **kwargs):
+        loja = cls(embedding, diretorio, **kwargs)
+        loja.add_texts(texts, metadatas)
+        return loja
+
+    def _candidatos(self, consulta: np.ndarray) -> list:
+        """Faixas contíguas [início, fim) a examinar: tudo, ou as listas IVF mais próximas."""
+
+        if not self.listas:
+            return [(0, len(self._textos))]
+        sondas = np.argsort(-(self._centroides @ consulta))[:self.sondas]
+        return [(int(self._inicios[g]), int(self._inicios[g + 1])) for g in sondas]
+
+    def _permitidos(self, filtro: dict):
+        """Máscara das posições cujos metadados batem com `filtro` (só igualdade)."""
+
+        if not filtro:
+            return None
+        if any(chave.startswith("$") or isinstance(valor, dict) for chave, valor in filtro.items()):
+            raise ValueError(f"Só filtros de igualdade são suportados: {filtro}")
+        return np.array(
+            [all(metadados.get(chave) == valor for chave, valor in filtro.items()) for metadados in self._metadados],
+            dtype=bool,
+        )
+
+    def buscar_vetor(self, vetor, k: int = 4, filtro: dict = None) -> list:
+        """Pares (posição, similaridade de cosseno) dos k vizinhos mais próximos.
+
+        Com `filtro` e IVF, só as listas sondadas são filtradas: poucos
+        documentos permitidos podem devolver menos de k resultados.
+        """
+
+        if self._codigos is None or not len(self._textos):
+            return []
+        consulta = truncar(vetor, self.dimensao)
+        faixas = self._candidatos(consulta)
+        candidatos = np.concatenate([np.arange(inicio, fim) for inicio, fim in faixas])
+        # Fatias contíguas do mmap; a conversão para float32 deixa o produto com o BLAS
+        notas = np.concatenate([
+            np.asarray(self._codigos[inicio:fim], dtype=np.float32) @ consulta for inicio, fim in faixas
+        ])
+        if self._escalas is not None:
+            notas *= np.concatenate([self._escalas[inicio:fim] for inicio, fim in faixas])
+        permitidos = self._permitidos(filtro)
+        if permitidos is not None:
+            candidatos, notas = candidatos[permitidos[candidatos]], notas[permitidos[candidatos]]
+        k = min(k, len(candidatos))
+        if not k:
+            return []
+        melhores = np.argpartition(-notas, k - 1)[:k]
+        melhores = melhores[np.argsort(-notas[melhores])]
+        return [(int(candidatos[i]), float(notas[i])) for i in melhores]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: dict = None, **kwargs) -> list:
+        if kwargs:
+            raise TypeError(f"Argumentos de busca não suportados: {', '.join(kwargs)}")
+        vetor = self.embedding.embed_query(query)
+        return [(self._documento(i), nota) for i, nota in self.buscar_vetor(vetor, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, filter: dict = None, **kwargs) -> list:
+        return [documento for documento, _ in self.similarity_search_with_score(query, k, filter, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return lambda nota: (nota + 1) / 2
@@ -0,0 +1,8 @@
+# _raiz.py
+"""Põe a raiz do repositório no sys.path, para importar o pacote `comum`."""
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.append(RAIZ)
@@ -1,31 +1,97 @@
 # agente.py
-from langchain_openai import AzureChatOpenAI
+from clientes import obter_llm
 from estudante import DadosDeEstudante, PerfilAcademico
-from universidade import DadosDeUniversidade, TodasUniversidades
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-api_key = os.getenv("AZURE_OPENAI_KEY")
-endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+from universidade import ChancesDeAdmissao, DadosDeUniversidade, TodasUniversidades
+from executor import ExecutorDeFerramentas
+from contexto import OrcamentoDeContexto, tokens_da_mensagem
+from langchain_core.messages import HumanMessage
 
 class AgenteOpenAIFunctions:
     def __init__(self):
         
-        self.llm = AzureChatOpenAI(
-            api_key=api_key,
-            azure_endpoint=endpoint,
-            azure_deployment="gpt-4o-mini",
-            api_version="2024-08-01-preview",
-            verbose=True,
-        )
+        # mesmo cliente (e pool de conexões) usado pelas ferramentas
+        self.llm = obter_llm()
 
         # instância da ferramenta
         self.dados_de_estudante = DadosDeEstudante()
         self.perfil_academico = PerfilAcademico()
         self.dados_da_universidade = DadosDeUniversidade()
         self.todas_universidades = TodasUniversidades()
+        self.chances_de_admissao = ChancesDeAdmissao()
+
+        # registro nome -> ferramenta, usado pelo executor das tool_calls
+        from comum.instrumentacao import instrumentar
+
+        self.ferramentas = {
+            ferramenta.name: instrumentar(ferramenta)
+            for ferramenta in [self.dados_de_estudante, self.perfil_academico, self.dados_da_universidade, self.todas_universidades, self.chances_de_admissao]
+        }
+        self.executor = ExecutorDeFerramentas(self.ferramentas, timeouts={"PerfilAcademico": 90.0})
 
         # registra a ferramenta no modelo
-        self.llm_com_tools = self.llm.bind_tools([self.dados_de_estudante, self.perfil_academico, self.dados_da_universidade, self.todas_universidades])
+        self.llm_com_tools = self.llm.bind_tools(list(self.ferramentas.values()))
+
+    def executar(self, pergunta: str, max_passos: int = 5, orcamento: OrcamentoDeContexto = None) -> dict:
+        """Alterna modelo e ferramentas até uma resposta final ou `max_passos` rodadas.
+
+        Retorna a resposta, as chamadas de ferramentas de cada passo e os
+        tokens de prompt enviados ao modelo.
+        """
+
+        orcamento = orcamento or OrcamentoDeContexto()
+        mensagens = [HumanMessage(content=pergunta)]
+        passos = []
+        tokens_prompt = 0
+
+        for _ in range(max_passos):
+            enviadas = orcamento.ajustar(mensagens)
+            tokens_prompt += sum(tokens_da_mensagem(m) for m in enviadas)
+            resposta = self.llm_com_tools.invoke(enviadas, tool_choice="auto")
+            mensagens.append(resposta)
+
+            if not resposta.tool_calls:
+                return {"resposta": resposta.content, "passos": passos, "tokens_prompt": tokens_prompt}
+
+            itens = self.executor.executar(resposta.tool_calls)
+            passos.append(itens)
+            for item in itens:
+                conteudo = f"Erro: {item['erro']}" if item["erro"] else item["resultado"]
+                mensagens.append(orcamento.mensagem_de_ferramenta(conteudo, item["id"]))
+
+        # limite de passos atingido: força uma resposta com o que já foi coletado
+        enviadas = orcamento.ajustar(mensagens)
+        tokens_prompt += sum(tokens_da_mensagem(m) for m in enviadas)
+        resposta = self.llm_com_tools.invoke(enviadas, tool_choice="none")
+        return {"resposta": resposta.content, "passos": passos, "tokens_prompt": tokens_prompt}
+
+    async def aexecutar(self, pergunta: str, max_passos: int = 5, orcamento: OrcamentoDeContexto = None) -> dict:
+        """Versão assíncrona de `executar`, com `ainvoke` e as ferramentas via `_arun`.
+
+        Não bloqueia o event loop, então várias sessões podem rodar no mesmo
+        processo; cancelar a tarefa interrompe a chamada em andamento.
+        """
+
+        orcamento = orcamento or OrcamentoDeContexto()
+        mensagens = [HumanMessage(content=pergunta)]
+        passos = []
+        tokens_prompt = 0
+
+        for _ in range(max_passos):
+            enviadas = orcamento.ajustar(mensagens)
+            tokens_prompt += sum(tokens_da_mensagem(m) for m in enviadas)
+            resposta = await self.llm_com_tools.ainvoke(enviadas, tool_choice="auto")
+            mensagens.append(resposta)
+
+            if not resposta.tool_calls:
+                return {"resposta": resposta.content, "passos": passos, "tokens_prompt": tokens_prompt}
+
+            itens = await self.executor.aexecutar(resposta.tool_calls)
+            passos.append(itens)
+            for item in itens:
+                conteudo = f"Erro: {item['erro']}" if item["erro"] else item["resultado"]
+                mensagens.append(orcamento.mensagem_de_ferramenta(conteudo, item["id"]))
+
+        enviadas = orcamento.ajustar(mensagens)
+        tokens_prompt += sum(tokens_da_mensagem(m) for m in enviadas)
+        resposta = await self.llm_com_tools.ainvoke(enviadas, tool_choice="none")
+        return {"resposta": resposta.content, "passos": passos, "tokens_prompt": tokens_prompt}
@@ -0,0 +1,123 @@
+# bench_clientes.py
+"""Compara o custo por chamada de montar cliente/cadeia a cada uso x registro compartilhado.
+
+Sobe um servidor local que imita o endpoint de chat do Azure OpenAI, então
+roda sem credenciais:
+
+    python bench_clientes.py --chamadas 200
+"""
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPOSTA = json.dumps({
+    "id": "bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": '{"estudante": "ana"}'},
+        "finish_reason": "stop",
+    }],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}).encode()
+
+
+class _Servidor(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # permite keep-alive
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPOSTA)))
+        self.end_headers()
+        self.wfile.write(RESPOSTA)
+
+    def log_message(self, *args):
+        pass
+
+
+def _medir(funcao, chamadas: int) -> list:
+    tempos = []
+    for _ in range(chamadas):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def _resumo(nome: str, tempos: list):
+    tempos = sorted(tempos)
+    p99 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.99))]
+    print(f"{nome:<38} média {statistics.mean(tempos):7.2f} ms | p50 {statistics.median(tempos):7.2f} ms | p99 {p99:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chamadas", type=int, default=200)
+    args = parser.parse_args()
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Servidor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    os.environ["AZURE_OPENAI_KEY"] = "bench"
+    os.environ["AZURE_OPENAI_ENDPOINT"] = f"http://127.0.0.1:{servidor.server_port}"
+
+    from langchain_core.globals import set_llm_cache
+    from langchain_openai import AzureChatOpenAI
+    from langchain_core.output_parsers import JsonOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+    from clientes import obter_llm
+    from estudante import ExtratorDeEstudante, cadeia_extrator_de_estudante
+
+    obter_llm()  # o primeiro cliente liga o cache global...
+    set_llm_cache(None)  # ...que é desligado: o benchmark mede o caminho até o modelo
+
+    template = """
+            Analise o texto abaixo e extraia o nome do estudante.
+            Retorne no formato JSON exigido.
+
+            Texto: {input}
+
+            Formato de saída:
+            {formato_saida}
+            """
+
+    def montar_por_chamada():
+        llm = AzureChatOpenAI(
+            api_key=os.environ["AZURE_OPENAI_KEY"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            azure_deployment="gpt-4o-mini",
+            api_version="2024-08-01-preview",
+        )
+        parser = JsonOutputParser(pydantic_object=ExtratorDeEstudante)
+        prompt = ChatPromptTemplate.from_template(template)
+        return prompt | llm | parser, parser
+
+    def chamada_antiga():
+        chain, parser = montar_por_chamada()
+        chain.invoke({"input": "Quais os dados da Ana?", "formato_saida": parser.get_format_instructions()})
+
+    def chamada_compartilhada():
+        cadeia_extrator_de_estudante().invoke({"input": "Quais os dados da Ana?"})
+
+    # aquecimento: imports preguiçosos e primeira conexão
+    chamada_antiga()
+    chamada_compartilhada()
+
+    print(f"{args.chamadas} chamadas contra servidor local\n")
+    _resumo("só montagem (por chamada)", _medir(montar_por_chamada, args.chamadas))
+    _resumo("só montagem (registro)", _medir(cadeia_extrator_de_estudante, args.chamadas))
+    _resumo("chamada completa (por chamada)", _medir(chamada_antiga, args.chamadas))
+    _resumo("chamada completa (registro)", _medir(chamada_compartilhada, args.chamadas))
+
+    servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+# bench_importacao.py
+"""Tempo de importação dos módulos do Alura2 (ver comum/bench_importacao.py):
+
+    python bench_importacao.py
+    python bench_importacao.py agente dados --repeticoes 5 --top 15
+
+Importar não deve ler .env, CSV nem montar clientes.
+"""
+import os
+
+import _raiz  # noqa: F401
+from comum.bench_importacao import main
+
+MODULOS = ["agente", "estudante", "universidade", "clientes", "dados", "main2"]
+
+if __name__ == "__main__":
+    main(MODULOS, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,73 @@
+# bench_pontuacao.py
+"""Custo do ranking de admissão: tokens entregues ao modelo e tempo da matriz.
+
+Compara o que o agente recebe de TodasUniversidades (todas as linhas) com o
+top-k do ChancesDeAdmissao, e mede a matriz estudantes x universidades para
+coortes sintéticas maiores que os CSVs:
+
+    python bench_pontuacao.py --estudantes 1000 10000 --universidades 500
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from contexto import contar_tokens
+from pontuacao import motor_de_admissao, pontuar, top_k
+from universidade import busca_dados_das_universidades
+
+
+def coorte_sintetica(estudantes: int, universidades: int, gerador) -> tuple:
+    """Vetores aleatórios com as mesmas dimensões que o motor monta a partir dos CSVs."""
+
+    disciplinas, idiomas, paises, areas = 9, 2, 6, 5
+    lado_estudantes = {
+        "notas": gerador.integers(0, 11, (estudantes, disciplinas)).astype(np.float32) / 10.0,
+        "idiomas": gerador.uniform(5.0, 9.0, (estudantes, idiomas)).astype(np.float32),
+        "paises": (gerador.random((estudantes, paises)) < 0.4).astype(np.float32),
+        "universidades": (gerador.random((estudantes, universidades)) < 3 / universidades).astype(np.float32),
+        "areas": (gerador.random((estudantes, areas)) < 0.4).astype(np.float32),
+    }
+    requisitos = gerador.random((universidades, disciplinas)).astype(np.float32)
+    afinidade = gerador.random((universidades, areas)).astype(np.float32)
+    lado_universidades = {
+        "requisitos": requisitos / requisitos.sum(axis=1, keepdims=True),
+        "idiomas": np.where(gerador.random((universidades, idiomas)) < 0.5, 6.5, 0.0).astype(np.float32),
+        "paises": np.eye(paises, dtype=np.float32)[gerador.integers(0, paises, universidades)],
+        "areas": afinidade / afinidade.sum(axis=1, keepdims=True),
+    }
+    return lado_estudantes, lado_universidades
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--estudantes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--universidades", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    todas = json.dumps(busca_dados_das_universidades(), ensure_ascii=False)
+    ranking = json.dumps(motor_de_admissao.ranking("ana", args.k), ensure_ascii=False)
+    print(f"Tokens para o modelo: TodasUniversidades {contar_tokens(todas)} | ChancesDeAdmissao (top {args.k}) {contar_tokens(ranking)}")
+
+    inicio = time.perf_counter()
+    motor_de_admissao.coorte(k=args.k)
+    print(f"Coorte dos CSVs (matriz já montada): {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+    gerador = np.random.default_rng(0)
+    for estudantes in args.estudantes:
+        lado_estudantes, lado_universidades = coorte_sintetica(estudantes, args.universidades, gerador)
+        inicio = time.perf_counter()
+        pontuacoes, _ = pontuar(lado_estudantes, lado_universidades)
+        meio = time.perf_counter()
+        top_k(pontuacoes, args.k)
+        fim = time.perf_counter()
+        print(
+            f"{estudantes:>7} x {args.universidades} universidades: matriz {(meio - inicio) * 1000:8.1f} ms | "
+            f"top-{args.k} {(fim - meio) * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
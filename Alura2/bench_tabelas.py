@@ -0,0 +1,92 @@
+# bench_tabelas.py
+"""Carga das tabelas: CSV com pandas x formato colunar (colunar.py).
+
+Gera um estudantes.csv sintético com `--linhas` linhas (repetindo os
+estudantes reais com nomes únicos), compila para o formato colunar e mede,
+cada lado num interpretador novo, o tempo até a primeira busca, uma
+projeção de três colunas e o pico de memória (RSS):
+
+    python bench_tabelas.py --linhas 200000
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+MEDICAO = r"""
+import json, resource, sys, time
+inicio = time.perf_counter()
+from dados import Tabela
+tabela = Tabela(sys.argv[1], "USUARIO")
+tabela.buscar("ana_1")
+busca = time.perf_counter()
+notas = tabela.coluna("SCORE_MATEMATICA"), tabela.coluna("PROEFICIENCIA_INGLES"), tabela.coluna("LISTA_PAISES_PREFERIDOS")
+projecao = time.perf_counter()
+print(json.dumps({
+    "busca": busca - inicio,
+    "projecao": projecao - busca,
+    "memoria_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "fonte": type(tabela._fonte).__name__,
+}))
+"""
+
+
+def gerar_csv(destino: str, linhas: int):
+    with open(os.path.join(RAIZ, "documentos", "estudantes.csv"), encoding="utf-8") as arquivo:
+        leitor = csv.reader(arquivo)
+        cabecalho = next(leitor)
+        modelos = list(leitor)
+    usuario = cabecalho.index("USUARIO")
+    with open(destino, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(cabecalho)
+        for numero in range(linhas):
+            linha = list(modelos[numero % len(modelos)])
+            linha[usuario] = f"{linha[usuario]}_{numero // len(modelos)}"
+            escritor.writerow(linha)
+
+
+def medir(caminho: str) -> dict:
+    processo = subprocess.run(
+        [sys.executable, "-c", MEDICAO, caminho],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1])
+    return json.loads(processo.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporario:
+        caminho = os.path.join(temporario, "estudantes.csv")
+        gerar_csv(caminho, args.linhas)
+        print(f"CSV sintético: {args.linhas} linhas, {os.path.getsize(caminho) / 2**20:.1f} MiB")
+
+        resultados = {"csv": medir(caminho)}
+        # compila noutro processo: o pico de memória (ru_maxrss) passa para os filhos
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "colunar.py", caminho], cwd=RAIZ, check=True, capture_output=True)
+        print(f"Compilação: {time.perf_counter() - inicio:.2f} s")
+        resultados["colunar"] = medir(caminho)
+
+    for nome, r in resultados.items():
+        print(
+            f"{nome:<8} ({r['fonte']}): 1ª busca {r['busca'] * 1000:8.1f} ms | "
+            f"projeção de 3 colunas {r['projecao'] * 1000:7.1f} ms | pico {r['memoria_mb']:6.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# clientes.py
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import _raiz  # noqa: F401
+from comum.configuracao import configuracao
+
+if TYPE_CHECKING:
+    from langchain_openai import AzureChatOpenAI
+    from comum.http_async import ClienteAsyncPorLoop
+
+# Conexões HTTP mantidas abertas e reaproveitadas entre chamadas
+LIMITES_HTTP = {"max_connections": 100, "max_keepalive_connections": 20, "keepalive_expiry": 60}
+
+
+@lru_cache(maxsize=None)
+def _preparar():
+    # cache e métricas são ligados junto com o primeiro cliente, não na importação
+    from comum.cache_llm import ativar_cache
+    from comum.instrumentacao import ativar_instrumentacao
+
+    # Respostas repetidas saem do cache local em vez de ir de novo ao modelo
+    cache = ativar_cache()
+
+    # Métricas de latência e tokens, ligadas por METRICAS_PORTA ou METRICAS_ARQUIVO
+    ativar_instrumentacao(fontes={"cache_llm": cache.estatisticas})
+
+
+@lru_cache(maxsize=None)
+def obter_llm(deployment: str = "gpt-4o-mini", api_version: str = "2024-08-01-preview") -> "AzureChatOpenAI":
+    """Cliente único por deployment, compartilhado por agente e ferramentas."""
+
+    import httpx
+    from langchain_openai import AzureChatOpenAI
+    from comum.http_async import ClienteAsyncPorLoop
+    from comum.instrumentacao import instrumentar
+
+    _preparar()
+    api_key, endpoint = configuracao.credenciais()
+    return instrumentar(AzureChatOpenAI(
+        api_key=api_key,
+        azure_endpoint=endpoint,
+        azure_deployment=deployment,
+        api_version=api_version,
+        http_client=httpx.Client(limits=httpx.Limits(**LIMITES_HTTP), timeout=60),
+        http_async_client=ClienteAsyncPorLoop(limits=httpx.Limits(**LIMITES_HTTP), timeout=60),
+    ))
+
+
+def cadeia_json(template: str, modelo, variavel_formato: str = "formato_saida"):
+    """Monta prompt | llm | parser com as instruções de formato já preenchidas."""
+
+    from langchain_core.output_parsers import JsonOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+
+    parser = JsonOutputParser(pydantic_object=modelo)
+    prompt = ChatPromptTemplate.from_template(template).partial(
+        **{variavel_formato: parser.get_format_instructions()}
+    )
+    return prompt | obter_llm() | parser
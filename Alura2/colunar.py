@@ -0,0 +1,160 @@
+# colunar.py
+"""Formato colunar das tabelas: um .npy por coluna, aberto com mmap.
+
+`compilar` converte um CSV num diretório `<nome>.colunar/` ao lado dele:
+
+- colunas numéricas viram um .npy com o dtype original;
+- colunas de texto viram códigos int32 + dicionário de valores (categoria);
+- colunas de lista (repr "['a', 'b']" no CSV) viram códigos + dicionário
+  das listas distintas, sem nenhum repr para reinterpretar depois (as
+  preferências se repetem muito entre estudantes).
+
+Rode uma vez (ou sempre que um CSV mudar):
+
+    python colunar.py documentos/estudantes.csv documentos/universidades.csv
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from dados import ler_csv
+
+ESQUEMA = "esquema.json"
+
+
+def diretorio_colunar(caminho_csv: str) -> str:
+    return os.path.splitext(caminho_csv)[0] + ".colunar"
+
+
+def _codificar(valores: list) -> tuple:
+    """(códigos int32, dicionário) com -1 para valores ausentes."""
+
+    dicionario, codigos = {}, np.empty(len(valores), dtype=np.int32)
+    for posicao, valor in enumerate(valores):
+        codigos[posicao] = -1 if valor is None else dicionario.setdefault(valor, len(dicionario))
+    return codigos, list(dicionario)
+
+
+def compilar(caminho_csv: str, destino: str = None) -> str:
+    """Converte o CSV para o formato colunar e retorna o diretório gerado."""
+
+    import pandas as pd
+
+    destino = destino or diretorio_colunar(caminho_csv)
+    os.makedirs(destino, exist_ok=True)
+    dados = ler_csv(caminho_csv)
+
+    colunas = {}
+    for numero, nome in enumerate(dados.columns):
+        serie = dados[nome]
+        arquivo = f"c{numero:03d}"  # nomes de coluna podem ter caracteres ruins para arquivo
+        if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+            np.save(os.path.join(destino, arquivo + ".npy"), serie.to_numpy())
+            colunas[nome] = {"tipo": "numero", "arquivo": arquivo}
+            continue
+
+        valores = [None if v is None or v != v else v for v in serie.tolist()]  # NaN -> None
+        if any(isinstance(v, list) for v in valores):
+            codigos, dicionario = _codificar([None if v is None else tuple(v) for v in valores])
+            dicionario = [list(item) for item in dicionario]
+            tipo = "lista"
+        else:
+            codigos, dicionario = _codificar([None if v is None else str(v) for v in valores])
+            tipo = "categoria"
+        np.save(os.path.join(destino, arquivo + ".npy"), codigos)
+        with open(os.path.join(destino, arquivo + ".json"), "w", encoding="utf-8") as saida:
+            json.dump(dicionario, saida, ensure_ascii=False)
+        colunas[nome] = {"tipo": tipo, "arquivo": arquivo}
+
+    # o esquema é escrito por último: um diretório sem ele nunca é lido pela metade
+    with open(os.path.join(destino, ESQUEMA), "w", encoding="utf-8") as saida:
+        json.dump(
+            {"origem_mtime_ns": os.stat(caminho_csv).st_mtime_ns, "linhas": len(dados), "colunas": colunas},
+            saida,
+            ensure_ascii=False,
+        )
+    return destino
+
+
+def atualizado(caminho_csv: str) -> bool:
+    """Há uma versão colunar gerada a partir do CSV atual (ou o CSV nem existe)."""
+
+    try:
+        with open(os.path.join(diretorio_colunar(caminho_csv), ESQUEMA), encoding="utf-8") as arquivo:
+            origem = json.load(arquivo)["origem_mtime_ns"]
+    except FileNotFoundError:
+        return False
+    return not os.path.exists(caminho_csv) or os.stat(caminho_csv).st_mtime_ns == origem
+
+
+class TabelaColunar:
+    """Leitura de um diretório gerado por `compilar`.
+
+    Cada coluna só é aberta quando pedida (projeção) e os arrays vêm com
+    mmap_mode="r", então abrir a tabela não copia nada para a memória.
+    """
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, ESQUEMA), encoding="utf-8") as arquivo:
+            esquema = json.load(arquivo)
+        self._esquema = esquema["colunas"]
+        self.colunas = list(self._esquema)
+        self.linhas = esquema["linhas"]
+        self._abertas = {}
+
+    def __len__(self):
+        return self.linhas
+
+    def _abrir(self, nome: str) -> tuple:
+        """(tipo, códigos ou valores, dicionário) da coluna, aberta uma vez."""
+
+        if nome not in self._abertas:
+            info = self._esquema[nome]
+            base = os.path.join(self.diretorio, info["arquivo"])
+            codigos = np.load(base + ".npy", mmap_mode="r")
+            dicionario = None
+            if info["tipo"] != "numero":
+                with open(base + ".json", encoding="utf-8") as arquivo:
+                    itens = json.load(arquivo)
+                # o último item atende o código -1 (ausente); listas iguais não viram uma matriz 2D
+                dicionario = np.empty(len(itens) + 1, dtype=object)
+                dicionario[:-1] = itens
+                dicionario[-1] = [] if info["tipo"] == "lista" else None
+            self._abertas[nome] = (info["tipo"], codigos, dicionario)
+        return self._abertas[nome]
+
+    def coluna(self, nome: str) -> np.ndarray:
+        """Coluna inteira: array numérico (mmap), de textos ou de listas.
+
+        Linhas com a mesma lista compartilham o objeto: trate como somente leitura.
+        """
+
+        tipo, codigos, dicionario = self._abrir(nome)
+        return codigos if tipo == "numero" else dicionario[codigos]
+
+    def valor(self, nome: str, posicao: int):
+        """Uma célula, decodificando só ela."""
+
+        tipo, codigos, dicionario = self._abrir(nome)
+        if tipo == "numero":
+            return codigos[posicao].item()
+        valor = dicionario[codigos[posicao]]
+        return list(valor) if tipo == "lista" else valor
+
+    def linha(self, posicao: int) -> dict:
+        return {nome: self.valor(nome, posicao) for nome in self.colunas}
+
+    def registros(self) -> list:
+        colunas = [self.coluna(nome).tolist() for nome in self.colunas]
+        return [dict(zip(self.colunas, valores)) for valores in zip(*colunas)]
+
+
+if __name__ == "__main__":
+    for caminho in sys.argv[1:] or ["documentos/estudantes.csv", "documentos/universidades.csv"]:
+        inicio = time.perf_counter()
+        destino = compilar(caminho)
+        print(f"{caminho} -> {destino} ({(time.perf_counter() - inicio) * 1000:.0f} ms)")
@@ -0,0 +1,101 @@
+# contexto.py
+import json
+from functools import lru_cache
+
+from langchain_core.messages import ToolMessage
+
+OMITIDO = "[resultado omitido: limite de contexto atingido]"
+
+
+@lru_cache(maxsize=None)
+def _codificador():
+    # carregado no primeiro uso: o tiktoken baixa a tabela na primeira vez
+    # sem a tabela (ex.: máquina sem rede), conta por estimativa de ~4 caracteres por token
+    import tiktoken
+
+    for nome in ("o200k_base", "cl100k_base"):  # gpt-4o / gpt-4o-mini, depois o anterior
+        try:
+            return tiktoken.get_encoding(nome)
+        except Exception:
+            continue
+    return None
+
+
+def contar_tokens(texto: str) -> int:
+    codificador = _codificador()
+    if codificador is None:
+        return max(1, len(texto) // 4)
+    return len(codificador.encode(texto))
+
+
+def serializar(resultado) -> str:
+    if isinstance(resultado, str):
+        return resultado
+    return json.dumps(resultado, ensure_ascii=False, default=str)
+
+
+def truncar(resultado, max_tokens: int) -> str:
+    """Serializa o resultado de uma ferramenta cabendo em `max_tokens`.
+
+    Listas são cortadas em registros inteiros, com uma nota de quantos
+    ficaram de fora; o resto é cortado no limite de tokens.
+    """
+
+    if isinstance(resultado, list):
+        partes, usados = [], 2
+        for item in resultado:
+            texto = serializar(item)
+            custo = contar_tokens(texto) + 1
+            if usados + custo > max_tokens:
+                break
+            partes.append(texto)
+            usados += custo
+        texto = "[" + ",".join(partes) + "]"
+        if len(partes) < len(resultado):
+            texto += f"\n({len(resultado) - len(partes)} de {len(resultado)} registros omitidos)"
+        return texto
+
+    texto = serializar(resultado)
+    codificador = _codificador()
+    if codificador is None:
+        return texto if len(texto) <= 4 * max_tokens else texto[:4 * max_tokens] + " …[truncado]"
+    tokens = codificador.encode(texto)
+    if len(tokens) <= max_tokens:
+        return texto
+    return codificador.decode(tokens[:max_tokens]) + " …[truncado]"
+
+
+def tokens_da_mensagem(mensagem) -> int:
+    total = contar_tokens(serializar(mensagem.content))
+    for call in getattr(mensagem, "tool_calls", None) or []:
+        total += contar_tokens(call.get("name", "")) + contar_tokens(serializar(call.get("args", {})))
+    return total + 4  # papel e separadores
+
+
+class OrcamentoDeContexto:
+    """Limita os tokens enviados ao modelo em cada passo do agente.
+
+    Cada resultado de ferramenta entra com no máximo `max_tokens_por_ferramenta`;
+    se o histórico inteiro passar de `max_tokens`, os resultados mais antigos
+    são substituídos por um aviso curto (a mensagem continua existindo, pois a
+    API exige uma resposta para cada tool_call).
+    """
+
+    def __init__(self, max_tokens: int = 6000, max_tokens_por_ferramenta: int = 1500):
+        self.max_tokens = max_tokens
+        self.max_tokens_por_ferramenta = max_tokens_por_ferramenta
+
+    def mensagem_de_ferramenta(self, resultado, tool_call_id: str) -> ToolMessage:
+        return ToolMessage(content=truncar(resultado, self.max_tokens_por_ferramenta), tool_call_id=tool_call_id)
+
+    def ajustar(self, mensagens: list) -> list:
+        mensagens = list(mensagens)
+        total = sum(tokens_da_mensagem(m) for m in mensagens)
+        for i, mensagem in enumerate(mensagens):
+            if total <= self.max_tokens:
+                break
+            if isinstance(mensagem, ToolMessage) and mensagem.content != OMITIDO:
+                total -= tokens_da_mensagem(mensagem)
+                mensagens[i] = ToolMessage(content=OMITIDO, tool_call_id=mensagem.tool_call_id)
+                total += tokens_da_mensagem(mensagens[i])
+        return mensagens
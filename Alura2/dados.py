@@ -0,0 +1,172 @@
+# dados.py
+import ast
+import asyncio
+import os
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def lista(valor) -> list:
+    """Lista de textos a partir de uma lista, de um repr "['a', 'b']" ou de "a, b"."""
+
+    if isinstance(valor, str):
+        texto = valor.strip()
+        if texto.startswith("["):
+            try:
+                return [str(item).strip() for item in ast.literal_eval(texto)]
+            except (ValueError, SyntaxError):
+                texto = texto.strip("[]")
+        return [parte.strip().strip("'\"") for parte in texto.split(",") if parte.strip()]
+    if valor is None or isinstance(valor, float):  # ausente (NaN)
+        return []
+    return [str(item).strip() for item in valor]
+
+
+def ler_csv(caminho: str) -> "pd.DataFrame":
+    """CSV com as colunas de repr de lista ("['a', 'b']") já convertidas em listas."""
+
+    import pandas as pd  # só na primeira leitura: a importação custa caro
+
+    dados = pd.read_csv(caminho)
+    for nome in dados.columns:
+        if pd.api.types.is_numeric_dtype(dados[nome]):
+            continue
+        textos = dados[nome].dropna().astype(str).str.lstrip()
+        if len(textos) and textos.str.startswith("[").all():
+            # as combinações se repetem muito: cada texto distinto é interpretado uma vez só
+            unicas = {texto: lista(texto) for texto in set(textos)}
+            listas = [list(unicas[v.lstrip()]) if isinstance(v, str) else [] for v in dados[nome]]
+            dados[nome] = pd.Series(listas, index=dados.index, dtype=object)
+    return dados
+
+
+class _TabelaCsv:
+    """Mesma interface de colunar.TabelaColunar sobre um DataFrame lido do CSV."""
+
+    def __init__(self, dados: "pd.DataFrame"):
+        self.dados = dados
+        self.colunas = list(dados.columns)
+        self.linhas = len(dados)
+
+    def coluna(self, nome: str):
+        return self.dados[nome].to_numpy()
+
+    def linha(self, posicao: int) -> dict:
+        return self.dados.iloc[[posicao]].to_dict(orient="records")[0]
+
+    def registros(self) -> list:
+        return self.dados.to_dict(orient="records")
+
+
+class Tabela:
+    """Tabela carregada uma única vez, com índice hash na coluna-chave (minúsculas).
+
+    Lê a versão colunar gerada por colunar.py quando ela está em dia com o
+    CSV (sem pandas, com mmap e só as colunas pedidas); senão, lê o próprio
+    CSV. A cada acesso só os mtimes são consultados; os arquivos são relidos
+    apenas quando mudam.
+    """
+
+    def __init__(self, caminho: str, chave: str):
+        self.caminho = caminho
+        self.chave = chave
+        self.versao = None
+        self._fonte = None
+        self._dados = None
+        self._indice = {}
+        self._registros = None
+        self._trava = threading.Lock()
+
+    def _versao(self) -> tuple:
+        versao = []
+        for caminho in (self.caminho, os.path.join(os.path.splitext(self.caminho)[0] + ".colunar", "esquema.json")):
+            try:
+                versao.append(os.stat(caminho).st_mtime_ns)
+            except FileNotFoundError:
+                versao.append(None)
+        return tuple(versao)
+
+    def _atualizar(self):
+        versao = self._versao()
+        if versao != self.versao:
+            with self._trava:
+                if versao != self.versao:
+                    from colunar import TabelaColunar, atualizado, diretorio_colunar
+
+                    if atualizado(self.caminho):
+                        fonte = TabelaColunar(diretorio_colunar(self.caminho))
+                    else:
+                        fonte = _TabelaCsv(ler_csv(self.caminho))
+                    indice = {}
+                    for posicao, valor in enumerate(fonte.coluna(self.chave)):
+                        indice.setdefault(str(valor).lower(), posicao)
+                    self._fonte, self._indice, self._dados, self._registros = fonte, indice, None, None
+                    self.versao = versao
+        return self._fonte, self._indice
+
+    async def acarregar(self) -> "Tabela":
+        """Garante a versão atual em memória sem bloquear o event loop.
+
+        Se for preciso ler os arquivos, a leitura vai para uma thread; depois
+        disso os métodos síncronos só consultam o mtime.
+        """
+
+        if self._versao() != self.versao:
+            await asyncio.to_thread(self._atualizar)
+        return self
+
+    @property
+    def colunas(self) -> list:
+        return self._atualizar()[0].colunas
+
+    def coluna(self, nome: str):
+        """Uma coluna como array, sem carregar as outras."""
+
+        return self._atualizar()[0].coluna(nome)
+
+    @property
+    def dados(self) -> "pd.DataFrame":
+        fonte, _ = self._atualizar()
+        if self._dados is None:
+            if isinstance(fonte, _TabelaCsv):
+                self._dados = fonte.dados
+            else:
+                import pandas as pd
+
+                self._dados = pd.DataFrame({nome: fonte.coluna(nome) for nome in fonte.colunas})
+        return self._dados
+
+    def indice(self) -> dict:
+        """Chave em minúsculas -> posição da linha. Muda de identidade ao recarregar."""
+
+        return self._atualizar()[1]
+
+    def buscar(self, valor: str) -> dict:
+        """Primeira linha cuja chave é igual a `valor` (sem diferenciar maiúsculas)."""
+
+        fonte, indice = self._atualizar()
+        posicao = indice.get(valor.lower())
+        if posicao is None:
+            return {}
+        return fonte.linha(posicao)
+
+    async def abuscar(self, valor: str) -> dict:
+        return (await self.acarregar()).buscar(valor)
+
+    async def aregistros(self) -> list:
+        return (await self.acarregar()).registros()
+
+    def registros(self) -> list:
+        """Todas as linhas como dicionários."""
+
+        fonte, _ = self._atualizar()
+        if self._registros is None:
+            self._registros = fonte.registros()
+        return [dict(registro) for registro in self._registros]
+
+
+tabela_estudantes = Tabela("documentos/estudantes.csv", "USUARIO")
+tabela_universidades = Tabela("documentos/universidades.csv", "NOME_FACULDADE")
@@ -1,36 +1,61 @@
 # estudante.py
 from pydantic import BaseModel, Field
-from langchain.tools import BaseTool
-from langchain_openai import AzureChatOpenAI
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.tools import BaseTool
+from clientes import cadeia_json
 
+from functools import lru_cache
 from typing import List
 
-import pandas as pd
-import os
-from dotenv import load_dotenv
+from dados import tabela_estudantes
+from extrator_local import ExtratorLocal
 import json
-load_dotenv()
-
-api_key = os.getenv("AZURE_OPENAI_KEY")
-endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
 
 
 def busca_dados_de_estudante(nome: str):
     """Busca um estudante no CSV (coluna: USUARIO)."""
 
-    dados = pd.read_csv("documentos/estudantes.csv")
-    dados_filtrados = dados[dados["USUARIO"].str.lower() == nome.lower()]
+    return tabela_estudantes.buscar(nome)
 
-    if dados_filtrados.empty:
-        return {}
+async def abusca_dados_de_estudante(nome: str):
+    return await tabela_estudantes.abuscar(nome)
 
-    return dados_filtrados.to_dict(orient="records")[0]
+extrator_local_de_estudante = ExtratorLocal(tabela_estudantes)
 
 class ExtratorDeEstudante(BaseModel):
     estudante:str = Field("Nome do estudante informado, sempre em letras minúsculas. Exemplo: joão, carlos, joana, carla.")
 
+@lru_cache(maxsize=None)
+def cadeia_extrator_de_estudante():
+    return cadeia_json(
+        """
+        Analise o texto abaixo e extraia o nome do estudante.
+        Retorne no formato JSON exigido.
+
+        Texto: {input}
+
+        Formato de saída:
+        {formato_saida}
+        """,
+        ExtratorDeEstudante,
+    )
+
+def estudantes_citados(input: str) -> list:
+    """Usuários citados no texto; sem nenhum conhecido, pergunta ao modelo."""
+
+    estudantes = extrator_local_de_estudante.extrair_todos(input)
+    if not estudantes:
+        resposta = cadeia_extrator_de_estudante().invoke({"input": input})
+        estudantes = {resposta["estudante"].lower()}
+    return sorted(estudantes)
+
+async def aestudantes_citados(input: str) -> list:
+    await tabela_estudantes.acarregar()  # a trie usa o índice: lê a tabela fora do event loop
+    estudantes = extrator_local_de_estudante.extrair_todos(input)
+    if not estudantes:
+        resposta = await cadeia_extrator_de_estudante().ainvoke({"input": input})
+        estudantes = {resposta["estudante"].lower()}
+    return sorted(estudantes)
+
 class DadosDeEstudante(BaseTool):
     """Ferramenta para extrair o nome de um estudante e buscar no CSV."""
 
@@ -38,37 +63,26 @@ class DadosDeEstudante(BaseTool):
     description : str = """Esta ferramenta extrai o histórico e preferências de um estudante de acordo com seu histórico."""
 
     def _run(self, input: str) -> str:
-        llm = AzureChatOpenAI(
-            api_key=api_key,
-            azure_endpoint=endpoint,
-            azure_deployment="gpt-4o-mini",
-            api_version="2024-08-01-preview",
-            verbose=True  
-            )
-        parser = JsonOutputParser(pydantic_object=ExtratorDeEstudante)
+        # nome conhecido citado no texto dispensa a chamada ao modelo
+        estudante = extrator_local_de_estudante.extrair(input)
 
-        prompt = ChatPromptTemplate.from_template(
-            """
-            Analise o texto abaixo e extraia o nome do estudante.
-            Retorne no formato JSON exigido.
+        if estudante is None:
+            resposta = cadeia_extrator_de_estudante().invoke({"input": input})
+            estudante = resposta["estudante"].lower()
 
-            Texto: {input}
+        dados = busca_dados_de_estudante(estudante)
 
-            Formato de saída:
-            {formato_saida}
-            """
-        )
+        return json.dumps(dados, ensure_ascii=False)
 
-        chain = prompt | llm | parser
+    async def _arun(self, input: str) -> str:
+        await tabela_estudantes.acarregar()
+        estudante = extrator_local_de_estudante.extrair(input)
 
-        resposta = chain.invoke({
-            "input": input,
-            "formato_saida": parser.get_format_instructions()
-        })
+        if estudante is None:
+            resposta = await cadeia_extrator_de_estudante().ainvoke({"input": input})
+            estudante = resposta["estudante"].lower()
 
-        estudante = resposta["estudante"].lower()
-
-        dados = busca_dados_de_estudante(estudante)
+        dados = await abusca_dados_de_estudante(estudante)
 
         return json.dumps(dados, ensure_ascii=False)
         
@@ -85,6 +99,28 @@ class PerfilAcademicoDeEstudante(BaseModel):
     notas:List[Nota] = Field("Lista de notas das disciplinas e áreas de conhecimento")
     resumo:str = Field("Resumo das principais características desse estudante de forma a torná-lo único e um ótimo potencial estudante para faculdades. Exemplo: só este estudante tem bla bla bla")    
 
+@lru_cache(maxsize=None)
+def cadeia_perfil_academico():
+    return cadeia_json(
+        """
+        Gere um perfil acadêmico detalhado para o estudante abaixo.
+
+        Diretrizes:
+        - Estruture notas, áreas fortes, aptidões e interesses.
+        - Sugira universidades e cursos alinhados ao perfil.
+        - Produza um resumo final convincente.
+        - Estilo: consultora de carreira experiente, objetiva, clara.
+
+        Dados do estudante:
+        {dados_do_estudante}
+
+        Formato de saída:
+        {formato_de_saida}
+        """,
+        PerfilAcademicoDeEstudante,
+        variavel_formato="formato_de_saida",
+    )
+
 class PerfilAcademico(BaseTool):
     name: str = "PerfilAcademico"
     description: str = """Cria um perfil acadêmico de um estudante. Esta ferramenta requer como entrada todos os dados do estudante. Eu sou incapaz de buscar os dados do estudantes.
@@ -93,40 +129,11 @@ class PerfilAcademico(BaseTool):
 
     
     def _run(self, input: str) -> str:
+        resposta = cadeia_perfil_academico().invoke({"dados_do_estudante": input})
 
-        llm = AzureChatOpenAI(
-            api_key=api_key,
-            azure_endpoint=endpoint,
-            azure_deployment="gpt-4o-mini",
-            api_version="2024-08-01-preview",
-            verbose=True
-        )
-
-        parser = JsonOutputParser(pydantic_object=PerfilAcademicoDeEstudante)
-
-        prompt = ChatPromptTemplate.from_template(
-            """
-            Gere um perfil acadêmico detalhado para o estudante abaixo.
-
-            Diretrizes:
-            - Estruture notas, áreas fortes, aptidões e interesses.
-            - Sugira universidades e cursos alinhados ao perfil.
-            - Produza um resumo final convincente.
-            - Estilo: consultora de carreira experiente, objetiva, clara.
-
-            Dados do estudante:
-            {dados_do_estudante}
-
-            Formato de saída:
-            {formato_de_saida}
-            """
-        )
-
-        chain = prompt | llm | parser
+        return resposta
 
-        resposta = chain.invoke({
-            "dados_do_estudante": input,
-            "formato_de_saida": parser.get_format_instructions()
-        })
+    async def _arun(self, input: str) -> str:
+        resposta = await cadeia_perfil_academico().ainvoke({"dados_do_estudante": input})
 
         return resposta
@@ -0,0 +1,130 @@
+# executor.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TempoEsgotado
+
+
+class ExecutorDeFerramentas:
+    """Executa as tool_calls de uma resposta do modelo em paralelo.
+
+    As ferramentas são procuradas pelo nome no registro `ferramentas`, cada
+    uma tem seu tempo limite (`timeouts[nome]` ou `timeout_padrao`) e os
+    resultados voltam na mesma ordem das chamadas.
+
+    No caminho síncrono, uma ferramenta que estoura o tempo limite já está
+    rodando e não pode ser interrompida: a thread continua ocupada até ela
+    retornar. Essas threads presas são contadas e, quando o lote seguinte
+    não caberia nas threads livres, o pool é trocado por um novo (o antigo
+    termina sozinho quando as ferramentas presas retornarem). Assim, algumas
+    ferramentas travadas não bloqueiam as chamadas seguintes, mas cada uma
+    segura uma thread até acabar. `aexecutar` não tem esse limite: lá o
+    tempo esgotado cancela a tarefa.
+    """
+
+    def __init__(self, ferramentas: dict, max_workers: int = 8, timeout_padrao: float = 60.0, timeouts: dict = None):
+        self.ferramentas = ferramentas
+        self.timeout_padrao = timeout_padrao
+        self.timeouts = timeouts or {}
+        self.max_workers = max_workers
+        self._trava = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ferramenta")
+        self._presas = set()  # futuros do pool atual que estouraram o tempo e seguem rodando
+
+    def _pool_com_vagas(self, quantidade: int) -> ThreadPoolExecutor:
+        with self._trava:
+            if self._presas and len(self._presas) + quantidade > self.max_workers:
+                self._pool.shutdown(wait=False)
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ferramenta")
+                self._presas = set()
+            return self._pool
+
+    def _abandonar(self, futuro):
+        if futuro.cancel():  # ainda estava na fila: a vaga nem chegou a ser usada
+            return
+        with self._trava:
+            presas = self._presas
+            presas.add(futuro)
+        futuro.add_done_callback(lambda f: presas.discard(f))
+
+    @staticmethod
+    def _rodar(ferramenta, entrada):
+        inicio = time.perf_counter()
+        resultado = ferramenta.run(entrada)
+        return resultado, time.perf_counter() - inicio
+
+    def executar(self, tool_calls: list) -> list:
+        """Retorna um dicionário por chamada: id, nome, args, resultado, erro e segundos."""
+
+        pool = self._pool_com_vagas(len(tool_calls))
+        submetidas = []
+        for call in tool_calls:
+            ferramenta = self.ferramentas.get(call.get("name"))
+            futuro = None
+            if ferramenta is not None:
+                entrada = call.get("args", {}).get("input", "")
+                futuro = pool.submit(self._rodar, ferramenta, entrada)
+            submetidas.append((call, futuro, time.perf_counter()))
+
+        resultados = []
+        for call, futuro, inicio in submetidas:
+            nome = call.get("name")
+            item = {"id": call.get("id"), "nome": nome, "args": call.get("args", {}), "resultado": None, "erro": None}
+
+            if futuro is None:
+                item["erro"] = f"Ferramenta desconhecida: {nome}"
+                item["segundos"] = 0.0
+                resultados.append(item)
+                continue
+
+            limite = self.timeouts.get(nome, self.timeout_padrao)
+            restante = max(0.0, inicio + limite - time.perf_counter())
+            try:
+                item["resultado"], item["segundos"] = futuro.result(timeout=restante)
+            except TempoEsgotado:
+                self._abandonar(futuro)
+                item["erro"] = f"Tempo esgotado após {limite:g}s"
+                item["segundos"] = time.perf_counter() - inicio
+            except Exception as erro:
+                item["erro"] = f"{type(erro).__name__}: {erro}"
+                item["segundos"] = time.perf_counter() - inicio
+            resultados.append(item)
+
+        return resultados
+
+    async def _arodar(self, ferramenta, entrada):
+        inicio = time.perf_counter()
+        resultado = await ferramenta.arun(entrada)
+        return resultado, time.perf_counter() - inicio
+
+    async def aexecutar(self, tool_calls: list) -> list:
+        """Versão assíncrona de `executar`: as chamadas viram tarefas no event loop.
+
+        Uma ferramenta que estoura o tempo limite é cancelada de fato (a
+        requisição ao modelo é interrompida), não só abandonada numa thread.
+        """
+
+        async def uma(call):
+            nome = call.get("name")
+            item = {"id": call.get("id"), "nome": nome, "args": call.get("args", {}), "resultado": None, "erro": None}
+            ferramenta = self.ferramentas.get(nome)
+            if ferramenta is None:
+                item["erro"] = f"Ferramenta desconhecida: {nome}"
+                item["segundos"] = 0.0
+                return item
+
+            limite = self.timeouts.get(nome, self.timeout_padrao)
+            inicio = time.perf_counter()
+            try:
+                entrada = call.get("args", {}).get("input", "")
+                item["resultado"], item["segundos"] = await asyncio.wait_for(self._arodar(ferramenta, entrada), limite)
+            except asyncio.TimeoutError:
+                item["erro"] = f"Tempo esgotado após {limite:g}s"
+                item["segundos"] = time.perf_counter() - inicio
+            except Exception as erro:
+                item["erro"] = f"{type(erro).__name__}: {erro}"
+                item["segundos"] = time.perf_counter() - inicio
+            return item
+
+        return list(await asyncio.gather(*(uma(call) for call in tool_calls)))
@@ -0,0 +1,76 @@
+# extrator_local.py
+import re
+import unicodedata
+
+_FIM = object()
+
+
+def normalizar(texto: str) -> list:
+    """Minúsculas, sem acentos e quebrado em palavras."""
+
+    sem_acento = unicodedata.normalize("NFKD", texto)
+    sem_acento = "".join(c for c in sem_acento if not unicodedata.combining(c))
+    return re.findall(r"[a-z0-9]+", sem_acento.lower())
+
+
+class TrieDeNomes:
+    """Trie por palavras para achar nomes conhecidos dentro de um texto."""
+
+    def __init__(self, nomes):
+        self.raiz = {}
+        for nome in nomes:
+            palavras = normalizar(nome)
+            if not palavras:
+                continue
+            no = self.raiz
+            for palavra in palavras:
+                no = no.setdefault(palavra, {})
+            no.setdefault(_FIM, set()).add(nome)
+
+    def encontrar(self, texto: str) -> set:
+        """Nomes citados no texto, preferindo sempre a ocorrência mais longa."""
+
+        palavras = normalizar(texto)
+        trechos = []
+        for inicio in range(len(palavras)):
+            no, fim, achado = self.raiz, inicio, None
+            while fim < len(palavras) and palavras[fim] in no:
+                no = no[palavras[fim]]
+                fim += 1
+                if _FIM in no:
+                    achado = (inicio, fim, no[_FIM])
+            if achado:
+                trechos.append(achado)
+
+        # descarta ocorrências contidas em outra maior ("sydney" dentro de "university of sydney")
+        nomes = set()
+        for inicio, fim, encontrados in trechos:
+            if not any(i <= inicio and fim <= f and (i, f) != (inicio, fim) for i, f, _ in trechos):
+                nomes |= encontrados
+        return nomes
+
+
+class ExtratorLocal:
+    """Extrai o único nome conhecido de uma tabela citado no texto.
+
+    Retorna a chave da tabela (em minúsculas) ou None quando nenhum nome, ou
+    mais de um, aparece, deixando a decisão para o extrator com LLM.
+    """
+
+    def __init__(self, tabela):
+        self.tabela = tabela
+        self._indice = None
+        self._trie = None
+
+    def extrair_todos(self, texto: str) -> set:
+        """Todas as chaves da tabela citadas no texto."""
+
+        indice = self.tabela.indice()
+        if indice is not self._indice:  # tabela recarregada: refaz a trie
+            self._trie = TrieDeNomes(indice)
+            self._indice = indice
+        return self._trie.encontrar(texto)
+
+    def extrair(self, texto: str):
+        nomes = self.extrair_todos(texto)
+        return next(iter(nomes)) if len(nomes) == 1 else None
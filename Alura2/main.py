@@ -1,12 +1,18 @@
 from agente import AgenteOpenAIFunctions
+import time
 
 agente = AgenteOpenAIFunctions()
 
-query = """
-Você é um assistente inteligente com acesso a duas ferramentas:
+# a lista de ferramentas sai do registro do agente: nunca fica desatualizada
+ferramentas = "\n".join(
+    f"{numero}. {nome} — {ferramenta.description.strip().splitlines()[0]}"
+    for numero, (nome, ferramenta) in enumerate(agente.ferramentas.items(), start=1)
+)
 
-1️⃣ DadosDeEstudante — busca dados de um estudante no CSV.
-2️⃣ PerfilAcademico — cria um perfil acadêmico a partir dos dados do estudante.
+query = f"""
+Você é um assistente inteligente com acesso a {len(agente.ferramentas)} ferramentas:
+
+{ferramentas}
 
 Sua tarefa é decidir, de forma autônoma, qual ferramenta usar (ou nenhuma)
 para responder à pergunta do usuário.
@@ -15,61 +21,26 @@ Pergunta: "Dentre todas as faculdades disponíveis, quais Ana tem mais chance de
 
 """
 
-resposta = agente.llm_com_tools.invoke(query, tool_choice="auto")
-
-print("🧠 Resposta bruta do modelo:", resposta)
+inicio = time.perf_counter()
 
-tool_calls = getattr(resposta, "tool_calls", [])
+# o agente alterna modelo e ferramentas até ter a resposta (no máximo 5 rodadas)
+execucao = agente.executar(query, max_passos=5)
 
-resultados = []
+for numero, itens in enumerate(execucao["passos"], start=1):
+    print(f"\n🔧 Passo {numero}: {len(itens)} ferramenta(s) chamada(s)")
+    for item in itens:
+        print(f"   • Tool: {item['nome']}")
+        print(f"   • Args: {item['args']}")
+        if item["erro"]:
+            print(f"   ⚠️ Falhou em {item['segundos']:.2f}s:", item["erro"])
+        else:
+            print(f"   ✅ Resultado ({item['segundos']:.2f}s):", item["resultado"])
 
-if not tool_calls:
+if not execucao["passos"]:
     print("❌ Nenhuma ferramenta foi chamada.")
-else:
-    print(f"🔧 {len(tool_calls)} ferramenta(s) chamada(s):")
-
-    for call in tool_calls:
-        nome_tool = call.get("name")
-        args = call.get("args", {})
-
-        print(f"\n📌 Tool Call detectado:")
-        print(f"   • Tool: {nome_tool}")
-        print(f"   • Args: {args}")
-
-        if nome_tool == "DadosDeEstudante":
-            entrada = args.get("input", "")
-            resultado = agente.dados_de_estudante.run(entrada)
-            resultados.append(resultado)
-            print("✅ Resultado da ferramenta:", resultado)
-
-        elif nome_tool == "PerfilAcademico":
-            entrada = args.get("input", "")
-            resultado = agente.perfil_academico.run(entrada)
-            resultados.append(resultado)
-            print("✅ Resultado da ferramenta:", resultado)
-        
-        
-        elif nome_tool == "DadosDeUniversidade":
-            entrada = args.get("input", "")
-            resultado = agente.dados_da_universidade.run(entrada)
-            resultados.append(resultado)
-            print("✅ Resultado da ferramenta:", resultado)
-
-    print("\n📚 TODOS OS RESULTADOS:")
-    for item in resultados:
-        print("-", item)
-
-    # 🧩 Etapa 2 — Reenvia resultados ao modelo para conclusão
-    contexto = "\n".join(resultados)
-    prompt_final = f"""
-    Aqui estão os dados obtidos das ferramentas:
-
-    {contexto}
 
-    Agora responda à pergunta original de forma completa e contextualizada:
-    {query}
-    """
+print("\n💬 Resposta final do modelo:")
+print(execucao["resposta"])
 
-    resposta_final = agente.llm.invoke(prompt_final)
-    print("\n💬 Resposta final do modelo:")
-    print(resposta_final.content)
+print(f"\n📏 Tokens de prompt enviados: {execucao['tokens_prompt']}")
+print(f"⏱️ Latência total do agente: {time.perf_counter() - inicio:.2f}s")
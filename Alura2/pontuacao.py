@@ -0,0 +1,288 @@
+# pontuacao.py
+import asyncio
+import threading
+
+import numpy as np
+
+from dados import lista, tabela_estudantes, tabela_universidades
+from extrator_local import normalizar
+
+# Heurística de admissão: cada curso em destaque e cada critério de seleção
+# pesa as disciplinas (colunas SCORE_*) que mais contam para ele. As chaves
+# são normalizadas (minúsculas, sem acento), então "Computação" vira "computacao".
+NOTAS = {"matematica": 1, "portugues": 1, "biologia": 1, "fisica": 1, "computacao": 1, "filosofia": 1}
+
+CURSOS = {
+    # curso: (peso das disciplinas, área de LISTA_AREAS_PREFERIDAS)
+    "medicina": ({"biologia": 3, "fisica": 1, "portugues": 1}, "saude"),
+    "psicologia": ({"biologia": 1, "filosofia": 2, "atividades sociais": 1}, "saude"),
+    "engenharia": ({"matematica": 3, "fisica": 3, "computacao": 1}, "engenharia"),
+    "computacao": ({"computacao": 3, "matematica": 2}, "engenharia"),
+    "arquitetura": ({"matematica": 1, "fisica": 1, "projetos": 2}, "engenharia"),
+    "fisica": ({"fisica": 3, "matematica": 2}, "ciencias"),
+    "quimica": ({"biologia": 1, "fisica": 2, "matematica": 1}, "ciencias"),
+    "biologia": ({"biologia": 3, "publicacoes": 1}, "ciencias"),
+    "matematica": ({"matematica": 3}, "ciencias"),
+    "ciencias ambientais": ({"biologia": 2, "fisica": 1, "atividades sociais": 1}, "ciencias"),
+    "direito": ({"portugues": 3, "filosofia": 2}, "humanas"),
+    "historia": ({"portugues": 2, "filosofia": 2}, "humanas"),
+    "filosofia": ({"filosofia": 3, "portugues": 1}, "humanas"),
+    "economia": ({"matematica": 2, "filosofia": 1}, "humanas"),
+    "negocios": ({"matematica": 1, "portugues": 1, "atividades sociais": 1}, "humanas"),
+    "educacao": ({"portugues": 2, "atividades sociais": 2}, "humanas"),
+    "artes": ({"projetos": 2, "filosofia": 1}, "artes"),
+}
+
+CRITERIOS = {
+    "exame de admissao": NOTAS,
+    "teste de admissao": NOTAS,
+    "notas": NOTAS,
+    "notas do ensino medio": NOTAS,
+    "sat act": {"matematica": 1, "portugues": 1},
+    "a levels": NOTAS,
+    "atar": NOTAS,
+    "abitur": NOTAS,
+    "essays": {"portugues": 2, "filosofia": 1},
+    "recomendacoes": {"atividades sociais": 1, "projetos": 1},
+    "entrevista": {"portugues": 1, "atividades sociais": 1},
+    "portfolio": {"projetos": 2, "publicacoes": 1},
+    "experiencia previa": {"projetos": 1, "publicacoes": 1},
+}
+
+# Proficiência mínima (mesma escala das colunas PROEFICIENCIA_*) por país
+EXIGENCIA_IDIOMA = {
+    "estados unidos": {"ingles": 7.0},
+    "reino unido": {"ingles": 7.0},
+    "canada": {"ingles": 6.5},
+    "australia": {"ingles": 6.5},
+    "alemanha": {"ingles": 6.0},
+}
+FOLGA_IDIOMA = 2.0  # déficit total que zera a nota de idioma
+
+# Quanto a matéria-prima acadêmica (cursos + critérios) conta frente às preferências
+PESO_CURSOS = 0.6
+PESOS = {"academico": 0.55, "idioma": 0.2, "areas": 0.1, "pais_preferido": 0.1, "universidade_preferida": 0.05}
+
+
+def _chave(texto: str) -> str:
+    return " ".join(normalizar(texto))
+
+
+def _colunas(tabela, prefixo: str) -> dict:
+    """Chave normalizada -> nome da coluna, para as colunas com o prefixo."""
+
+    return {_chave(c[len(prefixo):]): c for c in tabela.colunas if c.startswith(prefixo)}
+
+
+def _multi_hot(listas: list, vocabulario: dict) -> np.ndarray:
+    matriz = np.zeros((len(listas), len(vocabulario)), dtype=np.float32)
+    for linha, itens in enumerate(listas):
+        for item in itens:
+            coluna = vocabulario.get(_chave(item))
+            if coluna is not None:
+                matriz[linha, coluna] = 1.0
+    return matriz
+
+
+def _normalizar_linhas(matriz: np.ndarray) -> np.ndarray:
+    soma = matriz.sum(axis=1, keepdims=True)
+    return np.divide(matriz, soma, out=np.zeros_like(matriz), where=soma > 0)
+
+
+def _matriz(tabela, colunas: list) -> np.ndarray:
+    return np.column_stack([np.asarray(tabela.coluna(c), dtype=np.float32) for c in colunas])
+
+
+def vetores_de_estudantes(tabela, disciplinas: list, idiomas: list, paises: dict, universidades: dict, areas: dict) -> dict:
+    """Matrizes (estudantes x atributo) a partir das colunas do estudantes.csv.
+
+    Só as colunas usadas são lidas da tabela.
+    """
+
+    colunas_notas = _colunas(tabela, "SCORE_")
+    colunas_idioma = _colunas(tabela, "PROEFICIENCIA_")
+    return {
+        "notas": _matriz(tabela, [colunas_notas[d] for d in disciplinas]) / 10.0,
+        "idiomas": _matriz(tabela, [colunas_idioma[i] for i in idiomas]),
+        "paises": _multi_hot([lista(v) for v in tabela.coluna("LISTA_PAISES_PREFERIDOS")], paises),
+        "universidades": _multi_hot([lista(v) for v in tabela.coluna("LISTA_UNIVERSIDADES_PREFERIDAS")], universidades),
+        "areas": _multi_hot([lista(v) for v in tabela.coluna("LISTA_AREAS_PREFERIDAS")], areas),
+    }
+
+
+def vetores_de_universidades(tabela, disciplinas: list, idiomas: list, paises: dict, areas: dict) -> dict:
+    """Matrizes (universidades x requisito) a partir das colunas do universidades.csv."""
+
+    posicao = {d: i for i, d in enumerate(disciplinas)}
+    pais_de_cada = tabela.coluna("PAIS")
+    total = len(pais_de_cada)
+    cursos = np.zeros((total, len(disciplinas)), dtype=np.float32)
+    criterios = np.zeros((total, len(disciplinas)), dtype=np.float32)
+    afinidade = np.zeros((total, len(areas)), dtype=np.float32)
+    exigencia = np.zeros((total, len(idiomas)), dtype=np.float32)
+
+    for linha, (destaques, selecao, pais) in enumerate(zip(tabela.coluna("CURSOS_DESTAQUE"), tabela.coluna("CRITERIOS_SELECAO"), pais_de_cada)):
+        for curso in map(_chave, lista(destaques)):
+            pesos, area = CURSOS.get(curso, (NOTAS, None))
+            for disciplina, peso in pesos.items():
+                if disciplina in posicao:
+                    cursos[linha, posicao[disciplina]] += peso
+            if area in areas:
+                afinidade[linha, areas[area]] += 1.0
+        for criterio in map(_chave, lista(selecao)):
+            for disciplina, peso in CRITERIOS.get(criterio, NOTAS).items():
+                if disciplina in posicao:
+                    criterios[linha, posicao[disciplina]] += peso
+        for idioma, minimo in EXIGENCIA_IDIOMA.get(_chave(pais), {}).items():
+            if idioma in idiomas:
+                exigencia[linha, idiomas.index(idioma)] = minimo
+
+    return {
+        "requisitos": PESO_CURSOS * _normalizar_linhas(cursos) + (1 - PESO_CURSOS) * _normalizar_linhas(criterios),
+        "idiomas": exigencia,
+        "paises": _multi_hot([[p] for p in pais_de_cada], paises),
+        "areas": _normalizar_linhas(afinidade),
+    }
+
+
+def pontuar(estudantes: dict, universidades: dict, pesos: dict = None) -> tuple:
+    """Matriz estudantes x universidades (0 a 1) numa passada só, mais cada componente.
+
+    As preferências por universidade vêm em `estudantes["universidades"]`,
+    já na ordem das linhas de `universidades`.
+    """
+
+    pesos = pesos or PESOS
+    # poucos idiomas: somar matrizes 2D é bem mais rápido que reduzir um eixo 3D curto
+    deficit = np.zeros((len(estudantes["notas"]), len(universidades["requisitos"])), dtype=np.float32)
+    for idioma in range(universidades["idiomas"].shape[1]):
+        deficit += np.maximum(universidades["idiomas"][None, :, idioma] - estudantes["idiomas"][:, idioma, None], 0)
+    componentes = {
+        "academico": estudantes["notas"] @ universidades["requisitos"].T,
+        "idioma": np.clip(1.0 - deficit / FOLGA_IDIOMA, 0.0, 1.0),
+        "areas": estudantes["areas"] @ universidades["areas"].T,
+        "pais_preferido": estudantes["paises"] @ universidades["paises"].T,
+        "universidade_preferida": estudantes["universidades"],
+    }
+    total = sum(pesos[nome] * valor for nome, valor in componentes.items())
+    return total, componentes
+
+
+def top_k(pontuacoes: np.ndarray, k: int) -> np.ndarray:
+    """Índices das `k` maiores pontuações de cada linha, em ordem decrescente."""
+
+    k = min(k, pontuacoes.shape[1])
+    if k < pontuacoes.shape[1]:
+        candidatos = np.argpartition(-pontuacoes, k - 1, axis=1)[:, :k]
+    else:
+        candidatos = np.broadcast_to(np.arange(k), (pontuacoes.shape[0], k))
+    ordem = np.argsort(-np.take_along_axis(pontuacoes, candidatos, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidatos, ordem, axis=1)
+
+
+class MotorDeAdmissao:
+    """Ranking de universidades por estudante sobre as duas tabelas.
+
+    A matriz completa é calculada uma vez e refeita só quando algum dos CSVs
+    muda; cada consulta depois disso é só um top-k sobre uma linha.
+
+    O resultado de cada montagem é publicado numa única atribuição, como a
+    tupla (índices das tabelas, pontuações, componentes, linhas, nomes,
+    países). As consultas leem a tupla uma vez, sem trava, e nunca misturam
+    a matriz nova com os nomes da montagem anterior.
+    """
+
+    def __init__(self, estudantes, universidades, pesos: dict = None):
+        self.estudantes = estudantes
+        self.universidades = universidades
+        self.pesos = pesos or PESOS
+        self._estado = None
+        self._trava = threading.Lock()
+
+    def _desatualizado(self, estado) -> bool:
+        indices = (self.estudantes.indice(), self.universidades.indice())
+        return estado is None or any(a is not b for a, b in zip(indices, estado[0]))
+
+    def _atualizar(self) -> tuple:
+        estado = self._estado
+        if self._desatualizado(estado):
+            with self._trava:
+                estado = self._estado
+                if self._desatualizado(estado):
+                    estado = self._construir()
+                    self._estado = estado
+        return estado
+
+    def _construir(self) -> tuple:
+        estudantes, universidades = self.estudantes, self.universidades
+        indices = (estudantes.indice(), universidades.indice())
+
+        disciplinas = sorted(_colunas(estudantes, "SCORE_"))
+        idiomas = sorted(_colunas(estudantes, "PROEFICIENCIA_"))
+        paises = {p: i for i, p in enumerate(sorted({_chave(p) for p in universidades.coluna("PAIS")}))}
+        nomes = {_chave(n): i for i, n in enumerate(universidades.coluna(universidades.chave))}
+        areas = {a: i for i, a in enumerate(sorted({area for _, area in CURSOS.values()}))}
+
+        pontuacoes, componentes = pontuar(
+            vetores_de_estudantes(estudantes, disciplinas, idiomas, paises, nomes, areas),
+            vetores_de_universidades(universidades, disciplinas, idiomas, paises, areas),
+            self.pesos,
+        )
+        return (
+            indices,
+            pontuacoes,
+            componentes,
+            indices[0],
+            universidades.coluna(universidades.chave).tolist(),
+            universidades.coluna("PAIS").tolist(),
+        )
+
+    async def acarregar(self) -> "MotorDeAdmissao":
+        """Tabelas e matriz em dia sem bloquear o event loop (montagem numa thread)."""
+
+        await asyncio.gather(self.estudantes.acarregar(), self.universidades.acarregar())
+        if self._desatualizado(self._estado):
+            await asyncio.to_thread(self._atualizar)
+        return self
+
+    def matriz(self) -> tuple:
+        """(usuários, universidades, pontuações estudantes x universidades de 0 a 1)."""
+
+        _, pontuacoes, _, linhas, nomes, _ = self._atualizar()
+        return list(linhas), list(nomes), pontuacoes
+
+    @staticmethod
+    def _candidatos(estado: tuple, linha: int, colunas) -> list:
+        _, pontuacoes, componentes, _, nomes, paises = estado
+        return [
+            {
+                "universidade": nomes[coluna],
+                "pais": paises[coluna],
+                "pontuacao": round(float(pontuacoes[linha, coluna]) * 100, 1),
+                **{nome: round(float(valor[linha, coluna]), 2) for nome, valor in componentes.items()},
+            }
+            for coluna in colunas
+        ]
+
+    def ranking(self, estudante: str, k: int = 5) -> list:
+        """As `k` universidades com mais chance para um estudante; vazio se ele não existe."""
+
+        estado = self._atualizar()
+        _, pontuacoes, _, linhas, _, _ = estado
+        linha = linhas.get(estudante.lower())
+        if linha is None:
+            return []
+        return self._candidatos(estado, linha, top_k(pontuacoes[linha:linha + 1], k)[0])
+
+    def coorte(self, estudantes: list = None, k: int = 5) -> dict:
+        """Top-k de vários estudantes (todos, por padrão) com um único top-k matricial."""
+
+        estado = self._atualizar()
+        _, pontuacoes, _, linhas, _, _ = estado
+        usuarios = list(linhas) if estudantes is None else [e.lower() for e in estudantes if e.lower() in linhas]
+        posicoes = [linhas[u] for u in usuarios]
+        melhores = top_k(pontuacoes[posicoes], k)
+        return {usuario: self._candidatos(estado, linha, colunas) for usuario, linha, colunas in zip(usuarios, posicoes, melhores)}
+
+
+motor_de_admissao = MotorDeAdmissao(tabela_estudantes, tabela_universidades)
@@ -0,0 +1,43 @@
+"""O agente assíncrono chamado em event loops sucessivos, contra o servidor_fake do Alura1:
+
+    python -m pytest -q test_agente_async.py
+"""
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+
+def _servidor_fake():
+    # carregado pelo caminho: os dois projetos têm módulos com o mesmo nome
+    caminho = os.path.join(os.path.dirname(RAIZ), "Alura1", "servidor_fake.py")
+    especificacao = importlib.util.spec_from_file_location("servidor_fake_alura1", caminho)
+    modulo = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(modulo)
+    return modulo.ServidorFake
+
+
+@pytest.fixture(scope="module")
+def agente(tmp_path_factory):
+    ServidorFake = _servidor_fake()
+    anterior = os.getcwd()
+    # cache de respostas num diretório temporário, tabelas lidas do projeto
+    temporario = tmp_path_factory.mktemp("agente")
+    os.symlink(os.path.join(RAIZ, "documentos"), temporario / "documentos")
+    os.chdir(temporario)
+    with ServidorFake(latencia=0.0) as servidor:
+        os.environ.update({"AZURE_OPENAI_KEY": "fake", "AZURE_OPENAI_ENDPOINT": servidor.endpoint})
+        from agente import AgenteOpenAIFunctions
+
+        yield AgenteOpenAIFunctions()
+    os.chdir(anterior)
+
+
+def test_aexecutar_duas_vezes(agente):
+    for numero in range(2):
+        pergunta = f"Dentre todas as faculdades, quais a Ana tem mais chance de entrar? ({numero})"
+        execucao = asyncio.run(agente.aexecutar(pergunta, max_passos=3))
+        assert execucao["resposta"]
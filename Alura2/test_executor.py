@@ -0,0 +1,87 @@
+"""ExecutorDeFerramentas com ferramentas falsas (sem modelo nem CSV):
+
+    python -m pytest -q test_executor.py
+"""
+import asyncio
+import time
+
+from executor import ExecutorDeFerramentas
+
+
+class Ferramenta:
+    def __init__(self, espera: float = 0.0, erro: Exception = None):
+        self.espera = espera
+        self.erro = erro
+
+    def run(self, entrada):
+        time.sleep(self.espera)
+        if self.erro:
+            raise self.erro
+        return f"ok: {entrada}"
+
+    async def arun(self, entrada):
+        await asyncio.sleep(self.espera)
+        if self.erro:
+            raise self.erro
+        return f"ok: {entrada}"
+
+
+def _chamada(nome: str, numero: int) -> dict:
+    return {"id": f"call_{numero}", "name": nome, "args": {"input": str(numero)}}
+
+
+def _executor(**opcoes) -> ExecutorDeFerramentas:
+    ferramentas = {
+        "lenta": Ferramenta(espera=0.2),
+        "rapida": Ferramenta(),
+        "falha": Ferramenta(erro=ValueError("sem dados")),
+        "travada": Ferramenta(espera=2.0),
+    }
+    return ExecutorDeFerramentas(ferramentas, **opcoes)
+
+
+CHAMADAS = [_chamada("lenta", 0), _chamada("rapida", 1), _chamada("falha", 2), _chamada("inexistente", 3)]
+
+
+def _conferir(itens: list):
+    # mesma ordem das chamadas, mesmo com a primeira terminando por último
+    assert [item["id"] for item in itens] == ["call_0", "call_1", "call_2", "call_3"]
+    assert [item["resultado"] for item in itens[:2]] == ["ok: 0", "ok: 1"]
+    assert itens[2]["erro"] == "ValueError: sem dados"
+    assert itens[3]["erro"] == "Ferramenta desconhecida: inexistente"
+
+
+def test_ordem_e_erros():
+    inicio = time.perf_counter()
+    _conferir(_executor().executar(CHAMADAS))
+    assert time.perf_counter() - inicio < 0.4  # em paralelo, não 0.2 por chamada
+
+
+def test_ordem_e_erros_assincrono():
+    _conferir(asyncio.run(_executor().aexecutar(CHAMADAS)))
+
+
+def test_tempo_limite_por_ferramenta():
+    executor = _executor(timeouts={"travada": 0.3})
+    inicio = time.perf_counter()
+    travada, rapida = executor.executar([_chamada("travada", 0), _chamada("rapida", 1)])
+    assert time.perf_counter() - inicio < 1.0
+    assert travada["erro"] == "Tempo esgotado após 0.3s"
+    assert rapida["resultado"] == "ok: 1"
+
+
+def test_tempo_limite_assincrono_cancela():
+    executor = _executor(timeouts={"travada": 0.3})
+    inicio = time.perf_counter()
+    travada, _ = asyncio.run(executor.aexecutar([_chamada("travada", 0), _chamada("rapida", 1)]))
+    assert time.perf_counter() - inicio < 1.0
+    assert travada["erro"] == "Tempo esgotado após 0.3s"
+
+
+def test_ferramentas_travadas_nao_esgotam_o_pool():
+    executor = _executor(max_workers=2, timeouts={"travada": 0.1})
+    for _ in range(4):
+        inicio = time.perf_counter()
+        travada, rapida = executor.executar([_chamada("travada", 0), _chamada("rapida", 1)])
+        assert rapida["resultado"] == "ok: 1"
+        assert time.perf_counter() - inicio < 0.5
@@ -0,0 +1,64 @@
+"""MotorDeAdmissao sobre cópias dos CSVs, trocadas enquanto outras threads consultam:
+
+    python -m pytest -q test_pontuacao.py
+"""
+import csv
+import os
+import shutil
+import threading
+
+from dados import Tabela
+from pontuacao import MotorDeAdmissao
+
+DOCUMENTOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "documentos")
+
+
+def _versoes() -> dict:
+    # A: as 3 primeiras universidades; B: todas, com outro nome
+    with open(os.path.join(DOCUMENTOS, "universidades.csv"), encoding="utf-8", newline="") as arquivo:
+        linhas = list(csv.DictReader(arquivo))
+    return {"A": linhas[:3], "B": [{**linha, "NOME_FACULDADE": "B " + linha["NOME_FACULDADE"]} for linha in linhas]}
+
+
+def _gravar(caminho: str, linhas: list, versao: int):
+    # grava ao lado e troca o arquivo, para os leitores nunca verem um CSV pela metade
+    with open(caminho + ".tmp", "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=list(linhas[0]))
+        escritor.writeheader()
+        escritor.writerows(linhas)
+    os.utime(caminho + ".tmp", ns=(versao, versao))  # mtime distinto a cada troca
+    os.replace(caminho + ".tmp", caminho)
+
+
+def test_consultas_nunca_misturam_montagens(tmp_path):
+    shutil.copy(os.path.join(DOCUMENTOS, "estudantes.csv"), tmp_path / "estudantes.csv")
+    caminho = str(tmp_path / "universidades.csv")
+    versoes = _versoes()
+    nomes = {versao: {linha["NOME_FACULDADE"] for linha in linhas} for versao, linhas in versoes.items()}
+    _gravar(caminho, versoes["A"], 1)
+    motor = MotorDeAdmissao(Tabela(str(tmp_path / "estudantes.csv"), "USUARIO"), Tabela(caminho, "NOME_FACULDADE"))
+
+    erros, parar = [], threading.Event()
+
+    def consultar():
+        while not parar.is_set():
+            try:
+                for candidatos in motor.coorte(k=3).values():
+                    vistos = {c["universidade"] for c in candidatos}
+                    assert vistos <= nomes["A"] or vistos <= nomes["B"], vistos
+            except Exception as erro:
+                erros.append(erro)
+                return
+
+    leitores = [threading.Thread(target=consultar) for _ in range(4)]
+    for leitor in leitores:
+        leitor.start()
+    for troca in range(2, 40):
+        _gravar(caminho, versoes["B" if troca % 2 else "A"], troca)
+        motor.ranking("ana")
+    parar.set()
+    for leitor in leitores:
+        leitor.join()
+
+    assert not erros, erros[0]
+    assert {c["universidade"] for c in motor.ranking("ana", k=20)} == nomes["B"]
@@ -1,43 +1,53 @@
 # universidade.py
 from pydantic import BaseModel, Field
-from langchain.tools import BaseTool
-from langchain_openai import AzureChatOpenAI
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.tools import BaseTool
+from clientes import cadeia_json
 
+from functools import lru_cache
 from typing import List
 
-import pandas as pd
-import os
-from dotenv import load_dotenv
+from dados import tabela_universidades
+from estudante import aestudantes_citados, estudantes_citados
+from extrator_local import ExtratorLocal
+import asyncio
 import json
-load_dotenv()
-
-api_key = os.getenv("AZURE_OPENAI_KEY")
-endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
 
 class ExtratorDeUniversidade(BaseModel):
     universidade:str = Field("Nome da universidade informado, sempre em letras minúsculas. Exemplo: unesp, ufabc, usp.")
 
+@lru_cache(maxsize=None)
+def cadeia_extrator_de_universidade():
+    return cadeia_json(
+        """
+        Analise o texto abaixo e extraia o nome da universidade.
+        Retorne no formato JSON exigido.
+
+        Texto: {input}
+
+        Formato de saída:
+        {formato_saida}
+        """,
+        ExtratorDeUniversidade,
+    )
+
 
 def busca_dados_de_universidade(universidade: str):
     """Busca uma universidade no CSV (coluna: NOME_FACULDADE)."""
 
-    dados = pd.read_csv("documentos/universidades.csv")
-    dados["NOME_FACULDADE"] = dados["NOME_FACULDADE"].str.lower()
-    dados_filtrados = dados[dados["NOME_FACULDADE"] == universidade.lower()]
+    return tabela_universidades.buscar(universidade)
 
-    if dados_filtrados.empty:
-        return {}
+async def abusca_dados_de_universidade(universidade: str):
+    return await tabela_universidades.abuscar(universidade)
 
-    return dados_filtrados.to_dict(orient="records")[0]
+extrator_local_de_universidade = ExtratorLocal(tabela_universidades)
 
 def busca_dados_das_universidades():
     """Busca todas as universidades no CSV."""
 
-    dados = pd.read_csv("documentos/universidades.csv")
+    return tabela_universidades.registros()
 
-    return dados.to_dict(orient="records")
+async def abusca_dados_das_universidades():
+    return await tabela_universidades.aregistros()
 
 class TodasUniversidades(BaseTool):
     name : str ="TodasUniversidades"
@@ -46,6 +56,9 @@ class TodasUniversidades(BaseTool):
     def _run(self, input:str):
         universidades = busca_dados_das_universidades()
         return universidades
+
+    async def _arun(self, input: str):
+        return await abusca_dados_das_universidades()
     
 class DadosDeUniversidade(BaseTool):
     name : str = "DadosDeUniversidade"
@@ -53,36 +66,54 @@ class DadosDeUniversidade(BaseTool):
 Passe para essa ferramenta como argumento o nome da universidade."""
 
     def _run(self, input: str) -> str:
-        llm = AzureChatOpenAI(
-            api_key=api_key,
-            azure_endpoint=endpoint,
-            azure_deployment="gpt-4o-mini",
-            api_version="2024-08-01-preview",
-            verbose=True  
-            )
-        parser = JsonOutputParser(pydantic_object=ExtratorDeUniversidade)
+        # nome conhecido citado no texto dispensa a chamada ao modelo
+        universidade = extrator_local_de_universidade.extrair(input)
 
-        prompt = ChatPromptTemplate.from_template(
-            """
-            Analise o texto abaixo e extraia o nome da universidade.
-            Retorne no formato JSON exigido.
+        if universidade is None:
+            resposta = cadeia_extrator_de_universidade().invoke({"input": input})
+            universidade = resposta["universidade"].lower()
 
-            Texto: {input}
+        dados = busca_dados_de_universidade(universidade)
 
-            Formato de saída:
-            {formato_saida}
-            """
-        )
+        return json.dumps(dados, ensure_ascii=False)
 
-        chain = prompt | llm | parser
+    async def _arun(self, input: str) -> str:
+        await tabela_universidades.acarregar()
+        universidade = extrator_local_de_universidade.extrair(input)
 
-        resposta = chain.invoke({
-            "input": input,
-            "formato_saida": parser.get_format_instructions()
-        })
+        if universidade is None:
+            resposta = await cadeia_extrator_de_universidade().ainvoke({"input": input})
+            universidade = resposta["universidade"].lower()
 
-        universidade = resposta["universidade"].lower()
+        dados = await abusca_dados_de_universidade(universidade)
 
-        dados = busca_dados_de_universidade(universidade)
+        return json.dumps(dados, ensure_ascii=False)
+
+class ChancesDeAdmissao(BaseTool):
+    name : str = "ChancesDeAdmissao"
+    description : str = """Ranqueia as universidades em que um estudante tem mais chance de entrar, com a pontuação (0 a 100) e seus componentes: acadêmico, idioma, áreas, país e universidade preferidos.
+Passe para essa ferramenta o texto com o nome do estudante (ou de vários, para comparar). Prefira esta ferramenta a TodasUniversidades para perguntas sobre chances de admissão."""
+    k: int = 5
+
+    def _run(self, input: str) -> str:
+        # numpy e as matrizes só quando a ferramenta roda, não ao importar o módulo
+        from pontuacao import motor_de_admissao
+
+        estudantes = estudantes_citados(input)
+        if len(estudantes) == 1:
+            resultado = motor_de_admissao.ranking(estudantes[0], self.k)
+        else:
+            resultado = motor_de_admissao.coorte(estudantes, self.k)
+
+        return json.dumps(resultado, ensure_ascii=False)
+
+    async def _arun(self, input: str) -> str:
+        from pontuacao import motor_de_admissao
+
+        estudantes, _ = await asyncio.gather(aestudantes_citados(input), motor_de_admissao.acarregar())
+        if len(estudantes) == 1:
+            resultado = motor_de_admissao.ranking(estudantes[0], self.k)
+        else:
+            resultado = motor_de_admissao.coorte(estudantes, self.k)
 
-        return json.dumps(dados, ensure_ascii=False)
\ No newline at end of file
+        return json.dumps(resultado, ensure_ascii=False)
@@ -0,0 +1,5 @@
+"""Código compartilhado pelo Alura1 e pelo Alura2.
+
+Cada projeto roda do próprio diretório; o `_raiz.py` de cada um põe a
+raiz do repositório no sys.path para que `import comum` funcione.
+"""
@@ -0,0 +1,66 @@
+# bench_importacao.py
+"""Tempo de importação dos módulos de um projeto, medido com `python -X importtime`.
+
+Cada módulo é importado num interpretador novo (várias vezes, para tirar a
+mediana), e os pacotes mais caros da importação aparecem em seguida. Cada
+projeto tem o seu bench_importacao.py, que chama `main` com a lista de
+módulos e o diretório dele:
+
+    python bench_importacao.py
+    python bench_importacao.py agente dados --repeticoes 5 --top 15
+
+Importar não deve ler .env, dados nem montar clientes: tudo isso acontece no
+primeiro uso. Use este script para conferir que continua assim.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+LINHA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def medir(modulo: str, diretorio: str) -> tuple:
+    """(total em ms, {pacote de topo: ms cumulativos}) de uma importação a frio."""
+
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=diretorio,
+        capture_output=True,
+        text=True,
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1])
+
+    total, pacotes = 0, defaultdict(int)
+    for linha in processo.stderr.splitlines():
+        encontrado = LINHA.match(linha)
+        if not encontrado:
+            continue
+        cumulativo, recuo, nome = int(encontrado.group(2)), len(encontrado.group(3)), encontrado.group(4)
+        if nome == modulo:
+            total = cumulativo
+        elif recuo <= 3:  # filhos diretos do módulo medido (ou importados pelo site)
+            pacotes[nome.split(".")[0]] += cumulativo
+    return total / 1000, {nome: us / 1000 for nome, us in pacotes.items()}
+
+
+def main(modulos: list, diretorio: str):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modulos", nargs="*", default=modulos)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    for modulo in args.modulos:
+        try:
+            medidas = [medir(modulo, diretorio) for _ in range(args.repeticoes)]
+        except RuntimeError as erro:
+            print(f"{modulo:<14} falhou: {erro}")
+            continue
+        mediana = statistics.median(total for total, _ in medidas)
+        _, pacotes = min(medidas, key=lambda medida: abs(medida[0] - mediana))
+        mais_caros = sorted(pacotes.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print(f"{modulo:<14} {mediana:8.1f} ms  | " + ", ".join(f"{nome} {ms:.0f}" for nome, ms in mais_caros))
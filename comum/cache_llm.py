@@ -0,0 +1,213 @@
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from langchain_core.caches import BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+
+ARQUIVO_CACHE = "cache_llm.sqlite"
+
+
+def _chave(prompt: str, llm_string: str) -> str:
+    # llm_string já traz modelo, deployment, temperatura e ferramentas associadas
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode()).hexdigest()
+
+
+def _texto_do_prompt(prompt: str) -> str:
+    """Extrai apenas o conteúdo das mensagens de um prompt serializado.
+
+    Texto que não é JSON (uma pergunta guardada direto com `update`) volta
+    como está.
+    """
+
+    if not prompt.lstrip().startswith("["):
+        return prompt
+    try:
+        mensagens = loads(prompt)
+    except Exception:
+        return prompt
+    if not isinstance(mensagens, list):
+        return prompt
+    return "\n".join(str(getattr(m, "content", m)) for m in mensagens)
+
+
+class CacheDeRespostas(BaseCache):
+    """Cache de respostas do LLM em SQLite com duas camadas.
+
+    - exata: mesma string de prompt e mesma configuração do modelo;
+    - semântica (opcional, com `embeddings`): reaproveita a resposta de um
+      prompt já visto cuja similaridade de cosseno seja >= `limiar`.
+
+    Entradas expiram após `ttl` segundos (se definido) e, acima de
+    `max_entradas`, as menos usadas recentemente são descartadas.
+    """
+
+    def __init__(
+        self,
+        caminho: str = ARQUIVO_CACHE,
+        embeddings=None,
+        limiar: float = 0.97,
+        max_entradas: int = 10_000,
+        ttl: float = None,
+    ):
+        self.embeddings = embeddings
+        self.limiar = limiar
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.estatisticas = {"exatos": 0, "semanticos": 0, "falhas": 0}
+
+        self._trava = threading.RLock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute(
+            """CREATE TABLE IF NOT EXISTS respostas (
+                chave TEXT PRIMARY KEY,
+                llm_string TEXT NOT NULL,
+                resposta TEXT NOT NULL,
+                vetor BLOB,
+                criado REAL NOT NULL,
+                acessado REAL NOT NULL
+            )"""
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_acessado ON respostas(acessado)")
+        self._conexao.commit()
+
+        # Matriz de vetores normalizados por llm_string, refeita sob demanda
+        self._indices = {}
+        self._vetores_recentes = {}
+
+    def _valido(self, criado: float) -> bool:
+        return self.ttl is None or time.time() - criado <= self.ttl
+
+    def _vetor(self, prompt: str) -> np.ndarray:
+        chave = hashlib.sha256(prompt.encode()).hexdigest()
+        vetor = self._vetores_recentes.get(chave)
+        if vetor is None:
+            vetor = np.asarray(self.embeddings.embed_query(_texto_do_prompt(prompt)), dtype=np.float32)
+            vetor /= np.linalg.norm(vetor) or 1.0
+            if len(self._vetores_recentes) > 256:
+                self._vetores_recentes.clear()
+            self._vetores_recentes[chave] = vetor
+        return vetor
+
+    def _indice(self, llm_string: str):
+        if llm_string not in self._indices:
+            linhas = self._conexao.execute(
+                "SELECT chave, vetor, criado FROM respostas WHERE llm_string = ? AND vetor IS NOT NULL",
+                (llm_string,),
+            ).fetchall()
+            linhas = [l for l in linhas if self._valido(l[2])]
+            chaves = [l[0] for l in linhas]
+            matriz = np.stack([np.frombuffer(l[1], dtype=np.float32) for l in linhas]) if linhas else None
+            self._indices[llm_string] = (chaves, matriz)
+        return self._indices[llm_string]
+
+    def _ler(self, chave: str):
+        linha = self._conexao.execute(
+            "SELECT resposta, criado FROM respostas WHERE chave = ?", (chave,)
+        ).fetchone()
+        if linha is None or not self._valido(linha[1]):
+            return None
+        self._conexao.execute("UPDATE respostas SET acessado = ? WHERE chave = ?", (time.time(), chave))
+        self._conexao.commit()
+        return [loads(g) for g in json.loads(linha[0])]
+
+    def lookup(self, prompt: str, llm_string: str):
+        with self._trava:
+            resposta = self._ler(_chave(prompt, llm_string))
+            if resposta is not None:
+                self.estatisticas["exatos"] += 1
+                return resposta
+            chaves, matriz = self._indice(llm_string) if self.embeddings is not None else ([], None)
+
+        if matriz is not None:
+            # o embedding do prompt vai à rede: fica fora da trava
+            similaridades = matriz @ self._vetor(prompt)
+            melhor = int(np.argmax(similaridades))
+            if similaridades[melhor] >= self.limiar:
+                with self._trava:
+                    resposta = self._ler(chaves[melhor])
+                    if resposta is not None:
+                        self.estatisticas["semanticos"] += 1
+                        return resposta
+
+        with self._trava:
+            self.estatisticas["falhas"] += 1
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        vetor = self._vetor(prompt).tobytes() if self.embeddings is not None else None
+        with self._trava:
+            agora = time.time()
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    _chave(prompt, llm_string),
+                    llm_string,
+                    json.dumps([dumps(g) for g in return_val]),
+                    vetor,
+                    agora,
+                    agora,
+                ),
+            )
+            self._despejar(agora)
+            self._conexao.commit()
+            self._indices.pop(llm_string, None)
+
+    def _despejar(self, agora: float):
+        if self.ttl is not None:
+            self._conexao.execute("DELETE FROM respostas WHERE criado < ?", (agora - self.ttl,))
+        excesso = self._conexao.execute("SELECT COUNT(*) FROM respostas").fetchone()[0] - self.max_entradas
+        if excesso > 0:
+            self._conexao.execute(
+                "DELETE FROM respostas WHERE chave IN "
+                "(SELECT chave FROM respostas ORDER BY acessado LIMIT ?)",
+                (excesso,),
+            )
+            self._indices.clear()
+
+    def clear(self, **kwargs) -> None:
+        with self._trava:
+            self._conexao.execute("DELETE FROM respostas")
+            self._conexao.commit()
+            self._indices.clear()
+
+
+_caches = {}
+_trava_caches = threading.Lock()
+
+
+def obter_cache(caminho: str = ARQUIVO_CACHE, **kwargs) -> CacheDeRespostas:
+    """Instância única por arquivo.
+
+    Pedir o mesmo arquivo com outra configuração (por exemplo, com
+    `embeddings` quando ele já existe só com a camada exata) é ValueError:
+    use outro arquivo para cada configuração.
+    """
+
+    pedida = inspect.signature(CacheDeRespostas).bind(caminho, **kwargs)
+    pedida.apply_defaults()
+    with _trava_caches:
+        cache = _caches.get(caminho)
+        if cache is None:
+            cache = _caches[caminho] = CacheDeRespostas(caminho, **kwargs)
+            return cache
+    divergentes = [
+        nome for nome, valor in pedida.arguments.items()
+        if nome != "caminho" and getattr(cache, nome) is not valor and getattr(cache, nome) != valor
+    ]
+    if divergentes:
+        raise ValueError(f"O cache {caminho} já está aberto com outro valor de: {', '.join(divergentes)}")
+    return cache
+
+
+def ativar_cache(caminho: str = ARQUIVO_CACHE, **kwargs) -> CacheDeRespostas:
+    """Registra o cache como global do LangChain (ver `obter_cache`)."""
+
+    cache = obter_cache(caminho, **kwargs)
+    set_llm_cache(cache)
+    return cache
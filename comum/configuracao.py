@@ -0,0 +1,42 @@
+# configuracao.py
+import os
+
+
+class Configuracao:
+    """Credenciais do Azure OpenAI lidas do ambiente (e do .env) só no primeiro acesso.
+
+    Importar os módulos do projeto não toca em arquivo nem em rede: o .env é
+    carregado quando alguém pede a chave ou o endpoint pela primeira vez. A
+    busca pelo .env parte do diretório atual (o do projeto que está rodando),
+    não desta pasta compartilhada.
+    """
+
+    def __init__(self):
+        self._carregado = False
+
+    def _carregar(self):
+        if not self._carregado:
+            from dotenv import find_dotenv, load_dotenv
+
+            load_dotenv(find_dotenv(usecwd=True))
+            self._carregado = True
+
+    @property
+    def api_key(self):
+        self._carregar()
+        return os.getenv("AZURE_OPENAI_KEY")
+
+    @property
+    def endpoint(self):
+        self._carregar()
+        return os.getenv("AZURE_OPENAI_ENDPOINT")
+
+    def credenciais(self) -> tuple:
+        """(chave, endpoint), ou ValueError se algum não estiver definido."""
+
+        if not self.api_key or not self.endpoint:
+            raise ValueError("A chave da API ou o endpoint não foram definidos no .env")
+        return self.api_key, self.endpoint
+
+
+configuracao = Configuracao()
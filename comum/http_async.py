@@ -0,0 +1,39 @@
+# http_async.py
+import asyncio
+import threading
+
+import httpx
+
+
+class ClienteAsyncPorLoop(httpx.AsyncClient):
+    """httpx.AsyncClient com um pool de conexões por event loop.
+
+    As conexões de um AsyncClient ficam presas ao loop em que foram abertas:
+    com um modelo compartilhado (lru_cache), a segunda chamada de
+    `asyncio.run(...)` encontraria o loop anterior fechado. Esta fachada é o
+    que o modelo guarda; cada loop ganha o próprio cliente, e os de loops já
+    fechados são descartados.
+    """
+
+    def __init__(self, **opcoes):
+        super().__init__(**opcoes)
+        self._opcoes = opcoes
+        self._por_loop = {}
+        self._trava = threading.Lock()
+
+    def _cliente(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._trava:
+            cliente = self._por_loop.get(loop)
+            if cliente is None:
+                self._por_loop = {l: c for l, c in self._por_loop.items() if not l.is_closed()}
+                cliente = self._por_loop[loop] = httpx.AsyncClient(**self._opcoes)
+        return cliente
+
+    async def send(self, request, **kwargs):
+        return await self._cliente().send(request, **kwargs)
+
+    async def aclose(self):
+        cliente = self._por_loop.pop(asyncio.get_running_loop(), None)
+        if cliente is not None:
+            await cliente.aclose()
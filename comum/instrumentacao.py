@@ -0,0 +1,272 @@
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Limites (em segundos) dos baldes do histograma de latência
+BALDES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _nome(serialized, kwargs: dict, padrao: str) -> str:
+    if kwargs.get("name"):
+        return kwargs["name"]
+    serialized = serialized or {}
+    return serialized.get("name") or (serialized.get("id") or [padrao])[-1]
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus."""
+
+    def __init__(self):
+        self.contagens = [0] * len(BALDES)
+        self.total = 0
+        self.soma = 0.0
+
+    def observar(self, segundos: float):
+        posicao = bisect.bisect_left(BALDES, segundos)
+        if posicao < len(BALDES):
+            self.contagens[posicao] += 1
+        self.total += 1
+        self.soma += segundos
+
+    def acumulado(self) -> list:
+        acumulados, corrente = [], 0
+        for contagem in self.contagens:
+            corrente += contagem
+            acumulados.append(corrente)
+        return acumulados
+
+
+class Metricas(BaseCallbackHandler):
+    """Callback que mede latência por runnable, tokens, erros e retentativas.
+
+    Os intervalos são medidos entre os eventos *_start e *_end/_error de cada
+    run_id e agregados por (tipo, nome): "chain" para cadeias e nós do
+    LangGraph, "llm" para modelos e "tool" para ferramentas. Contadores de
+    outros componentes (cache de respostas, embeddings em lote) entram com
+    `registrar_fonte` e são lidos só na exportação.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._abertos = {}
+        self.latencias = defaultdict(Histograma)
+        self.erros = defaultdict(int)
+        self.retentativas = defaultdict(int)
+        self.tokens = defaultdict(lambda: {"prompt": 0, "completion": 0})
+        self._fontes = {}
+
+    def registrar_fonte(self, nome: str, fonte):
+        """`fonte` é um dicionário de contadores numéricos (ou função que o retorna)."""
+
+        self._fontes[nome] = fonte
+
+    def _abrir(self, tipo: str, nome: str, run_id):
+        self._abertos[run_id] = (tipo, nome, time.perf_counter())
+
+    def _fechar(self, run_id, erro: bool = False):
+        aberto = self._abertos.pop(run_id, None)
+        if aberto is None:
+            return None
+        tipo, nome, inicio = aberto
+        with self._trava:
+            self.latencias[(tipo, nome)].observar(time.perf_counter() - inicio)
+            if erro:
+                self.erros[(tipo, nome)] += 1
+        return nome
+
+    def on_chain_start(self, serialized, inputs, *, run_id, **kwargs):
+        self._abrir("chain", _nome(serialized, kwargs, "chain"), run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._fechar(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._fechar(run_id, erro=True)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._abrir("llm", _nome(serialized, kwargs, "llm"), run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        modelo = (kwargs.get("metadata") or {}).get("ls_model_name")
+        self._abrir("llm", modelo or _nome(serialized, kwargs, "chat_model"), run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        nome = self._fechar(run_id)
+        prompt = completion = 0
+        for geracoes in response.generations:
+            for geracao in geracoes:
+                uso = getattr(getattr(geracao, "message", None), "usage_metadata", None)
+                if uso:
+                    prompt += uso.get("input_tokens", 0)
+                    completion += uso.get("output_tokens", 0)
+        if not prompt and not completion:
+            uso = (response.llm_output or {}).get("token_usage") or {}
+            prompt, completion = uso.get("prompt_tokens", 0), uso.get("completion_tokens", 0)
+        with self._trava:
+            self.tokens[nome or "llm"]["prompt"] += prompt
+            self.tokens[nome or "llm"]["completion"] += completion
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._fechar(run_id, erro=True)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._abrir("tool", _nome(serialized, kwargs, "tool"), run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._fechar(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._fechar(run_id, erro=True)
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        aberto = self._abertos.get(run_id)
+        with self._trava:
+            self.retentativas[aberto[1] if aberto else "desconhecido"] += 1
+
+    def _contadores_das_fontes(self) -> dict:
+        contadores = {}
+        for nome, fonte in self._fontes.items():
+            valores = fonte() if callable(fonte) else fonte
+            contadores[nome] = {c: v for c, v in dict(valores).items() if isinstance(v, (int, float))}
+        return contadores
+
+    def instantaneo(self) -> dict:
+        """Cópia das métricas atuais, pronta para virar JSON."""
+
+        with self._trava:
+            return {
+                "momento": time.time(),
+                "latencias": [
+                    {"tipo": tipo, "nome": nome, "chamadas": h.total, "segundos": round(h.soma, 6),
+                     "baldes": dict(zip(map(str, BALDES), h.acumulado()))}
+                    for (tipo, nome), h in self.latencias.items()
+                ],
+                "erros": [{"tipo": tipo, "nome": nome, "total": n} for (tipo, nome), n in self.erros.items()],
+                "retentativas": dict(self.retentativas),
+                "tokens": {nome: dict(uso) for nome, uso in self.tokens.items()},
+                "fontes": self._contadores_das_fontes(),
+            }
+
+    def prometheus(self) -> str:
+        """Métricas no formato texto de exposição do Prometheus."""
+
+        linhas = [
+            "# HELP langchain_latencia_segundos Latência por runnable.",
+            "# TYPE langchain_latencia_segundos histogram",
+        ]
+        with self._trava:
+            for (tipo, nome), h in self.latencias.items():
+                rotulos = f'tipo="{tipo}",nome="{_escapar(nome)}"'
+                for limite, acumulado in zip(BALDES, h.acumulado()):
+                    linhas.append(f'langchain_latencia_segundos_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+                linhas.append(f'langchain_latencia_segundos_bucket{{{rotulos},le="+Inf"}} {h.total}')
+                linhas.append(f"langchain_latencia_segundos_sum{{{rotulos}}} {h.soma:.6f}")
+                linhas.append(f"langchain_latencia_segundos_count{{{rotulos}}} {h.total}")
+
+            linhas += ["# TYPE langchain_erros_total counter"]
+            for (tipo, nome), total in self.erros.items():
+                linhas.append(f'langchain_erros_total{{tipo="{tipo}",nome="{_escapar(nome)}"}} {total}')
+
+            linhas += ["# TYPE langchain_retentativas_total counter"]
+            for nome, total in self.retentativas.items():
+                linhas.append(f'langchain_retentativas_total{{nome="{_escapar(nome)}"}} {total}')
+
+            linhas += ["# TYPE langchain_tokens_total counter"]
+            for nome, uso in self.tokens.items():
+                for tipo, total in uso.items():
+                    linhas.append(f'langchain_tokens_total{{modelo="{_escapar(nome)}",tipo="{tipo}"}} {total}')
+
+        linhas += ["# TYPE langchain_componente_total counter"]
+        for fonte, contadores in self._contadores_das_fontes().items():
+            for contador, valor in contadores.items():
+                linhas.append(f'langchain_componente_total{{fonte="{fonte}",contador="{contador}"}} {valor}')
+        return "\n".join(linhas) + "\n"
+
+    def exportar_jsonl(self, caminho: str):
+        """Acrescenta um instantâneo das métricas como uma linha JSON."""
+
+        with open(caminho, "a", encoding="utf-8") as arquivo:
+            arquivo.write(json.dumps(self.instantaneo(), ensure_ascii=False) + "\n")
+
+    def servir(self, porta: int, endereco: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Sobe um endpoint /metrics local numa thread em segundo plano."""
+
+        metricas = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                corpo = metricas.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer((endereco, porta), Manipulador)
+        threading.Thread(target=servidor.serve_forever, daemon=True, name="metricas").start()
+        return servidor
+
+
+_metricas = None
+
+
+def ativar_instrumentacao(porta: int = None, arquivo: str = None, fontes: dict = None):
+    """Liga as métricas se houver destino: `porta` (Prometheus) e/ou `arquivo` (JSONL).
+
+    Sem argumentos, usa as variáveis METRICAS_PORTA e METRICAS_ARQUIVO. Sem
+    nenhum destino, retorna None e nada é anexado aos runnables, então o
+    custo com a instrumentação desligada é zero. `fontes` vai para
+    `registrar_fonte` (nome -> dicionário de contadores).
+    """
+
+    global _metricas
+    if _metricas is None:
+        porta = porta or (int(os.environ["METRICAS_PORTA"]) if os.getenv("METRICAS_PORTA") else None)
+        arquivo = arquivo or os.getenv("METRICAS_ARQUIVO")
+        if not porta and not arquivo:
+            return None
+
+        _metricas = Metricas()
+        if porta:
+            _metricas.servir(porta)
+        if arquivo:
+            atexit.register(_metricas.exportar_jsonl, arquivo)
+
+    for nome, fonte in (fontes or {}).items():
+        _metricas.registrar_fonte(nome, fonte)
+    return _metricas
+
+
+def metricas_ativas():
+    return _metricas
+
+
+def instrumentar(objeto):
+    """Anexa o callback de métricas a um modelo, ferramenta ou runnable.
+
+    Modelos e BaseTools recebem o callback no próprio campo `callbacks` (o
+    objeto continua o mesmo, então `bind_tools` etc. seguem funcionando);
+    os demais runnables ganham um `with_config`. Desligado, devolve o objeto
+    sem alteração.
+    """
+
+    if _metricas is None:
+        return objeto
+    if hasattr(objeto, "callbacks") and not hasattr(objeto, "bound"):
+        objeto.callbacks = [*(objeto.callbacks or []), _metricas]
+        return objeto
+    return objeto.with_config(callbacks=[_metricas])
@@ -0,0 +1,85 @@
+"""CacheDeRespostas: camada exata, semântica, TTL e descarte dos menos usados.
+
+    python -m pytest -q comum
+"""
+import time
+
+import pytest
+from langchain_core.outputs import Generation
+
+from comum.cache_llm import CacheDeRespostas, obter_cache
+
+
+class EmbeddingsFixos:
+    """Vetores escolhidos à mão: textos que começam igual ficam quase paralelos."""
+
+    def embed_query(self, texto: str) -> list:
+        base = {"gold": [1.0, 0.0, 0.0], "platinum": [0.0, 1.0, 0.0]}[texto.split()[0]]
+        return [base[0], base[1], base[2] + 0.01 * len(texto)]
+
+
+def _resposta(texto: str) -> list:
+    return [Generation(text=texto)]
+
+
+def _texto(resultado) -> str:
+    return resultado[0].text if resultado else None
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+
+def test_exato_por_prompt_e_configuracao(caminho):
+    cache = CacheDeRespostas(caminho)
+    cache.update("oi", "modelo-a", _resposta("olá"))
+    assert _texto(cache.lookup("oi", "modelo-a")) == "olá"
+    assert cache.lookup("oi", "modelo-b") is None
+    assert cache.lookup("oi!", "modelo-a") is None
+    assert cache.estatisticas == {"exatos": 1, "semanticos": 0, "falhas": 2}
+
+
+def test_persiste_entre_instancias(caminho):
+    CacheDeRespostas(caminho).update("oi", "m", _resposta("olá"))
+    assert _texto(CacheDeRespostas(caminho).lookup("oi", "m")) == "olá"
+
+
+def test_ttl_expira_entradas(caminho):
+    cache = CacheDeRespostas(caminho, ttl=0.05)
+    cache.update("oi", "m", _resposta("olá"))
+    assert _texto(cache.lookup("oi", "m")) == "olá"
+    time.sleep(0.1)
+    assert cache.lookup("oi", "m") is None
+
+
+def test_descarta_os_menos_usados(caminho):
+    cache = CacheDeRespostas(caminho, max_entradas=2)
+    cache.update("a", "m", _resposta("A"))
+    time.sleep(0.01)
+    cache.update("b", "m", _resposta("B"))
+    time.sleep(0.01)
+    cache.lookup("a", "m")  # "a" passa a ser o mais recente
+    time.sleep(0.01)
+    cache.update("c", "m", _resposta("C"))
+    assert _texto(cache.lookup("a", "m")) == "A"
+    assert cache.lookup("b", "m") is None
+    assert _texto(cache.lookup("c", "m")) == "C"
+
+
+def test_semantico_respeita_limiar_e_escopo(caminho):
+    cache = CacheDeRespostas(caminho, embeddings=EmbeddingsFixos(), limiar=0.99)
+    cache.update("gold como acionar o seguro", "gold.pdf", _resposta("ligue 0800"))
+    assert _texto(cache.lookup("gold como acionar o seguro?", "gold.pdf")) == "ligue 0800"
+    assert cache.lookup("platinum como acionar o seguro?", "gold.pdf") is None
+    assert cache.lookup("gold como acionar o seguro?", "platinum.pdf") is None
+    assert cache.estatisticas["semanticos"] == 1
+
+
+def test_configuracao_divergente_no_mesmo_arquivo(caminho):
+    cache = obter_cache(caminho)
+    assert obter_cache(caminho) is cache
+    with pytest.raises(ValueError):
+        obter_cache(caminho, ttl=60)
+    with pytest.raises(ValueError):
+        obter_cache(caminho, embeddings=EmbeddingsFixos())